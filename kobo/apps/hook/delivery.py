@@ -0,0 +1,159 @@
+# coding: utf-8
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from kpi.constants import SUBMISSION_FORMAT_TYPE_JSON
+from kpi.utils.cache import release_lock
+from kpi.utils.log import logging
+from .constants import HOOK_LOG_PENDING
+from .models import Hook, HookLog
+
+
+def deliver_pending_logs(hook: Hook) -> Optional[dict]:
+    """
+    Send the submissions of `hook` which have never been sent yet, i.e. whose
+    log is still pending and has not been tried. At most
+    `settings.HOOK_DELIVERY_BATCH_SIZE` submissions are sent, with up to
+    `settings.HOOK_DELIVERY_MAX_IN_FLIGHT` requests at the same time.
+
+    Logs are updated exactly as `ServiceDefinitionInterface.send()` does.
+
+    Only one process can deliver the logs of a hook at a time, otherwise the
+    same submissions could be sent twice. If another one is already doing it,
+    `None` is returned right away. Otherwise, return whether each submission
+    has been successfully sent, keyed by submission id.
+    """
+    lock_key = f'hook_delivery_lock:{hook.pk}'
+    lock_token = uuid.uuid4().hex
+    if not cache.add(
+        lock_key, lock_token, timeout=settings.HOOK_DELIVERY_LOCK_TIMEOUT
+    ):
+        return None
+
+    try:
+        return _deliver_pending_logs(hook)
+    finally:
+        release_lock(lock_key, lock_token)
+
+
+def schedule_delivery(hook_id: int):
+    """
+    Schedule the delivery of the pending logs of the hook `hook_id`.
+
+    Calls are debounced: the delivery starts after
+    `settings.HOOK_DELIVERY_DELAY` seconds, and only one is scheduled per
+    hook at a time, no matter how many submissions are received meanwhile.
+    It keeps the number of queued tasks low when forms receive bursts of
+    submissions.
+    """
+    # Avoid circular import
+    from .tasks import deliver_pending_logs_task
+
+    if not cache.add(
+        f'hook_delivery_scheduled:{hook_id}',
+        True,
+        timeout=settings.HOOK_DELIVERY_DELAY * 2,
+    ):
+        return
+
+    deliver_pending_logs_task.apply_async(
+        queue='kpi_low_priority_queue',
+        args=(hook_id,),
+        countdown=settings.HOOK_DELIVERY_DELAY,
+    )
+
+
+def schedule_stale_deliveries():
+    """
+    Schedule the delivery of the hooks whose pending logs have been waiting
+    for more than `settings.HOOK_DELIVERY_STALE_DELAY` seconds, e.g. because
+    the worker running their delivery task has been killed.
+    """
+    threshold = timezone.now() - timedelta(
+        seconds=settings.HOOK_DELIVERY_STALE_DELAY
+    )
+    hook_ids = (
+        HookLog.objects.filter(
+            hook__active=True,
+            status=HOOK_LOG_PENDING,
+            tries=0,
+            date_modified__lt=threshold,
+        )
+        .values_list('hook_id', flat=True)
+        .distinct()
+    )
+    for hook_id in hook_ids:
+        schedule_delivery(hook_id)
+
+
+def _deliver_pending_logs(hook: Hook) -> dict:
+    submission_ids = list(
+        HookLog.objects.filter(hook=hook, status=HOOK_LOG_PENDING, tries=0)
+        .order_by('pk')
+        .values_list('submission_id', flat=True)[
+            : settings.HOOK_DELIVERY_BATCH_SIZE
+        ]
+    )
+    if not submission_ids:
+        return {}
+
+    ServiceDefinition = hook.get_service_definition()
+    submissions = _get_submissions(hook, submission_ids)
+    service_definitions = [
+        ServiceDefinition(hook, submission_id, submissions.get(submission_id))
+        for submission_id in submission_ids
+    ]
+    ssrf_protect_options = ServiceDefinition.get_ssrf_protect_options()
+
+    results = {}
+    with ThreadPoolExecutor(
+        max_workers=settings.HOOK_DELIVERY_MAX_IN_FLIGHT
+    ) as executor:
+        # Logs are saved from this thread, only requests are sent from the
+        # workers
+        responses = executor.map(
+            lambda sd: sd.deliver(ssrf_protect_options), service_definitions
+        )
+        for submission_id, service_definition, response in zip(
+            submission_ids, service_definitions, responses
+        ):
+            success, status_code, message = response
+            service_definition.save_log(status_code, message, success)
+            results[submission_id] = success
+
+    return results
+
+
+def _get_submissions(hook: Hook, submission_ids: list) -> dict:
+    """
+    Retrieve the submissions matching `submission_ids` at once, keyed by
+    their id.
+
+    XML submissions do not contain their id, thus they cannot be matched once
+    retrieved in batch. They are retrieved one by one by
+    `ServiceDefinitionInterface` instead.
+    """
+    if hook.export_type != SUBMISSION_FORMAT_TYPE_JSON:
+        return {}
+
+    try:
+        submissions = hook.asset.deployment.get_submissions(
+            user=hook.asset.owner,
+            submission_ids=submission_ids,
+            skip_count=True,
+        )
+        return {
+            submission['_id']: submission for submission in submissions
+        }
+    except Exception as e:
+        logging.error(
+            f'hook.delivery._get_submissions: Hook #{hook.uid} - {str(e)}',
+            exc_info=True,
+        )
+    return {}
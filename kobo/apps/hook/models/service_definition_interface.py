@@ -3,12 +3,14 @@ import json
 import os
 import re
 from abc import ABCMeta, abstractmethod
+from typing import Optional
 
 import constance
 import requests
 from ssrf_protect.ssrf_protect import SSRFProtect, SSRFProtectException
 
 from kpi.utils.log import logging
+from ..session import get_hook_session
 from .hook import Hook
 from .hook_log import HookLog
 from ..constants import (
@@ -20,21 +22,26 @@ from ..constants import (
 
 class ServiceDefinitionInterface(metaclass=ABCMeta):
 
-    def __init__(self, hook, submission_id):
+    def __init__(self, hook, submission_id, submission=None):
+        """
+        `submission` can be provided when it has already been retrieved
+        (e.g. in batch with other submissions) from the deployment back end.
+        """
         self._hook = hook
         self._submission_id = submission_id
-        self._data = self._get_data()
+        self._data = self._get_data(submission)
 
-    def _get_data(self):
+    def _get_data(self, submission=None):
         """
         Retrieves data from deployment backend of the asset.
         """
         try:
-            submission = self._hook.asset.deployment.get_submission(
-                self._submission_id,
-                user=self._hook.asset.owner,
-                format_type=self._hook.export_type,
-            )
+            if submission is None:
+                submission = self._hook.asset.deployment.get_submission(
+                    self._submission_id,
+                    user=self._hook.asset.owner,
+                    format_type=self._hook.export_type,
+                )
             return self._parse_data(submission, self._hook.subset_fields)
         except Exception as e:
             logging.error(
@@ -71,94 +78,118 @@ class ServiceDefinitionInterface(metaclass=ABCMeta):
         """
         pass
 
-    def send(self):
-        """
-        Sends data to external endpoint
-        :return: bool
+    def deliver(
+        self,
+        ssrf_protect_options: Optional[dict] = None,
+    ) -> tuple[bool, Optional[int], str]:
         """
+        Sends data to external endpoint without saving the result in the log.
+        It does not hit the database, thus it can be called from another
+        thread.
 
-        success = False
-        # Need to declare response before requests.post assignment in case of
+        Returns a tuple of whether it succeeded, the status code of the remote
+        server response and its content (or the error message).
+        """
+        # Need to declare response before session.post assignment in case of
         # RequestException
         response = None
-        if self._data:
-            try:
-                request_kwargs = self._prepare_request_kwargs()
-
-                # Add custom headers
-                request_kwargs.get("headers").update(
-                    self._hook.settings.get("custom_headers", {}))
-
-                # Add user agent
-                public_domain = "- {} ".format(os.getenv("PUBLIC_DOMAIN_NAME")) \
-                    if os.getenv("PUBLIC_DOMAIN_NAME") else ""
-                request_kwargs.get("headers").update({
-                    "User-Agent": "KoboToolbox external service {}#{}".format(
-                        public_domain,
-                        self._hook.uid)
+        if not self._data:
+            return (
+                False,
+                KOBO_INTERNAL_ERROR_STATUS_CODE,
+                'Submission has been deleted',
+            )
+
+        if ssrf_protect_options is None:
+            ssrf_protect_options = self.get_ssrf_protect_options()
+
+        try:
+            request_kwargs = self._prepare_request_kwargs()
+
+            # Add custom headers
+            request_kwargs.get("headers").update(
+                self._hook.settings.get("custom_headers", {}))
+
+            # Add user agent
+            public_domain = "- {} ".format(os.getenv("PUBLIC_DOMAIN_NAME")) \
+                if os.getenv("PUBLIC_DOMAIN_NAME") else ""
+            request_kwargs.get("headers").update({
+                "User-Agent": "KoboToolbox external service {}#{}".format(
+                    public_domain,
+                    self._hook.uid)
+            })
+
+            # If the request needs basic authentication with username and
+            # password, let's provide them
+            if self._hook.auth_level == Hook.BASIC_AUTH:
+                request_kwargs.update({
+                    "auth": (self._hook.settings.get("username"),
+                             self._hook.settings.get("password"))
                 })
 
-                # If the request needs basic authentication with username and
-                # password, let's provide them
-                if self._hook.auth_level == Hook.BASIC_AUTH:
-                    request_kwargs.update({
-                        "auth": (self._hook.settings.get("username"),
-                                 self._hook.settings.get("password"))
-                    })
-
-                ssrf_protect_options = {}
-                if constance.config.SSRF_ALLOWED_IP_ADDRESS.strip():
-                    ssrf_protect_options['allowed_ip_addresses'] = constance.\
-                        config.SSRF_ALLOWED_IP_ADDRESS.strip().split('\r\n')
-
-                if constance.config.SSRF_DENIED_IP_ADDRESS.strip():
-                    ssrf_protect_options['denied_ip_addresses'] = constance.\
-                        config.SSRF_DENIED_IP_ADDRESS.strip().split('\r\n')
-
-                SSRFProtect.validate(self._hook.endpoint,
-                                     options=ssrf_protect_options)
-
-                response = requests.post(self._hook.endpoint, timeout=30,
-                                         **request_kwargs)
-                response.raise_for_status()
-                self.save_log(response.status_code, response.text, True)
-                success = True
-            except requests.exceptions.RequestException as e:
-                # If request fails to communicate with remote server.
-                # Exception is raised before request.post can return something.
-                # Thus, response equals None
-                status_code = KOBO_INTERNAL_ERROR_STATUS_CODE
-                text = str(e)
-                if response is not None:
-                    text = response.text
-                    status_code = response.status_code
-                self.save_log(status_code, text)
-            except SSRFProtectException as e:
-                logging.error(
-                    'service_json.ServiceDefinition.send: '
-                    f'Hook #{self._hook.uid} - '
-                    f'Data #{self._submission_id} - '
-                    f'{str(e)}',
-                    exc_info=True)
-                self.save_log(
-                    KOBO_INTERNAL_ERROR_STATUS_CODE,
-                    f'{self._hook.endpoint} is not allowed')
-            except Exception as e:
-                logging.error(
-                    'service_json.ServiceDefinition.send: '
-                    f'Hook #{self._hook.uid} - '
-                    f'Data #{self._submission_id} - '
-                    f'{str(e)}',
-                    exc_info=True)
-                self.save_log(
-                    KOBO_INTERNAL_ERROR_STATUS_CODE,
-                    "An error occurred when sending data to external endpoint")
-        else:
-            self.save_log(
+            SSRFProtect.validate(self._hook.endpoint,
+                                 options=ssrf_protect_options)
+
+            response = get_hook_session().post(
+                self._hook.endpoint, **request_kwargs
+            )
+            response.raise_for_status()
+            return True, response.status_code, response.text
+        except requests.exceptions.RequestException as e:
+            # If request fails to communicate with remote server.
+            # Exception is raised before request.post can return something.
+            # Thus, response equals None
+            status_code = KOBO_INTERNAL_ERROR_STATUS_CODE
+            text = str(e)
+            if response is not None:
+                text = response.text
+                status_code = response.status_code
+            return False, status_code, text
+        except SSRFProtectException as e:
+            logging.error(
+                'service_json.ServiceDefinition.send: '
+                f'Hook #{self._hook.uid} - '
+                f'Data #{self._submission_id} - '
+                f'{str(e)}',
+                exc_info=True)
+            return (
+                False,
+                KOBO_INTERNAL_ERROR_STATUS_CODE,
+                f'{self._hook.endpoint} is not allowed',
+            )
+        except Exception as e:
+            logging.error(
+                'service_json.ServiceDefinition.send: '
+                f'Hook #{self._hook.uid} - '
+                f'Data #{self._submission_id} - '
+                f'{str(e)}',
+                exc_info=True)
+            return (
+                False,
                 KOBO_INTERNAL_ERROR_STATUS_CODE,
-                'Submission has been deleted'
+                "An error occurred when sending data to external endpoint",
             )
 
+    @staticmethod
+    def get_ssrf_protect_options() -> dict:
+        ssrf_protect_options = {}
+        if constance.config.SSRF_ALLOWED_IP_ADDRESS.strip():
+            ssrf_protect_options['allowed_ip_addresses'] = constance.\
+                config.SSRF_ALLOWED_IP_ADDRESS.strip().split('\r\n')
+
+        if constance.config.SSRF_DENIED_IP_ADDRESS.strip():
+            ssrf_protect_options['denied_ip_addresses'] = constance.\
+                config.SSRF_DENIED_IP_ADDRESS.strip().split('\r\n')
+
+        return ssrf_protect_options
+
+    def send(self):
+        """
+        Sends data to external endpoint
+        :return: bool
+        """
+        success, status_code, message = self.deliver()
+        self.save_log(status_code, message, success)
         return success
 
     def save_log(self, status_code: int, message: str, success: bool = False):
@@ -0,0 +1,53 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+_session: Optional['HookSession'] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+class HookSession(requests.Session):
+    """
+    Session used to send submissions to REST Services endpoints.
+    Connections are kept alive and pooled per endpoint host.
+    Cookies are never stored because the same session is shared by the hooks
+    of all users.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=settings.HOOK_REQUEST_POOL_CONNECTIONS,
+            pool_maxsize=settings.HOOK_REQUEST_POOL_MAXSIZE,
+        )
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = settings.HOOK_REQUEST_TIMEOUT
+        return super().send(request, **kwargs)
+
+
+def get_hook_session() -> HookSession:
+    """
+    Return the session shared by all threads of the current process.
+    A new session is created after a fork, since connections of the parent
+    process must not be reused.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = HookSession()
+                _session_pid = pid
+    return _session
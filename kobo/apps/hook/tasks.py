@@ -4,13 +4,19 @@ import time
 import constance
 from celery import shared_task
 from django.conf import settings
+from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import get_template
 from django.utils import translation, timezone
 from django_celery_beat.models import PeriodicTask
 
 from kpi.utils.log import logging
-from .constants import HOOK_LOG_FAILED
+from .constants import HOOK_LOG_FAILED, HOOK_LOG_PENDING
+from .delivery import (
+    deliver_pending_logs,
+    schedule_delivery,
+    schedule_stale_deliveries,
+)
 from .models import Hook, HookLog
 
 
@@ -42,6 +48,60 @@ def service_definition_task(self, hook_id, submission_id):
     return True
 
 
+@shared_task
+def deliver_pending_logs_task(hook_id):
+    """
+    Sends, in batch, the submissions of the hook which have never been sent.
+    Each failed submission is retried on its own by `service_definition_task`
+    as if its first try had been made by that task.
+    If some submissions are still pending, another batch is scheduled.
+    If another task is already delivering the logs of the hook, it returns
+    right away.
+
+    :param hook_id: int. Hook PK
+    """
+    # Let next submissions schedule another delivery from now on
+    cache.delete(f'hook_delivery_scheduled:{hook_id}')
+    try:
+        hook = Hook.objects.get(id=hook_id)
+    except Hook.DoesNotExist:
+        return False
+
+    results = deliver_pending_logs(hook)
+    if results is None:
+        # Another task is delivering the logs of this hook. It schedules
+        # another delivery for the submissions it has not picked up once it
+        # is done (see below), do not poll meanwhile.
+        return False
+
+    if constance.config.HOOK_MAX_RETRIES > 0:
+        for submission_id, success in results.items():
+            if not success:
+                service_definition_task.apply_async(
+                    queue='kpi_low_priority_queue',
+                    args=(hook_id, submission_id),
+                    countdown=HookLog.get_remaining_seconds(0),
+                    retries=1,
+                )
+
+    # Submissions may have come in during the delivery, and their own task
+    # skipped while this one was holding the lock.
+    if hook.logs.filter(status=HOOK_LOG_PENDING, tries=0).exists():
+        schedule_delivery(hook_id)
+
+    return True
+
+
+@shared_task
+def deliver_stale_pending_logs_task():
+    """
+    Periodically schedules the delivery of the pending logs whose delivery
+    task has been lost (e.g. worker restarted before it ran).
+    """
+    schedule_stale_deliveries()
+    return True
+
+
 @shared_task
 def retry_all_task(hooklogs_ids):
     """
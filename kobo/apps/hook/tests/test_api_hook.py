@@ -1,10 +1,13 @@
 # coding: utf-8
 import json
+from datetime import timedelta
 
 import responses
 from constance.test import override_config
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
+from django.utils import timezone
 from mock import patch
 from rest_framework import status
 
@@ -14,7 +17,13 @@ from kobo.apps.hook.constants import (
     HOOK_LOG_SUCCESS,
     SUBMISSION_PLACEHOLDER,
 )
+from kobo.apps.hook.delivery import (
+    deliver_pending_logs,
+    schedule_stale_deliveries,
+)
 from kobo.apps.hook.models.hook import Hook
+from kobo.apps.hook.tasks import deliver_pending_logs_task
+from kobo.apps.hook.utils import HookUtils
 from kpi.constants import SUBMISSION_FORMAT_TYPE_JSON
 from kpi.constants import (
     PERM_VIEW_SUBMISSIONS,
@@ -92,6 +101,95 @@ class ApiHookTestCase(HookTestCase):
         response = self.client.post(hook_signal_url, data=data, format='json')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    @patch('ssrf_protect.ssrf_protect.SSRFProtect._get_ip_address',
+           new=MockSSRFProtect._get_ip_address)
+    @responses.activate
+    def test_deliver_pending_logs(self):
+        hook = self._create_hook(name='batch hook',
+                                 endpoint='http://batch.service.local/',
+                                 settings={})
+        responses.add(responses.POST, hook.endpoint,
+                      status=status.HTTP_200_OK,
+                      content_type='application/json')
+        submissions = self.asset.deployment.get_submissions(self.asset.owner)
+        submission_id = submissions[0]['_id']
+
+        # Queue the submission without delivering it
+        with patch('kobo.apps.hook.utils.schedule_delivery') as mock_schedule:
+            self.assertTrue(HookUtils.call_services(self.asset, submission_id))
+            mock_schedule.assert_called_once_with(hook.pk)
+            self.assertFalse(
+                HookUtils.call_services(self.asset, submission_id)
+            )
+
+        hook_log = hook.logs.get()
+        self.assertEqual(hook_log.status, HOOK_LOG_PENDING)
+        self.assertEqual(hook_log.tries, 0)
+
+        self.assertEqual(deliver_pending_logs(hook), {submission_id: True})
+        hook_log.refresh_from_db()
+        self.assertEqual(hook_log.status, HOOK_LOG_SUCCESS)
+        self.assertEqual(hook_log.tries, 1)
+
+        # Nothing left to deliver
+        self.assertEqual(deliver_pending_logs(hook), {})
+        self.assertEqual(len(responses.calls), 1)
+
+    @patch('ssrf_protect.ssrf_protect.SSRFProtect._get_ip_address',
+           new=MockSSRFProtect._get_ip_address)
+    @responses.activate
+    def test_deliver_pending_logs_once_at_a_time(self):
+        hook = self._create_hook(name='batch hook',
+                                 endpoint='http://batch.service.local/',
+                                 settings={})
+        responses.add(responses.POST, hook.endpoint,
+                      status=status.HTTP_200_OK,
+                      content_type='application/json')
+        submissions = self.asset.deployment.get_submissions(self.asset.owner)
+        submission_id = submissions[0]['_id']
+        with patch('kobo.apps.hook.utils.schedule_delivery'):
+            HookUtils.call_services(self.asset, submission_id)
+
+        # Another process is delivering the logs of the hook
+        lock_key = f'hook_delivery_lock:{hook.pk}'
+        cache.set(lock_key, 'another-process')
+        self.assertIsNone(deliver_pending_logs(hook))
+        self.assertEqual(len(responses.calls), 0)
+        self.assertEqual(hook.logs.get().status, HOOK_LOG_PENDING)
+        # The task does not poll the lock, the process holding it schedules
+        # another delivery for pending logs once it is done
+        with patch('kobo.apps.hook.tasks.schedule_delivery') as mock_schedule:
+            self.assertFalse(deliver_pending_logs_task(hook.pk))
+            mock_schedule.assert_not_called()
+            with patch(
+                'kobo.apps.hook.tasks.deliver_pending_logs', return_value={}
+            ):
+                self.assertTrue(deliver_pending_logs_task(hook.pk))
+            mock_schedule.assert_called_once_with(hook.pk)
+
+        cache.delete(lock_key)
+        self.assertEqual(deliver_pending_logs(hook), {submission_id: True})
+        self.assertEqual(len(responses.calls), 1)
+        # The lock is released
+        self.assertIsNone(cache.get(lock_key))
+
+    def test_schedule_stale_deliveries(self):
+        hook = self._create_hook()
+        submissions = self.asset.deployment.get_submissions(self.asset.owner)
+        with patch('kobo.apps.hook.utils.schedule_delivery'):
+            HookUtils.call_services(self.asset, submissions[0]['_id'])
+
+        with patch('kobo.apps.hook.delivery.schedule_delivery') as mock_schedule:
+            # The log has just been queued, its delivery is still scheduled
+            schedule_stale_deliveries()
+            mock_schedule.assert_not_called()
+
+            hook.logs.update(
+                date_modified=timezone.now() - timedelta(hours=1)
+            )
+            schedule_stale_deliveries()
+            mock_schedule.assert_called_once_with(hook.pk)
+
     def test_editor_access(self):
         hook = self._create_hook()
 
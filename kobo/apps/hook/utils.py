@@ -1,6 +1,6 @@
 # coding: utf-8
+from .delivery import schedule_delivery
 from .models.hook_log import HookLog
-from .tasks import service_definition_task
 
 
 class HookUtils:
@@ -8,7 +8,9 @@ class HookUtils:
     @staticmethod
     def call_services(asset: 'kpi.models.asset.Asset', submission_id: int):
         """
-        Delegates to Celery data submission to remote servers
+        Delegates to Celery data submission to remote servers.
+        Submissions are queued as pending logs and sent in batch by
+        `deliver_pending_logs_task`.
         """
         # Retrieve `Hook` ids, to send data to their respective endpoint.
         hooks_ids = (
@@ -25,8 +27,11 @@ class HookUtils:
                 submission_id=submission_id, hook_id=hook_id
             ).exists():
                 success = True
-                service_definition_task.apply_async(
-                    queue='kpi_low_priority_queue', args=(hook_id, submission_id)
-                )
+                # The pending log queues the submission until the hook
+                # delivers it. It is not a try, `tries` is left untouched.
+                HookLog(
+                    hook_id=hook_id, submission_id=submission_id
+                ).save(reset_status=True)
+                schedule_delivery(hook_id)
 
         return success
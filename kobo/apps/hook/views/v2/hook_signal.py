@@ -8,7 +8,7 @@ from rest_framework_extensions.mixins import NestedViewSetMixin
 
 
 from kobo.apps.hook.utils import HookUtils
-from kpi.models import Asset
+from kpi.models import Asset, PairedData
 from kpi.utils.viewset_mixins import AssetNestedObjectViewsetMixin
 
 
@@ -19,6 +19,8 @@ class HookSignalViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
     This endpoint is only used to trigger asset's hooks if any.
 
     Tells the hooks to post an instance to external servers.
+    If asset shares its data, XML files of paired projects are also
+    regenerated in background.
     <pre class="prettyprint">
     <b>POST</b> /api/v2/assets/<code>{uid}</code>/hook-signal/
     </pre>
@@ -41,7 +43,8 @@ class HookSignalViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
 
     def create(self, request, *args, **kwargs):
         """
-        It's only used to trigger hook services of the Asset (so far).
+        It's only used to trigger hook services of the Asset and to refresh
+        paired data (so far).
 
         :param request:
         :return:
@@ -63,7 +66,14 @@ class HookSignalViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
         if not (submission and int(submission['_id']) == submission_id):
             raise Http404
 
-        if HookUtils.call_services(self.asset, submission_id):
+        paired_data_refresh = self.asset.data_sharing.get('enabled', False)
+        if paired_data_refresh:
+            PairedData.schedule_refresh(self.asset.uid)
+
+        if (
+            HookUtils.call_services(self.asset, submission_id)
+            or paired_data_refresh
+        ):
             # Follow Open Rosa responses by default
             response_status_code = status.HTTP_202_ACCEPTED
             response = {
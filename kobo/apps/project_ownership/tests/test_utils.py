@@ -0,0 +1,185 @@
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from mock import MagicMock, patch
+
+from kpi.deployment_backends.kc_access.shadow_models import KobocatAttachment
+from kpi.models import Asset, AssetFile
+from kpi.utils.hash import calculate_hash
+from ..models import (
+    Invite,
+    Transfer,
+    TransferStatusChoices,
+    TransferStatusTypeChoices,
+)
+from ..utils import move_attachments, move_media_files
+
+
+@override_settings(PROJECT_OWNERSHIP_FILE_MOVE_BATCH_SIZE=2)
+class ProjectOwnershipFileMoveTestCase(TestCase):
+    """
+    Files are moved by batches of 2, to cover several batches with a few
+    files
+    """
+
+    fixtures = ['test_data']
+
+    def setUp(self):
+        User = get_user_model()  # noqa
+        self.someuser = User.objects.get(username='someuser')
+        self.anotheruser = User.objects.get(username='anotheruser')
+        self.asset = Asset.objects.create(
+            content={
+                'survey': [
+                    {'type': 'text', 'label': 'q1', 'name': 'q1'},
+                ]
+            },
+            owner=self.someuser,
+            asset_type='survey',
+        )
+        self.media_files = []
+        for i in range(3):
+            media_file = AssetFile(
+                asset=self.asset,
+                user=self.someuser,
+                file_type=AssetFile.FORM_MEDIA,
+            )
+            media_file.content = ContentFile(
+                f'media {i}'.encode(), name=f'media_{i}.txt'
+            )
+            media_file.save()
+            self.media_files.append(media_file)
+
+        invite = Invite.objects.create(
+            sender=self.someuser, recipient=self.anotheruser
+        )
+        self.transfer = Transfer.objects.create(
+            invite=invite, asset=self.asset
+        )
+        # Files are moved once the project belongs to its new owner
+        Asset.objects.filter(pk=self.asset.pk).update(owner=self.anotheruser)
+        self.asset.owner = self.anotheruser
+        self.paths_to_delete = []
+
+    def tearDown(self):
+        for storage, path in self.paths_to_delete:
+            if storage.exists(path):
+                storage.delete(path)
+
+    def test_move_media_files(self):
+        old_paths = [
+            media_file.content.name for media_file in self.media_files
+        ]
+        new_paths = [
+            path.replace('someuser/', 'anotheruser/', 1) for path in old_paths
+        ]
+        self.paths_to_delete.extend(
+            (default_storage, path) for path in old_paths + new_paths
+        )
+
+        move_media_files(self.transfer)
+
+        for media_file, old_path, new_path in zip(
+            self.media_files, old_paths, new_paths
+        ):
+            media_file.refresh_from_db()
+            assert media_file.content.name == new_path
+            assert not default_storage.exists(old_path)
+            with default_storage.open(new_path, 'rb') as f:
+                assert media_file.metadata['hash'] == calculate_hash(
+                    f.read(), prefix=True
+                )
+
+        assert self.transfer.statuses.get(
+            status_type=TransferStatusTypeChoices.MEDIA_FILES
+        ).status == TransferStatusChoices.SUCCESS
+
+    def test_resume_move_media_files(self):
+        old_paths = [
+            media_file.content.name for media_file in self.media_files
+        ]
+        new_paths = [
+            path.replace('someuser/', 'anotheruser/', 1) for path in old_paths
+        ]
+        self.paths_to_delete.extend(
+            (default_storage, path) for path in old_paths + new_paths
+        )
+        # A previous run moved the first file but stopped before saving its
+        # new path
+        with default_storage.open(old_paths[0], 'rb') as f:
+            default_storage.save(new_paths[0], f)
+        default_storage.delete(old_paths[0])
+
+        move_media_files(self.transfer)
+
+        for media_file, new_path in zip(self.media_files, new_paths):
+            media_file.refresh_from_db()
+            assert media_file.content.name == new_path
+            assert default_storage.exists(new_path)
+
+    def test_move_attachments(self):
+        self._test_move_attachments(resume=False)
+
+    def test_resume_move_attachments(self):
+        self._test_move_attachments(resume=True)
+
+    def _test_move_attachments(self, resume: bool):
+        self.asset.deploy(backend='mock', active=True)
+        self.asset.deployment.mock_submissions(
+            [{'_id': i + 1} for i in range(3)]
+        )
+        self.transfer.statuses.filter(
+            status_type=TransferStatusTypeChoices.SUBMISSIONS
+        ).update(status=TransferStatusChoices.SUCCESS)
+
+        # KoBoCAT tables do not exist in tests. Attachments only live in
+        # memory, their files in the KoBoCAT storage.
+        storage = KobocatAttachment._meta.get_field('media_file').storage
+        folder = f'someuser/attachments/{uuid.uuid4().hex}'
+        attachments = []
+        for i in range(3):
+            path = storage.save(
+                f'{folder}/attachment_{i}.txt', ContentFile(b'attachment')
+            )
+            attachments.append(KobocatAttachment(pk=i + 1, media_file=path))
+        old_paths = [attachment.media_file.name for attachment in attachments]
+        new_paths = [
+            path.replace('someuser/', 'anotheruser/', 1) for path in old_paths
+        ]
+        self.paths_to_delete.extend(
+            (storage, path) for path in old_paths + new_paths
+        )
+        if resume:
+            # A previous run moved the first file but stopped before saving
+            # its new path
+            with storage.open(old_paths[0], 'rb') as f:
+                storage.save(new_paths[0], f)
+            storage.delete(old_paths[0])
+
+        queryset = MagicMock()
+        queryset.iterator.return_value = iter(attachments)
+        with patch.object(KobocatAttachment, 'all_objects') as all_objects:
+            all_objects.filter.return_value.exclude.return_value = queryset
+            move_attachments(self.transfer)
+
+        # New paths are saved once per batch
+        updated_attachments = [
+            call.args[0] for call in all_objects.bulk_update.call_args_list
+        ]
+        assert [len(batch) for batch in updated_attachments] == [2, 1]
+        assert [
+            attachment.media_file.name
+            for batch in updated_attachments
+            for attachment in batch
+        ] == new_paths
+        for old_path, new_path in zip(old_paths, new_paths):
+            assert not storage.exists(old_path)
+            assert storage.exists(new_path)
+
+        assert self.transfer.statuses.get(
+            status_type=TransferStatusTypeChoices.ATTACHMENTS
+        ).status == TransferStatusChoices.SUCCESS
+
@@ -1,13 +1,16 @@
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
 
 from django.apps import apps
+from django.conf import settings
 from django.utils import timezone
 
 from kpi.deployment_backends.kc_access.shadow_models import (
     KobocatAttachment,
     KobocatMetadata,
 )
+from kpi.fields.file import ExtendedFieldFile
 from kpi.models.asset import AssetFile
 from .models.choices import TransferStatusChoices, TransferStatusTypeChoices
 from .exceptions import AsyncTaskException
@@ -59,28 +62,43 @@ def move_attachments(transfer: 'project_ownership.Transfer'):
         instance_id__in=submission_ids
     ).exclude(media_file__startswith=f'{transfer.asset.owner.username}/')
 
-    for attachment in attachments.iterator():
-        # Pretty slow but it should run in celery task. We want to be the
-        # path of the file is saved right away. It lets us resume when it stopped
-        # in case of failure.
+    # Retrieved here to avoid querying the database from worker threads
+    sender_username = transfer.invite.sender.username
+    recipient_username = transfer.invite.recipient.username
+
+    def _move_attachment(attachment: KobocatAttachment) -> bool:
         if not (
             target_folder := get_target_folder(
-                transfer.invite.sender.username,
-                transfer.invite.recipient.username,
+                sender_username,
+                recipient_username,
                 attachment.media_file.name,
             )
         ):
-            continue
-        else:
-            attachment.media_file.move(target_folder)
-            attachment.save(update_fields=['media_file'])
-
-            # We only need to update `date_modified` to update task heart beat.
-            # No need to use `TransferStatus.update_status()` and
-            # its lock mechanism.
-            transfer.statuses.filter(status_type=async_task_type).update(
-                date_modified=timezone.now()
+            return False
+
+        return _move_file(attachment.media_file, target_folder)
+
+    batch_size = settings.PROJECT_OWNERSHIP_FILE_MOVE_BATCH_SIZE
+    with ThreadPoolExecutor(
+        max_workers=settings.PROJECT_OWNERSHIP_FILE_MOVE_MAX_WORKERS
+    ) as executor:
+        for batch in _get_batches(
+            attachments.iterator(chunk_size=batch_size), batch_size
+        ):
+            # Files are moved concurrently, then the new paths of the whole
+            # batch are saved at once. It lets us resume when it stopped in
+            # case of failure.
+            moved_attachments = [
+                attachment
+                for attachment, moved in zip(
+                    batch, executor.map(_move_attachment, batch)
+                )
+                if moved
+            ]
+            KobocatAttachment.all_objects.bulk_update(
+                moved_attachments, ['media_file']
             )
+            _update_heartbeat(transfer, async_task_type)
 
     _mark_task_as_successful(transfer, async_task_type)
 
@@ -102,41 +120,70 @@ def move_media_files(transfer: 'project_ownership.Transfer'):
             )
         }
 
-    for media_file in media_files:
+    # Retrieved here to avoid querying the database from worker threads
+    sender_username = transfer.invite.sender.username
+    recipient_username = transfer.invite.recipient.username
+
+    def _move_media_file(
+        media_file: AssetFile, kc_obj: Optional[KobocatMetadata]
+    ) -> tuple[bool, bool]:
+        """
+        Return whether `media_file` and `kc_obj` have been moved.
+        """
         if not (
             target_folder := get_target_folder(
-                transfer.invite.sender.username,
-                transfer.invite.recipient.username,
+                sender_username,
+                recipient_username,
                 media_file.content.name,
             )
         ):
-            continue
-        else:
-            # Pretty slow but it should run in celery task. We want to be sure the
-            # path of the file is saved right away. It lets us resume when it stopped
-            # in case of failure.
-            media_file.content.move(target_folder)
-            old_md5 = media_file.metadata.pop('hash', None)
-            media_file.set_md5_hash()
-            if old_md5 in kc_files.keys():
-                kc_obj = kc_files[old_md5]
-                if kc_target_folder := get_target_folder(
-                    transfer.invite.sender.username,
-                    transfer.invite.recipient.username,
-                    kc_obj.data_file.name,
-                ):
-                    kc_obj.data_file.move(kc_target_folder)
-                    kc_obj.file_hash = media_file.md5_hash
-                    kc_obj.save(update_fields=['data_file', 'file_hash'])
-
-            media_file.save(update_fields=['content', 'metadata'])
-
-        # We only need to update `date_modified` to update task heart beat.
-        # No need to use `TransferStatus.update_status()` and
-        # its lock mechanism.
-        transfer.statuses.filter(status_type=async_task_type).update(
-            date_modified=timezone.now()
-        )
+            return False, False
+
+        _move_file(media_file.content, target_folder)
+        media_file.metadata.pop('hash', None)
+        media_file.set_md5_hash()
+        if not kc_obj:
+            return True, False
+
+        if kc_target_folder := get_target_folder(
+            sender_username,
+            recipient_username,
+            kc_obj.data_file.name,
+        ):
+            _move_file(kc_obj.data_file, kc_target_folder)
+            kc_obj.file_hash = media_file.md5_hash
+            return True, True
+
+        return True, False
+
+    batch_size = settings.PROJECT_OWNERSHIP_FILE_MOVE_BATCH_SIZE
+    with ThreadPoolExecutor(
+        max_workers=settings.PROJECT_OWNERSHIP_FILE_MOVE_MAX_WORKERS
+    ) as executor:
+        for batch in _get_batches(media_files.iterator(), batch_size):
+            # Match KoBoCAT files before moving anything. Each of them is
+            # moved only once, even if several media files share its hash.
+            kc_objs = [
+                kc_files.pop(media_file.metadata.get('hash'), None)
+                for media_file in batch
+            ]
+            moved_media_files = []
+            moved_kc_objs = []
+            for media_file, kc_obj, (media_file_moved, kc_obj_moved) in zip(
+                batch, kc_objs, executor.map(_move_media_file, batch, kc_objs)
+            ):
+                if media_file_moved:
+                    moved_media_files.append(media_file)
+                if kc_obj_moved:
+                    moved_kc_objs.append(kc_obj)
+
+            KobocatMetadata.objects.bulk_update(
+                moved_kc_objs, ['data_file', 'file_hash']
+            )
+            AssetFile.objects.bulk_update(
+                moved_media_files, ['content', 'metadata']
+            )
+            _update_heartbeat(transfer, async_task_type)
 
     _mark_task_as_successful(transfer, async_task_type)
 
@@ -166,3 +213,45 @@ def _mark_task_as_successful(
     TransferStatus.update_status(
         transfer.pk, TransferStatusChoices.SUCCESS, async_task_type
     )
+
+
+def _get_batches(iterable: Iterable, batch_size: int) -> Iterator[list]:
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _move_file(field_file: ExtendedFieldFile, target_folder: str) -> bool:
+    """
+    Move `field_file` to `target_folder` and return whether it succeeded.
+
+    If a previous run moved the file but stopped before saving its new path,
+    the file is not found anymore at its old path. Its name is updated to
+    the new path instead.
+    """
+    if field_file.move(target_folder):
+        return True
+
+    new_path = f'{target_folder}/{os.path.basename(field_file.name)}'
+    storage = field_file.storage
+    if storage.exists(new_path) and not storage.exists(field_file.name):
+        field_file.name = new_path
+        return True
+
+    return False
+
+
+def _update_heartbeat(
+    transfer: 'project_ownership.Transfer', async_task_type: str
+):
+    # We only need to update `date_modified` to update task heart beat.
+    # No need to use `TransferStatus.update_status()` and
+    # its lock mechanism.
+    transfer.statuses.filter(status_type=async_task_type).update(
+        date_modified=timezone.now()
+    )
@@ -11,3 +11,6 @@ DEFAULT_REPORTS_KEY = 'default'
 FUZZY_VERSION_ID_KEY = '_version_'
 FUZZY_VERSION_PATTERN = r'^__?version__?(\d{3})?$'
 INFERRED_VERSION_ID_KEY = '__inferred_version__'
+# Version keys retrieved when submissions are limited to some fields, along
+# with the fields of the form versions matching `FUZZY_VERSION_PATTERN`
+VERSION_ID_KEYS = ['__version__', '_version_']
@@ -1,7 +1,9 @@
 # coding: utf-8
-from collections import OrderedDict
+import re
+from collections import Counter, OrderedDict
 from copy import deepcopy
 
+from django.conf import settings
 from django.utils.translation import gettext as t
 from rest_framework import serializers
 from formpack import FormPack
@@ -9,7 +11,9 @@ from formpack import FormPack
 from kpi.utils.log import logging
 from .constants import (
     FUZZY_VERSION_ID_KEY,
+    FUZZY_VERSION_PATTERN,
     INFERRED_VERSION_ID_KEY,
+    VERSION_ID_KEYS,
 )
 
 
@@ -121,7 +125,23 @@ def _vnames(asset, cache=False):
 
 def data_by_identifiers(asset, field_names=None, submission_stream=None,
                         report_styles=None, lang=None, fields=None,
-                        split_by=None):
+                        split_by=None, user=None):
+    """
+    Return the report statistics of `asset`.
+
+    If `user` is provided instead of `submission_stream`, statistics cover
+    the submissions `user` is allowed to access, and values are counted by
+    MongoDB when possible (see `get_stats()`).
+    """
+    if user is not None and submission_stream is None:
+        # Submissions are only retrieved if `get_stats()` needs them. Until
+        # then, `fallback_paths` is empty.
+        fallback_paths = []
+        submission_stream = _get_lazy_submission_stream(
+            asset, user, fallback_paths
+        )
+    else:
+        user = None
     pack, submission_stream = build_formpack(asset, submission_stream)
     _all_versions = pack.versions.keys()
     report = pack.autoreport(versions=_all_versions)
@@ -174,10 +194,132 @@ def data_by_identifiers(asset, field_names=None, submission_stream=None,
             'style': specified_styles.get(identifier, {}),
         }
 
+    if user is not None:
+        # Besides `VERSION_ID_KEYS`, submissions may hold numbered version
+        # keys, e.g. `_version__001`, which are fields of some form versions.
+        # `_infer_version_id()` needs all of them.
+        fallback_paths.extend(
+            field.path
+            for field in fields_by_name.values()
+            if re.match(FUZZY_VERSION_PATTERN, field.path)
+            and field.path not in VERSION_ID_KEYS
+        )
+        # Same fields, in the same order, as `report.get_stats()` would
+        # return
+        requested_names = set(field_names)
+        fields = [
+            field for field in fields_by_name.values()
+            if field.has_stats
+            and (not requested_names or field.name in requested_names)
+        ]
+        if split_by:
+            fallback_paths.append(fields_by_name[split_by].path)
+        stats = get_stats(
+            asset,
+            user,
+            report,
+            fields,
+            submission_stream,
+            fallback_paths,
+            lang=lang,
+            split_by=split_by,
+        )
+    else:
+        stats = report.get_stats(
+            submission_stream,
+            fields=field_names,
+            lang=lang,
+            split_by=split_by,
+        )
+
     return [
-        _package_stat(*stat_tup, split_by=split_by) for
-        stat_tup in report.get_stats(submission_stream,
-                                     fields=field_names,
-                                     lang=lang,
-                                     split_by=split_by)
+        _package_stat(*stat_tup, split_by=split_by) for stat_tup in stats
     ]
+
+
+def get_stats(
+    asset,
+    user,
+    report,
+    fields,
+    submission_stream,
+    fallback_paths,
+    lang=None,
+    split_by=None,
+):
+    """
+    Return the same statistics of `fields` as `report.get_stats()`, without
+    streaming all the submissions through formpack when possible.
+
+    MongoDB counts the values of each field, and formpack computes the
+    statistics of the field from these counts, exactly as it does when it
+    counts them itself.
+
+    Fields whose values cannot be counted by MongoDB (i.e. whose values are
+    not scalars), and reports split by a question, fall back on formpack.
+    In that case, `submission_stream` only retrieves the fields listed in
+    `fallback_paths`.
+    """
+    field_names = [field.name for field in fields]
+
+    if split_by or not settings.REPORTS_AGGREGATION_ENABLED:
+        fallback_paths.extend(field.path for field in fields)
+        return report.get_stats(
+            submission_stream, fields=field_names, lang=lang, split_by=split_by
+        )
+
+    value_counts = asset.deployment.get_submission_value_counts(
+        user, [field.path for field in fields]
+    )
+
+    stats = []
+    fallback_fields = []
+    for field in fields:
+        # Build the counter formpack would have built while reading the
+        # submissions
+        metrics = Counter()
+        for value, count in value_counts[field.path]:
+            if value is None:
+                metrics[None] += count
+                continue
+            if isinstance(value, (list, dict)):
+                fallback_fields.append(field)
+                break
+            for parsed_value in field.parse_values(value):
+                metrics[parsed_value] += count
+            metrics['__submissions__'] += count
+        else:
+            stats.append(
+                (
+                    field,
+                    field.get_labels(lang)[0],
+                    field.get_stats(metrics, lang=lang),
+                )
+            )
+
+    if not fallback_fields:
+        return stats
+
+    fallback_paths.extend(field.path for field in fallback_fields)
+    stats.extend(
+        report.get_stats(
+            submission_stream,
+            fields=[field.name for field in fallback_fields],
+            lang=lang,
+        )
+    )
+    # Restore the order of the fields
+    return sorted(stats, key=lambda stat: field_names.index(stat[0].name))
+
+
+def _get_lazy_submission_stream(asset, user, fields):
+    """
+    Yield the submissions `user` is allowed to access, with only
+    `VERSION_ID_KEYS` and `fields`, which must include any other version key.
+    Submissions are retrieved on first iteration, thus `fields` can still be
+    completed after this function is called.
+    """
+    yield from asset.deployment.get_submissions(
+        user=user,
+        fields=VERSION_ID_KEYS + fields,
+    )
@@ -2,6 +2,7 @@
 
 import logging
 
+import storages.backends.s3 as upstream_s3
 import storages.backends.s3boto3 as upstream
 
 
@@ -32,6 +33,9 @@ class S3Boto3StorageFile(upstream.S3Boto3StorageFile):
 
 
 upstream.S3Boto3StorageFile = S3Boto3StorageFile
+# Since django-storages 1.14, `storages.backends.s3boto3` is only an alias
+# module and `S3Storage._open()` instantiates `storages.backends.s3.S3File`
+upstream_s3.S3File = S3Boto3StorageFile
 
 
 class S3Boto3Storage(upstream.S3Boto3Storage):
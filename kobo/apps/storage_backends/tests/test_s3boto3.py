@@ -0,0 +1,61 @@
+import io
+import os
+import shutil
+from unittest.mock import MagicMock, PropertyMock, patch
+
+from django.test import SimpleTestCase
+
+from kobo.apps.storage_backends.s3boto3 import (
+    S3Boto3Storage,
+    S3Boto3StorageFile,
+)
+
+
+class S3Boto3StorageFileTestCase(SimpleTestCase):
+
+    def test_chunked_copy_larger_than_buffer(self):
+        """
+        Copying a file by chunks (e.g. XLSX exports) uploads one part per
+        full buffer, and `tell()` keeps counting the bytes of uploaded parts
+        """
+        buffer_size = 1024
+        content = os.urandom(buffer_size * 5 // 2)
+        part_sizes = []
+
+        def upload(Body):  # noqa
+            part_sizes.append(len(Body))
+            return {'ETag': f'etag-{len(part_sizes)}'}
+
+        bucket = MagicMock()
+        s3_object = bucket.Object.return_value
+        s3_object.key = 'exports/export.xlsx'
+        multipart = s3_object.initiate_multipart_upload.return_value
+        multipart.Part.return_value.upload.side_effect = upload
+
+        with patch.object(
+            S3Boto3Storage, 'bucket', new_callable=PropertyMock
+        ) as bucket_mock:
+            bucket_mock.return_value = bucket
+            output_file = S3Boto3Storage().open('exports/export.xlsx', 'wb')
+        # `S3Storage._open()` instantiates the patched class
+        self.assertIsInstance(output_file, S3Boto3StorageFile)
+        output_file.buffer_size = buffer_size
+
+        shutil.copyfileobj(io.BytesIO(content), output_file, buffer_size)
+        # The last chunk is still buffered
+        self.assertEqual(part_sizes, [buffer_size, buffer_size])
+        self.assertEqual(output_file.tell(), len(content))
+
+        output_file.close()
+        self.assertEqual(
+            part_sizes, [buffer_size, buffer_size, buffer_size // 2]
+        )
+        multipart.complete.assert_called_once_with(
+            MultipartUpload={
+                'Parts': [
+                    {'ETag': 'etag-1', 'PartNumber': 1},
+                    {'ETag': 'etag-2', 'PartNumber': 2},
+                    {'ETag': 'etag-3', 'PartNumber': 3},
+                ]
+            }
+        )
@@ -1,5 +1,4 @@
 from kobo.apps.subsequences.models import SubmissionExtras
-from kobo.apps.subsequences.utils import stream_with_extras
 
 from kobo.apps.reports.report_data import build_formpack
 
@@ -17,7 +16,6 @@ def run():
     submission_stream = asset.deployment.get_submissions(
         user=user,
     )
-    submission_stream = stream_with_extras(submission_stream, asset)
     _fields_from_all_versions = False #?
     pack, submission_stream = build_formpack(
         asset, submission_stream, _fields_from_all_versions
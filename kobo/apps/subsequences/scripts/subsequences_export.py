@@ -1,7 +1,6 @@
 from kpi.models import Asset
 
 from kobo.apps.subsequences.models import SubmissionExtras
-from kobo.apps.subsequences.utils import stream_with_extras
 
 from kobo.apps.reports.report_data import build_formpack
 
@@ -13,9 +12,6 @@ def run_on_asset(asset):
         # query=query,
     )
 
-    if asset.has_advanced_features:
-        submission_stream = stream_with_extras(submission_stream, asset)
-
     pack, submission_stream = build_formpack(
         asset, submission_stream, True,
     )
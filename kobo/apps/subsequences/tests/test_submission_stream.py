@@ -1,8 +1,9 @@
 import json
 from copy import deepcopy
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from kobo.apps.subsequences.models import SubmissionExtras
 from kobo.apps.subsequences.utils import stream_with_extras
@@ -241,3 +242,53 @@ class TestSubmissionStream(TestCase):
         assert '_supplementalDetails' in output[0]
         assert '_supplementalDetails' in output[1]
         # test other things?
+
+    def test_get_submissions_includes_supplemental_details(self):
+        submissions = self.asset.deployment.get_submissions(
+            user=self.asset.owner
+        )
+        supplemental_details = submissions[0]['_supplementalDetails']
+        qual_responses = supplemental_details['Tell_me_a_story']['qual']
+        # Qualitative analysis responses are expanded only once
+        assert qual_responses[1]['val'] == [
+            {
+                'uuid': '7e31c6a5-5eac-464c-970c-62c383546a94',
+                'labels': {'_default': 'Public event'},
+            }
+        ]
+
+    def test_submission_stream_fetches_extras_by_batch(self):
+        def mock_submission_stream():
+            yield {'_uuid': '1c05898e-b43c-491d-814c-79595eb84e81'}
+            yield {'_uuid': 'aaa'}
+            yield {'_uuid': 'bbb'}
+
+        with self.assertNumQueries(2):
+            output = list(
+                stream_with_extras(
+                    mock_submission_stream(), self.asset, batch_size=2
+                )
+            )
+
+        assert len(output) == 3
+        assert 'Tell_me_a_story' in output[0]['_supplementalDetails']
+        assert output[1]['_supplementalDetails'] == {}
+        assert output[2]['_supplementalDetails'] == {}
+
+    @override_settings(SUBMISSION_EXTRAS_BATCH_SIZE=500)
+    def test_get_submissions_fetches_extras_by_page(self):
+        with patch(
+            'kpi.deployment_backends.base_backend.stream_with_extras',
+            wraps=stream_with_extras,
+        ) as patched_stream_with_extras:
+            self.asset.deployment.get_submissions(
+                user=self.asset.owner, limit=30
+            )
+            assert (
+                patched_stream_with_extras.call_args.kwargs['batch_size'] == 30
+            )
+
+            self.asset.deployment.get_submissions(user=self.asset.owner)
+            assert (
+                patched_stream_with_extras.call_args.kwargs['batch_size'] == 500
+            )
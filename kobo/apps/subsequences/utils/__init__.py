@@ -1,5 +1,9 @@
 from collections import defaultdict
 from copy import deepcopy
+from itertools import islice
+
+from django.conf import settings
+
 from ..actions.automatic_transcription import AutomaticTranscriptionAction
 from ..actions.translation import TranslationAction
 from ..actions.qual import QualAction
@@ -120,10 +124,19 @@ def get_jsonschema(action_instances=(), url=None):
 
 SUPPLEMENTAL_DETAILS_KEY = '_supplementalDetails'
 
-def stream_with_extras(submission_stream, asset):
-    extras = dict(
-        asset.submission_extras.values_list('submission_uuid', 'content')
-    )
+def stream_with_extras(submission_stream, asset, batch_size=None):
+    """
+    Yield each submission of `submission_stream` with its supplemental details
+    (e.g. transcripts, translations, qualitative analysis) merged into
+    `SUPPLEMENTAL_DETAILS_KEY`.
+
+    Submissions are read by batches of `batch_size` (defaults to
+    `settings.SUBMISSION_EXTRAS_BATCH_SIZE`) and only the extras of each
+    batch are fetched from the database, with one `IN` query.
+    """
+    if not batch_size:
+        batch_size = settings.SUBMISSION_EXTRAS_BATCH_SIZE
+
     try:
         qual_survey = asset.advanced_features['qual']['qual_survey']
     except KeyError:
@@ -145,50 +158,77 @@ def stream_with_extras(submission_stream, asset):
                 c['uuid']: c for c in choices
             }
         qual_questions_by_uuid[qual_q['uuid']] = qual_q
-    for submission in submission_stream:
-        if SUBMISSION_UUID_FIELD in submission:
-            uuid = submission[SUBMISSION_UUID_FIELD]
-        else:
-            uuid = submission['_uuid']
-        all_supplemental_details = extras.get(uuid, {})
-        for qpath, supplemental_details in all_supplemental_details.items():
+
+    submission_stream = iter(submission_stream)
+    while True:
+        submissions = list(islice(submission_stream, batch_size))
+        if not submissions:
+            break
+
+        uuids = [_get_submission_uuid(submission) for submission in submissions]
+        extras = dict(
+            asset.submission_extras.filter(
+                submission_uuid__in=uuids
+            ).values_list('submission_uuid', 'content')
+        )
+        for uuid, submission in zip(uuids, submissions):
+            all_supplemental_details = extras.get(uuid, {})
+            _expand_qual_responses(
+                all_supplemental_details,
+                qual_questions_by_uuid,
+                qual_choices_per_question_by_uuid,
+            )
+            submission[SUPPLEMENTAL_DETAILS_KEY] = all_supplemental_details
+            yield submission
+
+
+def _expand_qual_responses(
+    all_supplemental_details,
+    qual_questions_by_uuid,
+    qual_choices_per_question_by_uuid,
+):
+    for qpath, supplemental_details in all_supplemental_details.items():
+        try:
+            all_qual_responses = supplemental_details['qual']
+        except KeyError:
+            continue
+        for qual_response in all_qual_responses:
             try:
-                all_qual_responses = supplemental_details['qual']
+                qual_q = qual_questions_by_uuid[qual_response['uuid']]
             except KeyError:
+                # TODO: make sure this can never happen by refusing to
+                # remove qualitative analysis questions once added. They
+                # should simply be hidden
+                qual_response['error'] = 'unknown question'
                 continue
-            for qual_response in all_qual_responses:
-                try:
-                    qual_q = qual_questions_by_uuid[qual_response['uuid']]
-                except KeyError:
-                    # TODO: make sure this can never happen by refusing to
-                    # remove qualitative analysis questions once added. They
-                    # should simply be hidden
-                    qual_response['error'] = 'unknown question'
-                    continue
-                qual_q = deepcopy(qual_q)
-                choices = qual_q.pop('choices', None)
-                if choices:
-                    val = qual_response['val']
-                    if isinstance(val, list):
-                        single_choice = False
-                    else:
-                        single_choice = True
-                        val = [val]
-                    val_expanded = []
-                    for v in val:
-                        try:
-                            v_ex = qual_choices_per_question_by_uuid[
-                                qual_q['uuid']
-                            ][v]
-                        except KeyError:
-                            # TODO: make sure this can never happen by refusing
-                            # to remove qualitative analysis *choices* once
-                            # added. They should simply be hidden
-                            v_ex = {'uuid': v, 'error': 'unknown choice'}
-                        val_expanded.append(v_ex)
-                    if single_choice:
-                        val_expanded = val_expanded[0]
-                    qual_response['val'] = val_expanded
-                qual_response.update(qual_q)
-        submission[SUPPLEMENTAL_DETAILS_KEY] = all_supplemental_details
-        yield submission
+            qual_q = deepcopy(qual_q)
+            choices = qual_q.pop('choices', None)
+            if choices:
+                val = qual_response['val']
+                if isinstance(val, list):
+                    single_choice = False
+                else:
+                    single_choice = True
+                    val = [val]
+                val_expanded = []
+                for v in val:
+                    try:
+                        v_ex = qual_choices_per_question_by_uuid[
+                            qual_q['uuid']
+                        ][v]
+                    except KeyError:
+                        # TODO: make sure this can never happen by refusing
+                        # to remove qualitative analysis *choices* once
+                        # added. They should simply be hidden
+                        v_ex = {'uuid': v, 'error': 'unknown choice'}
+                    val_expanded.append(v_ex)
+                if single_choice:
+                    val_expanded = val_expanded[0]
+                qual_response['val'] = val_expanded
+            qual_response.update(qual_q)
+
+
+def _get_submission_uuid(submission):
+    if SUBMISSION_UUID_FIELD in submission:
+        return submission[SUBMISSION_UUID_FIELD]
+    return submission['_uuid']
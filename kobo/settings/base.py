@@ -791,6 +791,59 @@ CAN_LOGIN_AS = lambda request, target_user: request.user.is_superuser
 # endpoint. This overrides any `?limit=` query parameter sent by a client
 SUBMISSION_LIST_LIMIT = 30000
 
+# How long (in seconds) submission counts requested with
+# `?count_strategy=cached` are kept in cache. Counts are also invalidated
+# whenever a new submission is received, or submissions are altered through
+# KPI
+SUBMISSION_COUNT_CACHE_TIMEOUT = env.int('SUBMISSION_COUNT_CACHE_TIMEOUT', 300)
+
+# Supplemental details (transcripts, translations, etc.) are fetched from the
+# database for this many submissions at a time. Paginated requests of the
+# submission list endpoint fetch them one page at a time instead.
+SUBMISSION_EXTRAS_BATCH_SIZE = env.int('SUBMISSION_EXTRAS_BATCH_SIZE', 1000)
+
+# Let MongoDB count the values of each question of project reports instead of
+# streaming all submissions through formpack. Reports split by a question
+# still use formpack.
+REPORTS_AGGREGATION_ENABLED = env.bool('REPORTS_AGGREGATION_ENABLED', True)
+
+# Values counted for reports are kept in cache for this many seconds. Until
+# then, only submissions received since are counted on each request. The cache
+# is discarded when submissions are edited or deleted, and when the form is
+# redeployed
+REPORTS_STATS_CACHE_TIMEOUT = env.int('REPORTS_STATS_CACHE_TIMEOUT', 86400)
+
+# When a folder is deleted from S3 or Azure storage (e.g. files of a deleted
+# account), its objects are deleted by batches, with up to this many batches
+# at the same time
+STORAGE_BULK_DELETE_MAX_WORKERS = env.int('STORAGE_BULK_DELETE_MAX_WORKERS', 4)
+
+# When a project is transferred to another user, its files are moved to the
+# new owner's folder by batches of this many files, with up to
+# `PROJECT_OWNERSHIP_FILE_MOVE_MAX_WORKERS` files at the same time. New paths
+# are saved, and the task heartbeat is updated, after each batch
+PROJECT_OWNERSHIP_FILE_MOVE_BATCH_SIZE = env.int(
+    'PROJECT_OWNERSHIP_FILE_MOVE_BATCH_SIZE', 100
+)
+PROJECT_OWNERSHIP_FILE_MOVE_MAX_WORKERS = env.int(
+    'PROJECT_OWNERSHIP_FILE_MOVE_MAX_WORKERS', 8
+)
+
+# Bulk edits of more submissions than this threshold are processed in the
+# background. Their progress can be retrieved with the job uid returned by the
+# bulk endpoint. Up to `SUBMISSION_BULK_UPDATE_MAX_WORKERS` submissions are
+# sent to KoBoCAT at the same time; it should not exceed
+# `KOBOCAT_REQUEST_POOL_MAXSIZE`.
+SUBMISSION_BULK_UPDATE_ASYNC_THRESHOLD = env.int(
+    'SUBMISSION_BULK_UPDATE_ASYNC_THRESHOLD', 100
+)
+SUBMISSION_BULK_UPDATE_MAX_WORKERS = env.int(
+    'SUBMISSION_BULK_UPDATE_MAX_WORKERS', 5
+)
+SUBMISSION_BULK_UPDATE_JOB_TIMEOUT = env.int(
+    'SUBMISSION_BULK_UPDATE_JOB_TIMEOUT', 60 * 60 * 24
+)
+
 # uWSGI, NGINX, etc. allow only a limited amount of time to process a request.
 # Set this value to match their limits
 SYNCHRONOUS_REQUEST_TIME_LIMIT = 120  # seconds
@@ -798,6 +851,11 @@ SYNCHRONOUS_REQUEST_TIME_LIMIT = 120  # seconds
 # REMOVE the oldest if a user exceeds this many exports for a particular form
 MAXIMUM_EXPORTS_PER_USER_PER_FORM = 10
 
+# Asynchronous CSV exports of projects with more submissions than this are
+# split into chunks of this size, rendered in parallel by Celery subtasks and
+# then merged. Set to 0 to disable.
+EXPORT_CHUNK_SIZE = env.int('EXPORT_CHUNK_SIZE', 50000)
+
 # Private media file configuration
 PRIVATE_STORAGE_ROOT = os.path.join(BASE_DIR, 'media')
 PRIVATE_STORAGE_AUTH_FUNCTION = \
@@ -934,6 +992,18 @@ KOBOCAT_OLD_URL = os.environ.get('KOBOCAT_OLD_URL')
 KOBOCAT_INTERNAL_URL = os.environ.get('KOBOCAT_INTERNAL_URL',
                                       'http://kobocat')
 
+# Requests to KoBoCAT share a pool of keep-alive connections per process.
+# Idempotent requests are retried with an exponential backoff
+# (`KOBOCAT_REQUEST_RETRY_BACKOFF_FACTOR` * 2 ** retry number, in seconds).
+KOBOCAT_REQUEST_POOL_CONNECTIONS = env.int('KOBOCAT_REQUEST_POOL_CONNECTIONS', 10)
+KOBOCAT_REQUEST_POOL_MAXSIZE = env.int('KOBOCAT_REQUEST_POOL_MAXSIZE', 10)
+KOBOCAT_REQUEST_RETRIES = env.int('KOBOCAT_REQUEST_RETRIES', 3)
+KOBOCAT_REQUEST_RETRY_BACKOFF_FACTOR = env.float(
+    'KOBOCAT_REQUEST_RETRY_BACKOFF_FACTOR', 0.5
+)
+KOBOCAT_REQUEST_CONNECT_TIMEOUT = env.float('KOBOCAT_REQUEST_CONNECT_TIMEOUT', 5)
+KOBOCAT_REQUEST_READ_TIMEOUT = env.float('KOBOCAT_REQUEST_READ_TIMEOUT', 300)
+
 KOBOFORM_URL = os.environ.get('KOBOFORM_URL', 'http://kpi')
 
 if 'KOBOCAT_URL' in os.environ:
@@ -1074,6 +1144,12 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(hour=0, minute=0),
         'options': {'queue': 'kpi_low_priority_queue'},
     },
+    # Schedule every 15 minutes
+    'deliver-hooks-stale-pending-logs': {
+        'task': 'kobo.apps.hook.tasks.deliver_stale_pending_logs_task',
+        'schedule': crontab(minute='*/15'),
+        'options': {'queue': 'kpi_low_priority_queue'},
+    },
     # Schedule every 30 minutes
     'trash-bin-garbage-collector': {
         'task': 'kobo.apps.trash_bin.tasks.garbage_collector',
@@ -1449,6 +1525,35 @@ CACHES = {
     ),
 }
 
+# Share object permissions of assets between requests (and processes) with
+# the cache `OBJECT_PERMISSION_CACHE_ALIAS`. Each asset has a version which is
+# bumped any time its permissions change. The cache must be shared by all
+# KPI processes (e.g. Redis), unless only one process is running. The versions
+# of all other cached asset data (see `kpi.utils.cache.get_versions()`) live
+# in the same cache.
+OBJECT_PERMISSION_CACHE_ENABLED = env.bool(
+    'OBJECT_PERMISSION_CACHE_ENABLED', False
+)
+OBJECT_PERMISSION_CACHE_ALIAS = env.str(
+    'OBJECT_PERMISSION_CACHE_ALIAS', 'default'
+)
+OBJECT_PERMISSION_CACHE_TIMEOUT = env.int(
+    'OBJECT_PERMISSION_CACHE_TIMEOUT', 60 * 60  # 1 hour
+)
+# Keep the ids of the assets each user can list in the same cache, instead of
+# gathering them from owned, shared and subscribed assets on each request.
+# Versions are bumped by permission and subscription changes. Public assets are
+# cached once for all users.
+ACCESSIBLE_ASSETS_CACHE_ENABLED = env.bool(
+    'ACCESSIBLE_ASSETS_CACHE_ENABLED', False
+)
+# How long (in seconds) to cache the metadata (i.e. search facets) of asset
+# lists per user and query string. `0` disables the cache.
+ASSET_METADATA_CACHE_TIMEOUT = env.int('ASSET_METADATA_CACHE_TIMEOUT', 0)
+# How long (in seconds) to cache the hash of assets each user can access
+# (see `/api/v2/assets/hash/`). `0` disables the cache.
+ASSET_HASH_CACHE_TIMEOUT = env.int('ASSET_HASH_CACHE_TIMEOUT', 0)
+
 # How long to retain cached responses for kpi endpoints
 ENDPOINT_CACHE_DURATION = env.int('ENDPOINT_CACHE_DURATION', 60 * 15)  # 15 minutes
 
@@ -1469,6 +1574,38 @@ OPEN_ROSA_DEFAULT_CONTENT_LENGTH = 10000000
 # Should match KoBoCAT setting
 PAIRED_DATA_EXPIRATION = 300  # seconds
 
+# Delay in sec. to wait for other submissions to come in before regenerating
+# paired data xml files of a source project in background
+PAIRED_DATA_REFRESH_DELAY = env.int('PAIRED_DATA_REFRESH_DELAY', 30)
+
+# Delay in sec. to wait for other changes before synchronizing paired data
+# of a project with KoBoCAT in background
+PAIRED_DATA_SYNC_DELAY = env.int('PAIRED_DATA_SYNC_DELAY', 10)
+
+# REST Services send submissions in batch. Delay in sec. to wait for other
+# submissions before sending them, and maximum number of submissions sent per
+# batch
+HOOK_DELIVERY_DELAY = env.int('HOOK_DELIVERY_DELAY', 5)
+HOOK_DELIVERY_BATCH_SIZE = env.int('HOOK_DELIVERY_BATCH_SIZE', 100)
+# Maximum number of requests sent at the same time to the endpoint of a hook
+HOOK_DELIVERY_MAX_IN_FLIGHT = env.int('HOOK_DELIVERY_MAX_IN_FLIGHT', 5)
+# Expiration time in sec. of the lock which prevents the submissions of a hook
+# from being delivered by several processes at the same time
+HOOK_DELIVERY_LOCK_TIMEOUT = env.int('HOOK_DELIVERY_LOCK_TIMEOUT', 1800)
+# Delay in sec. after which pending submissions which have not been delivered
+# yet are scheduled again, in case their delivery task has been lost
+HOOK_DELIVERY_STALE_DELAY = env.int('HOOK_DELIVERY_STALE_DELAY', 600)
+# Keep-alive connections to endpoints are pooled per host
+HOOK_REQUEST_POOL_CONNECTIONS = env.int('HOOK_REQUEST_POOL_CONNECTIONS', 10)
+HOOK_REQUEST_POOL_MAXSIZE = env.int('HOOK_REQUEST_POOL_MAXSIZE', 5)
+HOOK_REQUEST_TIMEOUT = env.float('HOOK_REQUEST_TIMEOUT', 30)
+
+# Expiration time in sec. of the lock which prevents a paired data xml file
+# from being regenerated by several processes at the same time
+PAIRED_DATA_REFRESH_LOCK_TIMEOUT = env.int(
+    'PAIRED_DATA_REFRESH_LOCK_TIMEOUT', 600
+)
+
 # Minimum size (in bytes) of files to allow fast calculation of hashes
 # Should match KoBoCAT setting
 HASH_BIG_FILE_SIZE_THRESHOLD = 0.5 * 1024 * 1024  # 512 kB
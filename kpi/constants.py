@@ -2,6 +2,21 @@
 SUBMISSION_FORMAT_TYPE_XML = "xml"
 SUBMISSION_FORMAT_TYPE_JSON = "json"
 
+SUBMISSION_COUNT_EXACT = 'exact'
+SUBMISSION_COUNT_ESTIMATED = 'estimated'
+SUBMISSION_COUNT_CACHED = 'cached'
+SUBMISSION_COUNT_NONE = 'none'
+SUBMISSION_COUNT_STRATEGIES = (
+    SUBMISSION_COUNT_EXACT,
+    SUBMISSION_COUNT_ESTIMATED,
+    SUBMISSION_COUNT_CACHED,
+    SUBMISSION_COUNT_NONE,
+)
+
+# Not part of formpack export settings: asks for an export which appends new
+# submissions to the result of the previous export with the same settings
+EXPORT_SETTING_INCREMENTAL = 'incremental'
+
 GEO_QUESTION_TYPES = ('geopoint', 'geotrace', 'geoshape')
 ATTACHMENT_QUESTION_TYPES = (
     'audit',
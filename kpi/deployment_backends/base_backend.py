@@ -6,24 +6,38 @@ import copy
 import datetime
 import json
 import os
+import queue
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from contextlib import contextmanager
 from typing import Union, Iterator, Optional
 
 from bson import json_util
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage
+from django.db import connections
 from django.db.models.query import QuerySet
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as t
 from django.core.exceptions import PermissionDenied
-from rest_framework import serializers
+from rest_framework import serializers, status
 from rest_framework.reverse import reverse
 from rest_framework.pagination import _positive_int as positive_int
 from shortuuid import ShortUUID
 
+from kobo.apps.subsequences.utils import (
+    SUBMISSION_UUID_FIELD,
+    SUPPLEMENTAL_DETAILS_KEY,
+    stream_with_extras,
+)
 from kpi.constants import (
+    SUBMISSION_COUNT_CACHED,
+    SUBMISSION_COUNT_ESTIMATED,
+    SUBMISSION_COUNT_EXACT,
+    SUBMISSION_COUNT_NONE,
+    SUBMISSION_COUNT_STRATEGIES,
     SUBMISSION_FORMAT_TYPE_XML,
     SUBMISSION_FORMAT_TYPE_JSON,
     PERM_CHANGE_SUBMISSIONS,
@@ -58,6 +72,12 @@ class BaseDeploymentBackend(abc.ABC):
     SUBMISSION_DEPRECATED_UUID_XPATH = 'meta/deprecatedID'
     FORM_UUID_XPATH = 'formhub/uuid'
 
+    BULK_UPDATE_JOB_PROCESSING = 'processing'
+    BULK_UPDATE_JOB_COMPLETE = 'complete'
+    BULK_UPDATE_JOB_ERROR = 'error'
+    # Number of stored submissions between two updates of the job progress
+    BULK_UPDATE_JOB_PROGRESS_STEP = 100
+
     def __init__(self, asset):
         self.asset = asset
         # Python-only attribute used by `kpi.views.v2.data.DataViewSet.list()`
@@ -96,6 +116,10 @@ class BaseDeploymentBackend(abc.ABC):
         submission's XML tree, or the existing value is replaced by the updated
         value.
 
+        When more submissions than `SUBMISSION_BULK_UPDATE_ASYNC_THRESHOLD`
+        match, the edits are made by a background job and the response only
+        contains the job status (see `get_bulk_update_job()`).
+
         Args:
             data (dict): must contain a list of `submission_ids` and at
                 least one other key:value field for updating the submissions
@@ -120,20 +144,81 @@ class BaseDeploymentBackend(abc.ABC):
         else:
             submission_ids = data['submission_ids']
 
+        # Resolve the query now to let the background job (if any) work on a
+        # fixed list of submissions
+        submission_ids = [
+            submission['_id']
+            for submission in self.get_submissions(
+                user=user,
+                submission_ids=submission_ids,
+                query=data['query'],
+                fields=['_id'],
+                skip_count=True,
+            )
+        ]
+
+        if not submission_ids:
+            raise BulkUpdateSubmissionsClientException(
+                detail=t('No submissions match the given `submission_ids`')
+            )
+
+        threshold = settings.SUBMISSION_BULK_UPDATE_ASYNC_THRESHOLD
+        if len(submission_ids) <= threshold:
+            return self.update_submissions(user, submission_ids, data['data'])
+
+        # Avoid circular import
+        from kpi.tasks import bulk_update_submissions_in_background
+
+        job_uid = f'bu{ShortUUID().random(20)}'
+        job = self._set_bulk_update_job(
+            job_uid,
+            user_id=user.pk,
+            status=self.BULK_UPDATE_JOB_PROCESSING,
+            total=len(submission_ids),
+            processed=0,
+            failures=0,
+            results=[],
+        )
+        bulk_update_submissions_in_background.delay(
+            self.asset.uid, user.pk, job_uid, submission_ids, data['data']
+        )
+        del job['user_id']
+        return {
+            'status': status.HTTP_202_ACCEPTED,
+            'data': job,
+        }
+
+    def get_bulk_update_job(self, job_uid: str) -> Optional[dict]:
+        """
+        Return the status of the bulk update job `job_uid` of this asset, i.e.
+        the number of submissions processed so far and the result of each of
+        them, as formatted by `prepare_bulk_update_response()`.
+        """
+        return cache.get(self._get_bulk_update_job_key(job_uid))
+
+    def update_submissions(
+        self,
+        user: 'auth.User',
+        submission_ids: list,
+        update_data: dict,
+        job_uid: Optional[str] = None,
+    ) -> dict:
+        """
+        Apply `update_data` to the submissions matching `submission_ids` and
+        store each of them again. Up to `SUBMISSION_BULK_UPDATE_MAX_WORKERS`
+        submissions are sent to the back end concurrently.
+
+        If `job_uid` is provided, the progress of the related bulk update job
+        is updated as submissions are stored.
+        """
         submissions = self.get_submissions(
             user=user,
             format_type=SUBMISSION_FORMAT_TYPE_XML,
             submission_ids=submission_ids,
-            query=data['query'],
         )
 
-        if not self.current_submission_count:
-            raise BulkUpdateSubmissionsClientException(
-                detail=t('No submissions match the given `submission_ids`')
-            )
-
         # Remove potentially destructive keys from the payload
-        update_data = copy.deepcopy(data['data'])
+        update_data = copy.deepcopy(update_data)
         update_data = {
             k: v
             for k, v in update_data.items()
@@ -144,45 +229,105 @@ class BaseDeploymentBackend(abc.ABC):
             )
         }
 
-        kc_responses = []
-        for submission in submissions:
-            xml_parsed = fromstring_preserve_root_xmlns(submission)
-
-            _uuid, uuid_formatted = self.generate_new_instance_id()
+        # Submissions are read in this thread, and handed over to worker
+        # threads which edit and store them. At most `max_workers` submissions
+        # wait for a worker, thus submissions are read only as fast as they
+        # are stored. Back ends must stream them (e.g. with
+        # `QuerySet.iterator()`) for memory usage to stay bounded.
+        max_workers = settings.SUBMISSION_BULK_UPDATE_MAX_WORKERS
+        pending = queue.Queue(maxsize=max_workers)
+        completed = queue.Queue()
 
-            # Updating xml fields for submission. In order to update an existing
-            # submission, the current `instanceID` must be moved to the value
-            # for `deprecatedID`.
-            instance_id = get_or_create_element(
-                xml_parsed, self.SUBMISSION_CURRENT_UUID_XPATH
-            )
-            # If the submission has been edited before, it will already contain
-            # a deprecatedID element - otherwise create a new element
-            deprecated_id = get_or_create_element(
-                xml_parsed, self.SUBMISSION_DEPRECATED_UUID_XPATH
-            )
-            deprecated_id.text = instance_id.text
-            instance_id.text = uuid_formatted
-
-            # If the form has been updated with new fields and earlier
-            # submissions have been selected as part of the bulk update,
-            # a new element has to be created before a value can be set.
-            # However, with this new power, arbitrary fields can be added
-            # to the XML tree through the API.
-            for path, value in update_data.items():
-                edit_submission_xml(xml_parsed, path, value)
-
-            kc_response = self.store_submission(
-                user, xml_tostring(xml_parsed), _uuid
-            )
-            kc_responses.append(
-                {
-                    'uuid': _uuid,
-                    'response': kc_response,
-                }
+        def _store_submissions():
+            try:
+                while (item := pending.get()) is not None:
+                    index, submission = item
+                    _uuid, xml_submission = self._prepare_bulk_update_xml(
+                        submission, update_data
+                    )
+                    completed.put((
+                        index,
+                        {
+                            'uuid': _uuid,
+                            'response': self.store_submission(
+                                user, xml_submission, _uuid
+                            ),
+                        },
+                    ))
+            finally:
+                # Each thread gets its own database connections
+                connections.close_all()
+                completed.put(None)
+
+        kc_responses = {}
+        progress = []
+        running_workers = max_workers
+
+        def _collect_responses(block: bool):
+            nonlocal progress, running_workers
+            while running_workers:
+                try:
+                    item = completed.get(block=block)
+                except queue.Empty:
+                    return
+                if item is None:
+                    running_workers -= 1
+                    continue
+                index, kc_response = item
+                kc_responses[index] = kc_response
+                if not job_uid:
+                    continue
+                progress.append(kc_response)
+                # Do not hit the cache for every single submission
+                if len(progress) == self.BULK_UPDATE_JOB_PROGRESS_STEP:
+                    self._update_bulk_update_job_progress(job_uid, progress)
+                    progress = []
+
+        def _hand_over(item) -> bool:
+            # Keep collecting responses while workers are busy. Give up if
+            # none of them is running anymore (i.e. they all failed).
+            while running_workers:
+                try:
+                    pending.put(item, timeout=1)
+                except queue.Full:
+                    _collect_responses(block=False)
+                else:
+                    _collect_responses(block=False)
+                    return True
+            return False
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            workers = [
+                executor.submit(_store_submissions) for _ in range(max_workers)
+            ]
+            for item in enumerate(submissions):
+                if not _hand_over(item):
+                    break
+            for _ in workers:
+                if not _hand_over(None):
+                    break
+            _collect_responses(block=True)
+
+            for worker in workers:
+                # Raise the error, if any
+                worker.result()
+
+        kc_responses = [
+            kc_response for _, kc_response in sorted(kc_responses.items())
+        ]
+        response = self.prepare_bulk_update_response(kc_responses)
+        if job_uid:
+            self._set_bulk_update_job(
+                job_uid,
+                status=self.BULK_UPDATE_JOB_COMPLETE,
+                status_code=response['status'],
+                processed=response['data']['count'],
+                failures=response['data']['failures'],
+                results=response['data']['results'],
             )
 
-        return self.prepare_bulk_update_response(kc_responses)
+        return response
+
 
 
     @abc.abstractmethod
@@ -361,6 +506,20 @@ class BaseDeploymentBackend(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    def get_submission_value_counts(
+        self, user: 'auth.User', fields: list
+    ) -> dict[str, list[tuple]]:
+        """
+        Return how many of the submissions `user` is allowed to access have
+        each value of `fields`. Counting is done by MongoDB, submissions are
+        not retrieved. Counts are cached per deployed version and only
+        submissions received since the last call are counted.
+
+        See `MongoHelper.get_value_counts()`
+        """
+        pass
+
     @abc.abstractmethod
     def get_validation_status(self, submission_id: int, user: 'auth.User') -> dict:
         """
@@ -491,6 +650,19 @@ class BaseDeploymentBackend(abc.ABC):
     def submission_list_url(self):
         pass
 
+    @abc.abstractmethod
+    def submissions_modified_since(
+        self,
+        date_modified: datetime.datetime,
+        until_submission_id: Optional[int] = None,
+    ) -> bool:
+        """
+        Return whether any submission has been edited or removed after
+        `date_modified`. Only submissions whose id is lower than or equal to
+        `until_submission_id` are considered, if provided.
+        """
+        pass
+
     @property
     @abc.abstractmethod
     def submission_model(self):
@@ -533,8 +705,16 @@ class BaseDeploymentBackend(abc.ABC):
             - fields
             - query
             - submission_ids
-        If `validate_count` is True,`start`, `limit`, `fields` and `sort` are
-        ignored.
+            - after
+            - count_strategy
+        If `validate_count` is True,`start`, `limit`, `fields`, `sort`,
+        `after` and `count_strategy` are ignored.
+        `after` enables keyset pagination: results are sorted by `_id` and
+        start right after the submission whose `_id` equals `after`. It cannot
+        be combined with `start` or `sort`.
+        `count_strategy` tells how the total count of matching submissions is
+        computed (see `MongoHelper._get_cursor_and_count()`). 'estimated' falls
+        back on 'exact' when results are filtered.
         If `user` has partial permissions, conditions are
         applied to the query to narrow down results to what they are allowed
         to see. Partial permissions are validated with 'view_submissions' by
@@ -565,6 +745,11 @@ class BaseDeploymentBackend(abc.ABC):
                     'fields': t('This is not supported in `XML` format')
                 })
 
+            if 'after' in mongo_query_params:
+                raise serializers.ValidationError({
+                    'after': t('This param is not supported in `XML` format')
+                })
+
         start = mongo_query_params.get('start', 0)
         limit = mongo_query_params.get('limit')
         sort = mongo_query_params.get('sort', {})
@@ -572,6 +757,10 @@ class BaseDeploymentBackend(abc.ABC):
         query = mongo_query_params.get('query', {})
         submission_ids = mongo_query_params.get('submission_ids', [])
         skip_count = mongo_query_params.get('skip_count', False)
+        after = mongo_query_params.get('after')
+        count_strategy = mongo_query_params.get(
+            'count_strategy', SUBMISSION_COUNT_EXACT
+        )
 
         # I've copied these `ValidationError` messages verbatim from DRF where
         # possible.TODO: Should this validation be in (or called directly by)
@@ -627,6 +816,40 @@ class BaseDeploymentBackend(abc.ABC):
                 {'limit': t('A positive integer is required.')}
             )
 
+        if after is not None:
+            if 'start' in mongo_query_params:
+                raise serializers.ValidationError(
+                    {'after': t('This param cannot be used with `start`.')}
+                )
+            if sort:
+                raise serializers.ValidationError(
+                    {'after': t('This param cannot be used with `sort`.')}
+                )
+            try:
+                after = positive_int(after)
+            except ValueError:
+                raise serializers.ValidationError(
+                    {'after': t('A positive integer is required.')}
+                )
+
+        if count_strategy not in SUBMISSION_COUNT_STRATEGIES:
+            raise serializers.ValidationError(
+                {
+                    'count_strategy': t(
+                        'Value must be one of: ##strategies##.'
+                    ).replace(
+                        '##strategies##', ', '.join(SUBMISSION_COUNT_STRATEGIES)
+                    )
+                }
+            )
+
+        if skip_count:
+            count_strategy = SUBMISSION_COUNT_NONE
+        elif count_strategy == SUBMISSION_COUNT_ESTIMATED and (
+            query or submission_ids or permission_filters
+        ):
+            count_strategy = SUBMISSION_COUNT_EXACT
+
         if isinstance(fields, str):
             try:
                 fields = json.loads(fields, object_hook=json_util.object_hook)
@@ -635,6 +858,19 @@ class BaseDeploymentBackend(abc.ABC):
                     {'fields': t('Value must be valid JSON.')}
                 )
 
+        if (
+            fields
+            and SUPPLEMENTAL_DETAILS_KEY in fields
+            and self.asset.has_advanced_features
+        ):
+            # Supplemental details are matched with their submission by UUID.
+            # Do not alter the list of the caller.
+            fields = fields + [
+                field
+                for field in ('_uuid', SUBMISSION_UUID_FIELD)
+                if field not in fields
+            ]
+
         params = {
             'query': query,
             'start': start,
@@ -643,11 +879,20 @@ class BaseDeploymentBackend(abc.ABC):
             'submission_ids': submission_ids,
             'permission_filters': permission_filters,
             'skip_count': skip_count,
+            'count_strategy': count_strategy,
         }
 
         if limit:
             params['limit'] = limit
 
+        if after is not None:
+            params['after'] = after
+
+        if count_strategy == SUBMISSION_COUNT_CACHED:
+            # Submissions received by KoBoCAT do not invalidate cached counts.
+            # The total number of submissions (cheap to get) does change.
+            params['submission_count'] = self.submission_count
+
         return params
 
     def validate_access_with_partial_perms(
@@ -747,6 +992,9 @@ class BaseDeploymentBackend(abc.ABC):
     def _open_rosa_server_storage(self):
         return default_storage
 
+    def _get_bulk_update_job_key(self, job_uid: str) -> str:
+        return f'submission_bulk_update_job:{self.asset.uid}:{job_uid}'
+
     def _get_metadata_queryset(self, file_type: str) -> Union[QuerySet, list]:
         """
         Returns a list of objects, or a QuerySet to pass to Celery to
@@ -763,6 +1011,69 @@ class BaseDeploymentBackend(abc.ABC):
             queryset = PairedData.objects(self.asset).values()
             return queryset
 
+    def _inject_supplemental_details(
+        self, mongo_cursor: Iterator[dict], params: dict
+    ) -> Iterator[dict]:
+        """
+        Merge supplemental details (transcripts, translations, etc.) of the
+        asset into the submissions of `mongo_cursor`.
+
+        This is the only place where supplemental details are merged;
+        consumers of `get_submissions()` must not do it again.
+        """
+        if not self.asset.has_advanced_features:
+            return mongo_cursor
+
+        fields = params.get('fields', [])
+        if len(fields) > 0 and '_uuid' not in fields:
+            # skip the query if submission '_uuid' is not even q'd from mongo
+            return mongo_cursor
+
+        # Paginated requests (e.g. the data API) fetch the supplemental
+        # details of the whole page at once, but never more than that
+        batch_size = settings.SUBMISSION_EXTRAS_BATCH_SIZE
+        if params.get('limit'):
+            batch_size = min(params['limit'], batch_size)
+
+        return stream_with_extras(
+            mongo_cursor, self.asset, batch_size=batch_size
+        )
+
+    def _prepare_bulk_update_xml(
+        self, submission: str, update_data: dict
+    ) -> tuple[str, str]:
+        """
+        Return the new uuid of `submission` and its XML updated with
+        `update_data`
+        """
+        xml_parsed = fromstring_preserve_root_xmlns(submission)
+
+        _uuid, uuid_formatted = self.generate_new_instance_id()
+
+        # Updating xml fields for submission. In order to update an existing
+        # submission, the current `instanceID` must be moved to the value
+        # for `deprecatedID`.
+        instance_id = get_or_create_element(
+            xml_parsed, self.SUBMISSION_CURRENT_UUID_XPATH
+        )
+        # If the submission has been edited before, it will already contain
+        # a deprecatedID element - otherwise create a new element
+        deprecated_id = get_or_create_element(
+            xml_parsed, self.SUBMISSION_DEPRECATED_UUID_XPATH
+        )
+        deprecated_id.text = instance_id.text
+        instance_id.text = uuid_formatted
+
+        # If the form has been updated with new fields and earlier
+        # submissions have been selected as part of the bulk update,
+        # a new element has to be created before a value can be set.
+        # However, with this new power, arbitrary fields can be added
+        # to the XML tree through the API.
+        for path, value in update_data.items():
+            edit_submission_xml(xml_parsed, path, value)
+
+        return _uuid, xml_tostring(xml_parsed)
+
     def _rewrite_json_attachment_urls(
         self, submission: dict, request
     ) -> dict:
@@ -803,3 +1114,31 @@ class BaseDeploymentBackend(abc.ABC):
             attachment['question_xpath'] = filenames_and_xpaths.get(basename, '')
 
         return submission
+
+    def _set_bulk_update_job(self, job_uid: str, **values) -> dict:
+        """
+        Create or update the bulk update job `job_uid` with `values` and
+        return it
+        """
+        job = self.get_bulk_update_job(job_uid) or {'uid': job_uid}
+        job.update(values)
+        cache.set(
+            self._get_bulk_update_job_key(job_uid),
+            job,
+            settings.SUBMISSION_BULK_UPDATE_JOB_TIMEOUT,
+        )
+        return job
+
+    def _update_bulk_update_job_progress(
+        self, job_uid: str, kc_responses: list
+    ):
+        if not kc_responses:
+            return
+        progress = self.prepare_bulk_update_response(kc_responses)['data']
+        job = self.get_bulk_update_job(job_uid)
+        self._set_bulk_update_job(
+            job_uid,
+            processed=job['processed'] + progress['count'],
+            failures=job['failures'] + progress['failures'],
+            results=job['results'] + progress['results'],
+        )
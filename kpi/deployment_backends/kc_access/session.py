@@ -0,0 +1,114 @@
+import os
+import re
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+KOBOCAT_REQUEST_LATENCY = Histogram(
+    'kpi_kobocat_request_duration_seconds',
+    'Duration of requests sent to KoBoCAT',
+    ['method', 'endpoint'],
+)
+KOBOCAT_REQUEST_ERRORS = Counter(
+    'kpi_kobocat_request_errors_total',
+    'Requests sent to KoBoCAT which failed or returned a server error',
+    ['method', 'endpoint', 'error'],
+)
+
+_session: Optional['KobocatSession'] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+class KobocatSession(requests.Session):
+    """
+    Session with a bounded pool of keep-alive connections to KoBoCAT.
+    Idempotent requests (e.g. GET, DELETE) are retried with backoff on
+    connection errors and on 502, 503 and 504 responses.
+    Latency and errors are recorded per endpoint.
+
+    The session is shared by all users, thus cookies set by KoBoCAT (e.g. a
+    session or CSRF cookie) are never stored nor sent back.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=settings.KOBOCAT_REQUEST_POOL_CONNECTIONS,
+            pool_maxsize=settings.KOBOCAT_REQUEST_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=settings.KOBOCAT_REQUEST_RETRIES,
+                backoff_factor=settings.KOBOCAT_REQUEST_RETRY_BACKOFF_FACTOR,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                # Return the last response instead of raising an error
+                raise_on_status=False,
+            ),
+        )
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = (
+                settings.KOBOCAT_REQUEST_CONNECT_TIMEOUT,
+                settings.KOBOCAT_REQUEST_READ_TIMEOUT,
+            )
+        endpoint = get_endpoint_label(request.url)
+        start = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.exceptions.RequestException as e:
+            KOBOCAT_REQUEST_ERRORS.labels(
+                request.method, endpoint, type(e).__name__
+            ).inc()
+            raise
+        finally:
+            KOBOCAT_REQUEST_LATENCY.labels(request.method, endpoint).observe(
+                time.monotonic() - start
+            )
+
+        if response.status_code >= 500:
+            KOBOCAT_REQUEST_ERRORS.labels(
+                request.method, endpoint, str(response.status_code)
+            ).inc()
+
+        return response
+
+
+def get_endpoint_label(url: str) -> str:
+    """
+    Return the path of `url` with its numeric parts replaced by a placeholder
+    to keep the number of metrics labels low, e.g.:
+        `/api/v1/data/1/2/validation_status`
+    becomes
+        `/api/v1/data/{id}/{id}/validation_status`
+    """
+    path = urlparse(url).path.rstrip('/')
+    return re.sub(r'/\d+(?=/|$)', '/{id}', path) or '/'
+
+
+def get_kobocat_session() -> KobocatSession:
+    """
+    Return the session shared by all threads of the current process.
+    A new session is created after a fork, since connections of the parent
+    process must not be reused.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = KobocatSession()
+                _session_pid = pid
+    return _session
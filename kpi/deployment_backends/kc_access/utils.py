@@ -4,18 +4,18 @@ import logging
 from contextlib import ContextDecorator
 from typing import Union
 
-import requests
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, User
 from django.core.exceptions import ImproperlyConfigured
 from django.db import ProgrammingError, transaction
-from django.db.models import Model
+from django.db.models import Model, Q
 from kobo_service_account.utils import get_request_headers
 from rest_framework.authtoken.models import Token
 
 from kpi.exceptions import KobocatProfileException
 from kpi.utils.log import logging
 from kpi.utils.permissions import is_user_anonymous
+from .session import get_kobocat_session
 from .shadow_models import (
     safe_kc_read,
     KobocatContentType,
@@ -35,7 +35,7 @@ def _trigger_kc_profile_creation(user):
     """
     url = settings.KOBOCAT_INTERNAL_URL + '/api/v1/user'
     token, _ = Token.objects.get_or_create(user=user)
-    response = requests.get(
+    response = get_kobocat_session().get(
         url, headers={'Authorization': 'Token ' + token.key})
     if not response.status_code == 200:
         raise KobocatProfileException(
@@ -171,6 +171,31 @@ def _get_applicable_kc_permissions(obj, kpi_codenames):
     return permissions
 
 
+def _get_applicable_kc_permissions_per_kpi_codename(
+    obj, kpi_codenames_per_user: dict[int, list[str]]
+) -> dict:
+    """
+    Return the KC permissions which correspond to all KPI permission codenames
+    of `kpi_codenames_per_user`, keyed by KPI codenames.
+    """
+    all_kpi_codenames = {
+        kpi_codename
+        for kpi_codenames in kpi_codenames_per_user.values()
+        for kpi_codename in kpi_codenames
+    }
+    permissions = {
+        permission.codename: permission
+        for permission in _get_applicable_kc_permissions(
+            obj, list(all_kpi_codenames)
+        )
+    }
+    return {
+        kpi_codename: permissions[kc_codename]
+        for kpi_codename, kc_codename in obj.KC_PERMISSIONS_MAP.items()
+        if kpi_codename in all_kpi_codenames and kc_codename in permissions
+    }
+
+
 def _get_xform_id_for_asset(asset):
     if not asset.has_deployment:
         return None
@@ -367,6 +392,106 @@ def remove_applicable_kc_permissions(
     ).delete()
 
 
+def bulk_assign_applicable_kc_permissions(
+    obj: Model, kpi_codenames_per_user: dict[int, list[str]]
+):
+    """
+    Same as `assign_applicable_kc_permissions()` for several users at once.
+    `kpi_codenames_per_user` is a dictionary of KPI permission codenames
+    keyed by user ids.
+    """
+    if not obj._meta.model_name == 'asset':
+        return
+    xform_id = _get_xform_id_for_asset(obj)
+    if not xform_id:
+        return
+
+    kpi_codenames_per_user = dict(kpi_codenames_per_user)
+    if anonymous_codenames := kpi_codenames_per_user.pop(
+        settings.ANONYMOUS_USER_ID, None
+    ):
+        set_kc_anonymous_permissions_xform_flags(
+            obj, anonymous_codenames, xform_id
+        )
+
+    permissions = _get_applicable_kc_permissions_per_kpi_codename(
+        obj, kpi_codenames_per_user
+    )
+    if not permissions:
+        return
+
+    xform_content_type = KobocatContentType.objects.get(
+        **obj.KC_CONTENT_TYPE_KWARGS)
+    kc_permissions_already_assigned = set(
+        KobocatUserObjectPermission.objects.filter(
+            user_id__in=kpi_codenames_per_user.keys(),
+            permission__in=permissions.values(),
+            object_pk=xform_id,
+        ).values_list('user_id', 'permission__codename')
+    )
+    permissions_to_create = []
+    for user_id, kpi_codenames in kpi_codenames_per_user.items():
+        for kpi_codename in kpi_codenames:
+            try:
+                permission = permissions[kpi_codename]
+            except KeyError:
+                # This permission doesn't map to anything in KC
+                continue
+            if (user_id, permission.codename) in kc_permissions_already_assigned:
+                continue
+            kc_permissions_already_assigned.add((user_id, permission.codename))
+            permissions_to_create.append(KobocatUserObjectPermission(
+                user_id=user_id, permission=permission, object_pk=xform_id,
+                content_type=xform_content_type
+            ))
+    KobocatUserObjectPermission.objects.bulk_create(permissions_to_create)
+
+
+def bulk_remove_applicable_kc_permissions(
+    obj: Model, kpi_codenames_per_user: dict[int, list[str]]
+):
+    """
+    Same as `remove_applicable_kc_permissions()` for several users at once.
+    `kpi_codenames_per_user` is a dictionary of KPI permission codenames
+    keyed by user ids.
+    """
+    if not obj._meta.model_name == 'asset':
+        return
+    xform_id = _get_xform_id_for_asset(obj)
+    if not xform_id:
+        return
+
+    kpi_codenames_per_user = dict(kpi_codenames_per_user)
+    if anonymous_codenames := kpi_codenames_per_user.pop(
+        settings.ANONYMOUS_USER_ID, None
+    ):
+        set_kc_anonymous_permissions_xform_flags(
+            obj, anonymous_codenames, xform_id, remove=True
+        )
+
+    permissions = _get_applicable_kc_permissions_per_kpi_codename(
+        obj, kpi_codenames_per_user
+    )
+    filters = Q()
+    for user_id, kpi_codenames in kpi_codenames_per_user.items():
+        if user_permissions := [
+            permissions[kpi_codename]
+            for kpi_codename in kpi_codenames
+            if kpi_codename in permissions
+        ]:
+            filters |= Q(user_id=user_id, permission__in=user_permissions)
+    if not filters:
+        return
+
+    content_type_kwargs = _get_content_type_kwargs_for_related(obj)
+    KobocatUserObjectPermission.objects.filter(
+        filters,
+        object_pk=xform_id,
+        # `permission` has a FK to `ContentType`, but I'm paranoid
+        **content_type_kwargs
+    ).delete()
+
+
 def reset_kc_permissions(
     obj: Model,
     user: Union[AnonymousUser, User, int],
@@ -408,7 +533,7 @@ def reset_kc_permissions(
 def delete_kc_user(username: str):
     url = settings.KOBOCAT_INTERNAL_URL + f'/api/v1/users/{username}'
 
-    response = requests.delete(
+    response = get_kobocat_session().delete(
         url, headers=get_request_headers(username)
     )
     response.raise_for_status()
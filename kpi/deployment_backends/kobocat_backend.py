@@ -19,7 +19,7 @@ from defusedxml import ElementTree as DET
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.core.files import File
-from django.db.models import Sum, F
+from django.db.models import Sum, F, Q
 from django.db.models.functions import Coalesce
 from django.db.models.query import QuerySet
 from django.utils import timezone
@@ -28,9 +28,10 @@ from django_redis import get_redis_connection
 from kobo_service_account.utils import get_request_headers
 from rest_framework import status
 
-from kobo.apps.subsequences.utils import stream_with_extras
 from kobo.apps.trackers.models import NLPUsageCounter
 from kpi.constants import (
+    SUBMISSION_COUNT_ESTIMATED,
+    SUBMISSION_COUNT_NONE,
     SUBMISSION_FORMAT_TYPE_JSON,
     SUBMISSION_FORMAT_TYPE_XML,
     PERM_FROM_KC_ONLY,
@@ -59,6 +60,7 @@ from kpi.utils.object_permission import get_database_user
 from kpi.utils.permissions import is_user_anonymous
 from kpi.utils.xml import fromstring_preserve_root_xmlns, xml_tostring
 from .base_backend import BaseDeploymentBackend
+from .kc_access.session import get_kobocat_session
 from .kc_access.shadow_models import (
     KobocatAttachment,
     KobocatDailyXFormSubmissionCounter,
@@ -90,6 +92,9 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         AssetFile.PAIRED_DATA: 'paired_data',
     }
 
+    # Number of XML submissions fetched at once from PostgreSQL
+    SUBMISSIONS_XML_CHUNK_SIZE = 100
+
     @property
     def attachment_storage_bytes(self):
         try:
@@ -156,7 +161,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         #   queries as it is faster to query a boolean than string.
         payload = {
             'downloadable': active,
-            'has_kpi_hook': self.asset.has_active_hooks,
+            'has_kpi_hook': self.asset.has_submission_listeners,
             'kpi_asset_uid': self.asset.uid
         }
         files = {'xls_file': ('{}.xlsx'.format(id_string), xlsx_io)}
@@ -284,6 +289,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         kc_url = self.get_submission_detail_url(submission_id)
         kc_request = requests.Request(method='DELETE', url=kc_url)
         kc_response = self.__kobocat_proxy_request(kc_request, user)
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
 
         return self.__prepare_as_drf_response_signature(kc_response)
 
@@ -318,6 +324,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         kc_url = self.submission_list_url
         kc_request = requests.Request(method='DELETE', url=kc_url, json=data)
         kc_response = self.__kobocat_proxy_request(kc_request, user)
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
 
         drf_response = self.__prepare_as_drf_response_signature(kc_response)
         return drf_response
@@ -447,6 +454,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
             method='POST', url=self.submission_url, files=files
         )
         kc_response = self.__kobocat_proxy_request(kc_request, user)
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
         return self.__prepare_as_drf_response_signature(
             kc_response, expected_response_format='xml'
         )
@@ -798,6 +806,20 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
             )
         return submissions
 
+    def get_submission_value_counts(
+        self, user: 'auth.User', fields: list
+    ) -> dict[str, list[tuple]]:
+        params = self.validate_submission_list_params(
+            user, validate_count=True
+        )
+        return MongoHelper.get_value_counts(
+            self.mongo_userform_id,
+            fields,
+            permission_filters=params['permission_filters'],
+            version_id=self.version_id,
+            submissions_modified_since=self.submissions_modified_since,
+        )
+
     def get_validation_status(self, submission_id: int, user: 'auth.User') -> dict:
         url = self.get_submission_validation_status_url(submission_id)
         kc_request = requests.Request(method='GET', url=url)
@@ -805,6 +827,27 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
 
         return self.__prepare_as_drf_response_signature(kc_response)
 
+    @classmethod
+    def get_xforms(cls, deployments: list['KobocatDeploymentBackend']) -> dict:
+        """
+        Retrieve the KoBoCAT XForms of all `deployments` with one query.
+
+        Return a dictionary of XForms keyed by their primary key. Missing
+        XForms are set to `None`. It is meant to be set as `xforms_cache` on
+        each deployment.
+        """
+        formids = [
+            deployment.backend_response['formid'] for deployment in deployments
+        ]
+        xforms = dict.fromkeys(formids)
+        xforms.update(
+            {
+                xform.pk: xform
+                for xform in cls._get_xform_queryset().filter(pk__in=formids)
+            }
+        )
+        return xforms
+
     @staticmethod
     def internal_to_external_url(url):
         """
@@ -843,7 +886,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         payload = {
             'downloadable': active,
             'title': self.asset.name,
-            'has_kpi_hook': self.asset.has_active_hooks
+            'has_kpi_hook': self.asset.has_submission_listeners
         }
         files = {'xls_file': ('{}.xlsx'.format(id_string), xlsx_io)}
         json_response = self._kobocat_request(
@@ -985,11 +1028,11 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
 
         Store results in deployment data
         """
-        has_active_hooks = self.asset.has_active_hooks
+        has_kpi_hooks = self.asset.has_submission_listeners
         url = self.normalize_internal_url(
             self.backend_response['url'])
         payload = {
-            'has_kpi_hooks': has_active_hooks,
+            'has_kpi_hooks': has_kpi_hooks,
             'kpi_asset_uid': self.asset.uid
         }
 
@@ -997,7 +1040,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
             json_response = self._kobocat_request('PATCH', url, data=payload)
         except KobocatDeploymentException as e:
             if (
-                has_active_hooks is False
+                has_kpi_hooks is False
                 and hasattr(e, 'response')
                 and e.response.status_code == status.HTTP_404_NOT_FOUND
             ):
@@ -1007,7 +1050,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
             else:
                 raise
         else:
-            assert json_response['has_kpi_hooks'] == has_active_hooks
+            assert json_response['has_kpi_hooks'] == has_kpi_hooks
             self.store_data({
                 'backend_response': json_response,
             })
@@ -1041,6 +1084,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
 
         kc_request = requests.Request(**kc_request_params)
         kc_response = self.__kobocat_proxy_request(kc_request, user)
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
         return self.__prepare_as_drf_response_signature(kc_response)
 
     def set_validation_statuses(self, user: 'auth.User', data: dict) -> dict:
@@ -1074,6 +1118,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         url = self.submission_list_url
         kc_request = requests.Request(method='PATCH', url=url, json=data)
         kc_response = self.__kobocat_proxy_request(kc_request, user)
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
         return self.__prepare_as_drf_response_signature(kc_response)
 
     def store_submission(
@@ -1087,6 +1132,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
             method='POST', url=self.submission_url, files=files
         )
         kc_response = self.__kobocat_proxy_request(kc_request, user=user)
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
         return kc_response
 
     @property
@@ -1104,6 +1150,27 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         )
         return url
 
+    def submissions_modified_since(
+        self,
+        date_modified: datetime,
+        until_submission_id: Optional[int] = None,
+    ) -> bool:
+        try:
+            xform_id = self.xform_id
+        except InvalidXFormException:
+            return True
+
+        queryset = ReadOnlyKobocatInstance.objects.filter(xform_id=xform_id)
+        if until_submission_id is not None:
+            queryset = queryset.filter(pk__lte=until_submission_id)
+
+        # Hard-deleted submissions cannot be found here. Callers must compare
+        # the number of submissions to detect them.
+        return queryset.filter(
+            Q(date_modified__gt=date_modified)
+            | Q(deleted_at__gt=date_modified)
+        ).exists()
+
     @property
     def submission_model(self):
         return ReadOnlyKobocatInstance
@@ -1199,20 +1266,12 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
     def xform(self):
         if not hasattr(self, '_xform'):
             pk = self.backend_response['formid']
-            xform = (
-                KobocatXForm.objects.filter(pk=pk)
-                .only(
-                    'user__username',
-                    'id_string',
-                    'num_of_submissions',
-                    'attachment_storage_bytes',
-                    'require_auth',
-                )
-                .select_related(
-                    'user'
-                )  # Avoid extra query to validate username below
-                .first()
-            )
+            try:
+                # `xforms_cache` can be set to avoid one query per deployment,
+                # see `get_xforms()`
+                xform = self.xforms_cache[pk]
+            except (AttributeError, KeyError):
+                xform = self._get_xform_queryset().filter(pk=pk).first()
 
             if not (
                 xform
@@ -1305,6 +1364,18 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
             + self.xform.attachment_storage_bytes
         )
 
+    @staticmethod
+    def _get_xform_queryset():
+        return KobocatXForm.objects.only(
+            'user__username',
+            'id_string',
+            'num_of_submissions',
+            'attachment_storage_bytes',
+            'require_auth',
+        ).select_related(
+            'user'
+        )  # Avoid extra query to validate username in `xform`
+
     def _kobocat_request(self, method, url, expect_formid=True, **kwargs):
         """
         Make a POST or PATCH request and return parsed JSON. Keyword arguments,
@@ -1419,18 +1490,13 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         mongo_cursor, total_count = MongoHelper.get_instances(
             self.mongo_userform_id, **params)
 
+        if params['count_strategy'] == SUBMISSION_COUNT_ESTIMATED:
+            total_count = self.submission_count
+
         # Python-only attribute used by `kpi.views.v2.data.DataViewSet.list()`
         self.current_submission_count = total_count
 
-        add_supplemental_details_to_query = self.asset.has_advanced_features
-
-        fields = params.get('fields', [])
-        if len(fields) > 0 and '_uuid' not in fields:
-            # skip the query if submission '_uuid' is not even q'd from mongo
-            add_supplemental_details_to_query = False
-
-        if add_supplemental_details_to_query:
-            mongo_cursor = stream_with_extras(mongo_cursor, self.asset)
+        mongo_cursor = self._inject_supplemental_details(mongo_cursor, params)
 
         return (
             self._rewrite_json_attachment_urls(
@@ -1466,6 +1532,8 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
                 submission.get('_id')
                 for submission in submissions
             ]
+            if params['count_strategy'] == SUBMISSION_COUNT_ESTIMATED:
+                count = self.submission_count
             self.current_submission_count = count
 
         queryset = ReadOnlyKobocatInstance.objects.filter(
@@ -1477,7 +1545,13 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
 
         # Python-only attribute used by `kpi.views.v2.data.DataViewSet.list()`
         if not use_mongo:
-            self.current_submission_count = queryset.count()
+            count_strategy = params['count_strategy']
+            if count_strategy == SUBMISSION_COUNT_NONE:
+                self.current_submission_count = None
+            elif count_strategy == SUBMISSION_COUNT_ESTIMATED:
+                self.current_submission_count = self.submission_count
+            else:
+                self.current_submission_count = queryset.count()
 
         # Force Sort by id
         # See FIXME about sort in `BaseDeploymentBackend.validate_submission_list_params()`
@@ -1490,7 +1564,13 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
             limit = offset + params.get('limit')
             queryset = queryset[offset:limit]
 
-        return (lazy_instance.xml for lazy_instance in queryset)
+        # Stream submissions instead of loading them all at once
+        return (
+            lazy_instance.xml
+            for lazy_instance in queryset.iterator(
+                chunk_size=self.SUBMISSIONS_XML_CHUNK_SIZE
+            )
+        )
 
     @staticmethod
     def __kobocat_proxy_request(kc_request, user=None):
@@ -1506,8 +1586,7 @@ class KobocatDeploymentBackend(BaseDeploymentBackend):
         if not is_user_anonymous(user):
             kc_request.headers.update(get_request_headers(user.username))
 
-        session = requests.Session()
-        return session.send(kc_request.prepare())
+        return get_kobocat_session().send(kc_request.prepare())
 
     @staticmethod
     def __prepare_as_drf_response_signature(
@@ -1,5 +1,7 @@
 # coding: utf-8
 import celery
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 
 from kpi.constants import ASSET_TYPE_SURVEY
@@ -24,6 +26,28 @@ class DeployableMixin:
             # Not using .delay() due to circular import in tasks.py
             celery.current_app.send_task('kpi.tasks.sync_media_files', (self.uid,))
 
+    def sync_paired_data_files_async(self):
+        """
+        Synchronize paired data files with deployment backend asynchronously.
+
+        Calls are debounced: synchronization starts after
+        `settings.PAIRED_DATA_SYNC_DELAY` seconds, and is only scheduled once
+        during that time, no matter how many times the asset is saved.
+        """
+        # Avoid circular import
+        from kpi.tasks import sync_paired_data_files
+
+        if not cache.add(
+            f'paired_data_sync_scheduled:{self.uid}',
+            True,
+            timeout=settings.PAIRED_DATA_SYNC_DELAY * 2,
+        ):
+            return
+
+        sync_paired_data_files.apply_async(
+            args=(self.uid,), countdown=settings.PAIRED_DATA_SYNC_DELAY
+        )
+
     @property
     def can_be_deployed(self):
         return self.asset_type and self.asset_type == ASSET_TYPE_SURVEY
@@ -46,6 +70,8 @@ class DeployableMixin:
 
             self._mark_latest_version_as_deployed(save=False)
             self.sync_media_files_async()  # This saves the asset to the database!
+            if self.paired_data:
+                self.sync_paired_data_files_async()
 
         else:
             raise BadAssetTypeException(
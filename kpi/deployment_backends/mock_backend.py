@@ -24,6 +24,7 @@ from rest_framework import status
 
 from kobo.apps.trackers.models import NLPUsageCounter
 from kpi.constants import (
+    SUBMISSION_COUNT_ESTIMATED,
     SUBMISSION_FORMAT_TYPE_JSON,
     SUBMISSION_FORMAT_TYPE_XML,
     PERM_CHANGE_SUBMISSIONS,
@@ -88,7 +89,7 @@ class MockDeploymentBackend(BaseDeploymentBackend):
             'active': active,
             'backend_response': {
                 'downloadable': active,
-                'has_kpi_hook': self.asset.has_active_hooks,
+                'has_kpi_hook': self.asset.has_submission_listeners,
                 'kpi_asset_uid': self.asset.uid,
                 'uuid': generate_uuid_for_form(),
             },
@@ -151,6 +152,7 @@ class MockDeploymentBackend(BaseDeploymentBackend):
             }
 
         settings.MONGO_DB.instances.delete_one({'_id': submission_id})
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
 
         return {
             'content_type': 'application/json',
@@ -200,6 +202,7 @@ class MockDeploymentBackend(BaseDeploymentBackend):
             settings.MONGO_DB.instances.delete_one(
                 {'_id': submission_id}
             )
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
 
         return {
             'content_type': 'application/json',
@@ -392,9 +395,14 @@ class MockDeploymentBackend(BaseDeploymentBackend):
         mongo_cursor, total_count = MongoHelper.get_instances(
             self.mongo_userform_id, **params)
 
+        if params['count_strategy'] == SUBMISSION_COUNT_ESTIMATED:
+            total_count = self.submission_count
+
         # Python-only attribute used by `kpi.views.v2.data.DataViewSet.list()`
         self.current_submission_count = total_count
 
+        mongo_cursor = self._inject_supplemental_details(mongo_cursor, params)
+
         submissions = [
             self._rewrite_json_attachment_urls(
                 MongoHelper.to_readable_dict(submission),
@@ -415,6 +423,20 @@ class MockDeploymentBackend(BaseDeploymentBackend):
             for submission in submissions
         ]
 
+    def get_submission_value_counts(
+        self, user: 'auth.User', fields: list
+    ) -> dict[str, list[tuple]]:
+        params = self.validate_submission_list_params(
+            user, validate_count=True
+        )
+        return MongoHelper.get_value_counts(
+            self.mongo_userform_id,
+            fields,
+            permission_filters=params['permission_filters'],
+            version_id=self.version_id,
+            submissions_modified_since=self.submissions_modified_since,
+        )
+
     def get_validation_status(self, submission_id: int, user: 'auth.User') -> dict:
 
         submission = self.get_submission(submission_id, user)
@@ -444,6 +466,8 @@ class MockDeploymentBackend(BaseDeploymentBackend):
             # Do not add `MongoHelper.USERFORM_ID` to original `submissions`
             del submission[MongoHelper.USERFORM_ID]
 
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
+
     @property
     def mongo_userform_id(self):
         return f'{self.asset.owner.username}_{self.asset.uid}'
@@ -487,13 +511,13 @@ class MockDeploymentBackend(BaseDeploymentBackend):
 
     def set_has_kpi_hooks(self):
         """
-        Store a boolean which indicates that KPI has active hooks (or not)
-        and, if it is the case, it should receive notifications when new data
-        comes in
+        Store a boolean which indicates that KPI has active hooks or shares
+        its data (or not) and, if it is the case, it should receive
+        notifications when new data comes in
         """
-        has_active_hooks = self.asset.has_active_hooks
+        has_kpi_hooks = self.asset.has_submission_listeners
         self.store_data({
-            'has_kpi_hooks': has_active_hooks,
+            'has_kpi_hooks': has_kpi_hooks,
         })
 
     def set_namespace(self, namespace):
@@ -528,6 +552,7 @@ class MockDeploymentBackend(BaseDeploymentBackend):
             {'_id': submission_id},
             {'$set': {'_validation_status': validation_status}},
         )
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
         return {
             'content_type': 'application/json',
             'status': status_code,
@@ -586,6 +611,8 @@ class MockDeploymentBackend(BaseDeploymentBackend):
 
             submission_count += 1
 
+        MongoHelper.invalidate_cached_counts(self.mongo_userform_id)
+
         return {
             'content_type': 'application/json',
             'status': status.HTTP_200_OK,
@@ -623,6 +650,15 @@ class MockDeploymentBackend(BaseDeploymentBackend):
         return reverse(view_name,
                        kwargs={'parent_lookup_asset': self.asset.uid})
 
+    def submissions_modified_since(
+        self,
+        date_modified: datetime,
+        until_submission_id: Optional[int] = None,
+    ) -> bool:
+        # Mock submissions are never edited in place, and deleting them
+        # removes them from MongoDB as KoBoCAT does.
+        return False
+
     @property
     def submission_model(self):
 
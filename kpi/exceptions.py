@@ -70,6 +70,10 @@ class FFMpegException(Exception):
     pass
 
 
+class FormpackIncompatibilityError(Exception):
+    pass
+
+
 class ImportAssetException(Exception):
     pass
 
@@ -148,6 +152,12 @@ class PairedDataException(Exception):
     pass
 
 
+class PairedDataRefreshInProgress(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = t('Data is being generated. Please try again later')
+    default_code = 'paired_data_refresh_in_progress'
+
+
 class QueryParserBadSyntax(InvalidSearchException):
     default_detail = t('Bad syntax')
     default_code = 'query_parser_bad_syntax'
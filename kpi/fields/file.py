@@ -20,7 +20,11 @@ class ExtendedFieldFile(FieldFile):
                 'Key': self.name
             }
             try:
-                self.storage.bucket.copy(copy_source, new_path)
+                # Copy is done server-side. Use the client of the current
+                # thread's connection to let files be moved concurrently.
+                self.storage.connection.meta.client.copy(
+                    copy_source, self.storage.bucket_name, new_path
+                )
                 self.storage.delete(old_path)
             except ClientError:
                 return False
@@ -28,21 +32,23 @@ class ExtendedFieldFile(FieldFile):
             self.name = new_path
             return True
 
-        upload_to = self.field.upload_to
-        # Temporary change `upload_to` - which is called internally by
-        # `self.save()` below - to new target folder
-        self.field.upload_to = lambda i, fn: posixpath.join(target_folder, fn)
+        # Save the file like `self.save()` does, but without going through
+        # `upload_to`, which is shared by all instances of the model.
         success = False
         try:
             with self.storage.open(old_path, 'rb') as f:
-                self.save(filename, f, save=False)
+                self.name = self.storage.save(
+                    self.storage.generate_filename(
+                        posixpath.join(target_folder, filename)
+                    ),
+                    f,
+                    max_length=self.field.max_length,
+                )
+            setattr(self.instance, self.field.attname, self.name)
             self.storage.delete(old_path)
             success = True
         except FileNotFoundError:
             pass
-        finally:
-            # Restore `upload_to`
-            self.field.upload_to = upload_to
 
         return success
 
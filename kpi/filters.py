@@ -1,4 +1,6 @@
 # coding: utf-8
+from collections import defaultdict
+
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import FieldError
@@ -36,9 +38,14 @@ from kpi.models.asset import AssetDeploymentStatus, UserAssetSubscription
 from kpi.utils.django_orm_helper import OrderCustomCharField
 from kpi.utils.query_parser import get_parsed_parameters, parse, ParseError
 from kpi.utils.object_permission import (
+    get_cached_accessible_asset_ids,
+    get_cached_public_asset_ids,
+    get_database_user,
     get_objects_for_user,
     get_anonymous_user,
     get_perm_ids_from_code_names,
+    set_cached_accessible_asset_ids,
+    set_cached_public_asset_ids,
 )
 from kpi.utils.permissions import is_user_anonymous
 from .models import Asset, ObjectPermission
@@ -167,13 +174,50 @@ class KpiObjectPermissionsFilter:
             assets = owned_and_explicit_shared.union(self._get_publics())
             return queryset.filter(pk__in=assets)
 
-        subscribed = self._get_subscribed(user)
+        if not settings.ACCESSIBLE_ASSETS_CACHE_ENABLED:
+            asset_ids = self._get_accessible_asset_ids(
+                user, owned_and_explicit_shared
+            )
+            return queryset.filter(pk__in=asset_ids)
+
+        # Assets of the user and public assets are cached apart, thus making
+        # an asset public does not make the lists of all users obsolete
+        user_id = get_database_user(user).pk
+        user_asset_ids, version = get_cached_accessible_asset_ids(user_id)
+        if user_asset_ids is None:
+            user_asset_ids = self._get_user_asset_ids(
+                user, owned_and_explicit_shared
+            )
+            set_cached_accessible_asset_ids(user_id, version, user_asset_ids)
+
+        public_asset_ids, public_version = get_cached_public_asset_ids()
+        if public_asset_ids is None:
+            public_asset_ids = self._get_public_asset_ids()
+            set_cached_public_asset_ids(public_version, public_asset_ids)
+
+        asset_ids = set(user_asset_ids['owned_and_shared'])
+        publics = set(public_asset_ids['asset_ids'])
+        for asset_id in user_asset_ids['subscribed']:
+            if asset_id in publics:
+                asset_ids.add(asset_id)
+                asset_ids.update(public_asset_ids['children'].get(asset_id, []))
+
+        return queryset.filter(pk__in=asset_ids)
+
+    @classmethod
+    def _get_accessible_asset_ids(
+        cls, user: 'auth.User', owned_and_explicit_shared: QuerySet
+    ) -> list[int]:
+        """
+        Return the ids of all the assets `user` can list
+        """
+        subscribed = cls._get_subscribed(user)
 
         # As other places in the code, coerce `asset_ids` as a list to force
         # the query to be processed right now. Otherwise, because queryset is
         # a lazy query, Django creates (left) joins on tables when queryset is
         # interpreted and it is way slower than running this extra query.
-        asset_ids = list(
+        return list(
             (
                 owned_and_explicit_shared
                     .union(subscribed)
@@ -181,10 +225,51 @@ class KpiObjectPermissionsFilter:
                     # the assets themselves, we append children of subscribed
                     # collections to the queryset in order for `?q=parent__uid`
                     # queries to return the collection's children
-                    .union(queryset.filter(parent__in=subscribed).values('pk'))
+                    .union(
+                        Asset.objects.filter(parent__in=subscribed).values('pk')
+                    )
             ).values_list('id', flat=True)
         )
-        return queryset.filter(pk__in=asset_ids)
+
+    @classmethod
+    def _get_public_asset_ids(cls) -> dict:
+        """
+        Return the ids of all public assets, and the ids of the children of
+        each public collection, to be cached for all users
+        """
+        publics = cls._get_publics()
+        children = defaultdict(list)
+        for parent_id, asset_id in Asset.objects.filter(
+            parent__in=publics
+        ).values_list('parent_id', 'id'):
+            children[parent_id].append(asset_id)
+        return {
+            'asset_ids': list(publics.values_list('asset', flat=True)),
+            'children': dict(children),
+        }
+
+    @staticmethod
+    def _get_user_asset_ids(
+        user: 'auth.User', owned_and_explicit_shared: QuerySet
+    ) -> dict:
+        """
+        Return the ids of the assets `user` owns or has been granted access
+        to, and of the assets they have subscribed to. Subscriptions are
+        only effective on public assets (see `_get_public_asset_ids()`).
+        """
+        if is_user_anonymous(user):
+            user = get_anonymous_user()
+
+        return {
+            'owned_and_shared': list(
+                owned_and_explicit_shared.values_list('asset', flat=True)
+            ),
+            'subscribed': list(
+                UserAssetSubscription.objects.filter(user=user).values_list(
+                    'asset_id', flat=True
+                )
+            ),
+        }
 
     def _get_queryset_for_data_sharing_enabled(
         self, request: Request, queryset: QuerySet
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+
+from kpi.constants import ASSET_TYPE_SURVEY
+from kpi.exceptions import KobocatDeploymentException
+from kpi.models.asset import Asset
+
+
+class Command(BaseCommand):
+
+    help = 'Let KoBoCAT know which projects share their data, i.e. populate ' \
+           '`XForm.has_kpi_hooks` of `Asset`s whose data sharing was ' \
+           'enabled before KoBoCAT notified KPI of incoming submissions'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--username',
+            action='store',
+            dest='username',
+            default=False,
+            help='Only modify `XForm`s whose corresponding `Asset`s belong '
+                 'to a specific user'
+        )
+
+        parser.add_argument(
+            "--chunks",
+            default=1000,
+            type=int,
+            help="Update records by batch of `chunks`.",
+        )
+
+    def handle(self, *args, **options):
+
+        chunks = options['chunks']
+        verbosity = options['verbosity']
+        username = options['username']
+
+        # Counters
+        cpt = 0
+        cpt_failed = 0
+
+        query = Asset.objects.deployed().filter(
+            asset_type=ASSET_TYPE_SURVEY, data_sharing__enabled=True
+        )
+        if username:
+            query = query.filter(owner__username=username)
+
+        total = query.count()
+
+        # Use only fields we need (`has_submission_listeners` needs `hooks`
+        # and `data_sharing`).
+        assets = query.only(
+            'id', 'uid', '_deployment_data', 'data_sharing', 'owner_id'
+        )
+
+        for asset in assets.iterator(chunk_size=chunks):
+            try:
+                asset.deployment.set_has_kpi_hooks()
+            except KobocatDeploymentException as e:
+                if verbosity >= 2:
+                    self.stdout.write(
+                        '\nERROR: Asset #{}: {}'.format(asset.id, str(e))
+                    )
+                cpt_failed += 1
+            else:
+                # Avoid `Asset.save()` logic. Do not touch `modified_date`
+                Asset.objects.filter(pk=asset.id).update(
+                    _deployment_data=asset.deployment.get_data()
+                )
+
+            cpt += 1
+            if verbosity >= 1:
+                progress = '\rUpdated {cpt}/{total} records...'.format(
+                    cpt=cpt,
+                    total=total
+                )
+                self.stdout.write(progress)
+                self.stdout.flush()
+
+        self.stdout.write('\nSummary:')
+        self.stdout.write(f'Successfully populated: {cpt - cpt_failed}')
+        self.stdout.write(f'Failed: {cpt_failed}')
+
+        self.stdout.write('\nDone!')
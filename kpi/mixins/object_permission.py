@@ -24,14 +24,19 @@ from kpi.constants import (
 from kpi.deployment_backends.kc_access.utils import (
     remove_applicable_kc_permissions,
     assign_applicable_kc_permissions,
+    bulk_assign_applicable_kc_permissions,
+    bulk_remove_applicable_kc_permissions,
     kc_transaction_atomic,
 )
 from kpi.models.object_permission import ObjectPermission
 from kpi.utils.object_permission import (
+    get_cached_code_names,
+    get_cached_object_permissions,
     get_database_user,
     perm_parse,
     post_assign_perm,
     post_remove_perm,
+    set_cached_object_permissions,
 )
 from kpi.utils.permissions import is_user_anonymous
 from kpi.utils.project_views import (
@@ -555,6 +560,206 @@ class ObjectPermissionMixin:
         self.recalculate_descendants_perms()
         return new_permission
 
+    @classmethod
+    @transaction.atomic
+    @kc_transaction_atomic
+    def bulk_assign_perms(
+        cls,
+        objs: list,
+        users: list,
+        perms: list[str],
+        deny: bool = False,
+        skip_kc: bool = False,
+    ) -> list[ObjectPermission]:
+        r"""
+            Assign every user of `users` all `perms` on each object of `objs`.
+            It is equivalent to calling `assign_perm()` for each combination,
+            but implied and contradictory permissions are resolved in memory,
+            rows are written with one bulk query, applicable KC permissions are
+            synced once per object and descendants' permissions are
+            recalculated once per affected tree.
+            Partial permissions cannot be assigned in bulk.
+            :param objs: list. Objects sharing this class. Duplicates are
+                ignored
+            :param users: list of :py:class:`User` or :py:class:`AnonymousUser`
+            :param perms: list. The `codename`s of the `Permission`s
+            :param deny: bool. When `True`, break inheritance from parent object
+            :param skip_kc: bool. When `True`, skip assignment of applicable KC
+                permissions
+            :return: list. The newly created permissions
+        """
+        # The same object passed twice would get its permissions created
+        # twice
+        objs = list({obj.pk: obj for obj in objs}.values())
+
+        users_by_id = {}
+        has_anonymous_user = False
+        for user_obj in users:
+            if is_user_anonymous(user_obj):
+                has_anonymous_user = True
+            user_obj = get_database_user(user_obj)
+            users_by_id[user_obj.pk] = user_obj
+
+        # Validate requested permissions and resolve implied ones, e.g.
+        # granting change implies granting view
+        requested_codenames_per_obj = {}
+        codenames_per_obj = {}
+        for obj in objs:
+            assignable_permissions = obj.get_assignable_permissions()
+            requested_codenames = set()
+            codenames = set()
+            for perm in perms:
+                app_label, codename = perm_parse(perm, obj)
+                if codename not in assignable_permissions:
+                    # Some permissions are calculated and not stored in the
+                    # database
+                    raise serializers.ValidationError({
+                        'permission': f'{codename} cannot be assigned explicitly to {obj}'
+                    })
+                if codename.startswith(PREFIX_PARTIAL_PERMS):
+                    raise serializers.ValidationError({
+                        'permission': f'{codename} cannot be assigned in bulk'
+                    })
+                fq_permission = f'{app_label}.{codename}'
+                if (
+                    has_anonymous_user
+                    and not deny
+                    and fq_permission
+                    not in settings.ALLOWED_ANONYMOUS_PERMISSIONS
+                ):
+                    raise serializers.ValidationError({
+                        'permission': f'Anonymous users cannot be granted the permission {codename}.'
+                    })
+                requested_codenames.add(codename)
+                codenames.add(codename)
+                codenames.update(
+                    obj.get_implied_perms(
+                        codename, reverse=deny, for_instance=obj
+                    ).intersection(assignable_permissions)
+                )
+            requested_codenames_per_obj[obj.pk] = requested_codenames
+            codenames_per_obj[obj.pk] = codenames
+
+        # Fetch all existing permissions at once
+        existing_perms = defaultdict(list)
+        for existing_perm in ObjectPermission.objects.filter(
+            asset_id__in=codenames_per_obj.keys(),
+            user_id__in=users_by_id.keys(),
+        ).values(
+            'pk',
+            'asset_id',
+            'user_id',
+            'permission__codename',
+            'deny',
+            'inherited',
+        ):
+            existing_perms[
+                (existing_perm['asset_id'], existing_perm['user_id'])
+            ].append(existing_perm)
+
+        perm_ids = {
+            codename: values['id']
+            for codename, values in get_cached_code_names(cls).items()
+        }
+        uid_field = ObjectPermission._meta.get_field('uid')
+        contradictory_perm_ids = set()
+        contradictory_codenames_per_obj = defaultdict(lambda: defaultdict(list))
+        created_codenames_per_obj = defaultdict(lambda: defaultdict(list))
+        new_permissions = []
+        for obj in objs:
+            for user_id in users_by_id.keys():
+                user_existing_perms = existing_perms[(obj.pk, user_id)]
+                for codename in codenames_per_obj[obj.pk]:
+                    if any(
+                        not existing_perm['inherited']
+                        and existing_perm['deny'] == deny
+                        and existing_perm['permission__codename'] == codename
+                        for existing_perm in user_existing_perms
+                    ):
+                        # The user already has this permission directly applied
+                        continue
+
+                    # Remove any explicitly-defined contradictory grants or
+                    # denials
+                    contradictory_codenames = []
+                    if not deny:
+                        contradictory_codenames = cls.CONTRADICTORY_PERMISSIONS.get(
+                            codename, []
+                        )
+                    for existing_perm in user_existing_perms:
+                        existing_codename = existing_perm['permission__codename']
+                        if (
+                            existing_codename == codename
+                            and existing_perm['deny'] != deny
+                            and not existing_perm['inherited']
+                        ) or existing_codename in contradictory_codenames:
+                            contradictory_perm_ids.add(existing_perm['pk'])
+                            contradictory_codenames_per_obj[obj.pk][
+                                user_id
+                            ].append(existing_codename)
+
+                    new_permissions.append(
+                        ObjectPermission(
+                            asset=obj,
+                            user_id=user_id,
+                            permission_id=perm_ids[codename],
+                            deny=deny,
+                            inherited=False,
+                            uid=uid_field.generate_uid(),
+                        )
+                    )
+                    created_codenames_per_obj[obj.pk][user_id].append(codename)
+
+        ObjectPermission.objects.filter(pk__in=contradictory_perm_ids).delete()
+        ObjectPermission.objects.bulk_create(new_permissions)
+
+        for obj in objs:
+            if not skip_kc:
+                if deny:
+                    # Check if any KC permissions should be removed as well
+                    bulk_remove_applicable_kc_permissions(
+                        obj, contradictory_codenames_per_obj[obj.pk]
+                    )
+                else:
+                    bulk_assign_applicable_kc_permissions(
+                        obj, created_codenames_per_obj[obj.pk]
+                    )
+
+            requested_codenames = requested_codenames_per_obj[obj.pk]
+            obj._bulk_update_partial_permissions(
+                list(users_by_id.keys()), requested_codenames
+            )
+            for user_id, codenames in created_codenames_per_obj[obj.pk].items():
+                for codename in requested_codenames.intersection(codenames):
+                    post_assign_perm.send(
+                        sender=cls,
+                        instance=obj,
+                        user=users_by_id[user_id],
+                        codename=codename,
+                    )
+
+        # Recalculate descendants only once per tree, i.e. skip objects whose
+        # ancestors are part of `objs` because they are recalculated as well
+        parent_ids = {obj.pk: obj.parent_id for obj in objs}
+
+        def has_ancestor_in_objs(obj_) -> bool:
+            parent_id = obj_.parent_id
+            while parent_id is not None:
+                if parent_id in codenames_per_obj:
+                    return True
+                if parent_id not in parent_ids:
+                    parent_ids[parent_id] = cls.objects.values_list(
+                        'parent_id', flat=True
+                    ).get(pk=parent_id)
+                parent_id = parent_ids[parent_id]
+            return False
+
+        for obj in objs:
+            if not has_ancestor_in_objs(obj):
+                obj.recalculate_descendants_perms()
+
+        return new_permissions
+
     def get_perms(self, user_obj: 'auth.User') -> list[str]:
         """
         Return a list of codenames of all effective grant permissions that
@@ -731,6 +936,13 @@ class ObjectPermissionMixin:
         # Let the dev implement within the classes that inherit from this mixin
         pass
 
+    def _bulk_update_partial_permissions(
+        self, user_ids: list[int], codenames: set[str]
+    ):
+        # Class is not an abstract class. Just pass.
+        # Let the dev implement within the classes that inherit from this mixin
+        pass
+
     @staticmethod
     @cache_for_request
     def __get_all_object_permissions(object_id):
@@ -748,6 +960,9 @@ class ObjectPermissionMixin:
         for another user, in subsequent calls, they can be easily retrieved
         by the returned dict keys.
 
+        If `settings.OBJECT_PERMISSION_CACHE_ENABLED` is True, object
+        permissions are also shared between requests.
+
         Args:
             object_id (int): Object's pk
 
@@ -765,18 +980,14 @@ class ObjectPermissionMixin:
                 ]
             }
         """
-        records = ObjectPermission.objects.filter(asset_id=object_id).values(
-            'user_id', 'permission_id', 'permission__codename', 'deny'
-        )
-        object_permissions_per_user = defaultdict(list)
-        for record in records:
-            object_permissions_per_user[record['user_id']].append((
-                record['permission_id'],
-                record['permission__codename'],
-                record['deny'],
-            ))
+        if settings.OBJECT_PERMISSION_CACHE_ENABLED:
+            return ObjectPermissionMixin.__get_shared_object_permissions(
+                [object_id]
+            )[object_id]
 
-        return object_permissions_per_user
+        return ObjectPermissionMixin.__load_object_permissions([object_id])[
+            object_id
+        ]
 
     @staticmethod
     @cache_for_request
@@ -797,6 +1008,10 @@ class ObjectPermissionMixin:
         for another object (i.e. `Asset`), in subsequent calls,
         they can be easily retrieved by the returned dict keys.
 
+        If `settings.OBJECT_PERMISSION_CACHE_ENABLED` is True and `asset_ids`
+        are passed, object permissions of this user are read from (and
+        written to) the cache shared between requests, per asset.
+
         Args:
             user_id (int): User's pk
 
@@ -814,6 +1029,84 @@ class ObjectPermissionMixin:
                 ]
             }
         """
+        if settings.OBJECT_PERMISSION_CACHE_ENABLED and asset_ids:
+            object_permissions_per_object = defaultdict(list)
+            user_permissions, versions = get_cached_object_permissions(
+                asset_ids, user_id=user_id
+            )
+            if missing_asset_ids := [
+                asset_id
+                for asset_id in asset_ids
+                if asset_id not in user_permissions
+            ]:
+                missing_user_permissions = (
+                    ObjectPermissionMixin.__load_user_permissions(
+                        user_id, missing_asset_ids
+                    )
+                )
+                # Cache assets without any permissions for this user as well
+                set_cached_object_permissions(
+                    {
+                        asset_id: missing_user_permissions.get(asset_id, [])
+                        for asset_id in missing_asset_ids
+                    },
+                    versions,
+                    user_id=user_id,
+                )
+                user_permissions.update(missing_user_permissions)
+
+            for asset_id, permissions in user_permissions.items():
+                if permissions:
+                    object_permissions_per_object[asset_id] = permissions
+            return object_permissions_per_object
+
+        return ObjectPermissionMixin.__load_user_permissions(
+            user_id, asset_ids
+        )
+
+    @staticmethod
+    def __get_shared_object_permissions(asset_ids: list) -> dict:
+        """
+        Retrieve object permissions of `asset_ids` from the cache shared
+        between requests. Only the missing ones are fetched from the DB (and
+        then cached).
+
+        Returns:
+            dict: {
+                '<object_id>': {
+                    '<user_id>': [
+                        (permission_id, permission_codename, deny),
+                        ...
+                    ],
+                    ...
+                },
+                ...
+            }
+        """
+        object_permissions, versions = get_cached_object_permissions(
+            asset_ids
+        )
+        if missing_asset_ids := [
+            asset_id
+            for asset_id in asset_ids
+            if asset_id not in object_permissions
+        ]:
+            missing_object_permissions = (
+                ObjectPermissionMixin.__load_object_permissions(
+                    missing_asset_ids
+                )
+            )
+            set_cached_object_permissions(missing_object_permissions, versions)
+            object_permissions.update(missing_object_permissions)
+
+        return object_permissions
+
+    @staticmethod
+    def __load_user_permissions(user_id: int, asset_ids: list = None) -> dict:
+        """
+        Fetch object permissions of `user_id` from the DB, grouped by object
+        ids. Query is restricted to `asset_ids` if they are passed.
+        """
         filters = {'user': user_id}
         if asset_ids:
             filters['asset_id__in'] = asset_ids
@@ -831,6 +1124,32 @@ class ObjectPermissionMixin:
 
         return object_permissions_per_object
 
+    @staticmethod
+    def __load_object_permissions(asset_ids: list) -> dict:
+        """
+        Fetch object permissions of `asset_ids` from the DB, grouped by
+        object ids, then by user ids.
+        """
+        records = ObjectPermission.objects.filter(
+            asset_id__in=asset_ids
+        ).values(
+            'asset_id', 'user_id', 'permission_id', 'permission__codename',
+            'deny'
+        )
+        object_permissions_per_object = {
+            asset_id: defaultdict(list) for asset_id in asset_ids
+        }
+        for record in records:
+            object_permissions_per_object[record['asset_id']][
+                record['user_id']
+            ].append((
+                record['permission_id'],
+                record['permission__codename'],
+                record['deny'],
+            ))
+
+        return object_permissions_per_object
+
     def __get_object_permissions(self, deny, user=None, codename=None):
         """
         Returns a set of user ids and object permission ids related to
@@ -893,6 +1212,13 @@ class ObjectPermissionMixin:
                 )
 
             if not is_user_anonymous(user):
+                if (
+                    settings.OBJECT_PERMISSION_CACHE_ENABLED
+                    and not asset_ids_cache
+                ):
+                    # Only this object is needed, and its permissions are
+                    # likely to be in the shared cache already.
+                    asset_ids_cache = [self.pk]
                 all_object_permissions = self.__get_all_user_permissions(
                     user_id=user.pk,
                     asset_ids=asset_ids_cache
@@ -74,7 +74,6 @@ from kpi.mixins import (
     XlsExportableMixin,
     StandardizeSearchableFieldMixin,
 )
-from kpi.models.asset_file import AssetFile
 from kpi.models.asset_snapshot import AssetSnapshot
 from kpi.models.asset_user_partial_permission import AssetUserPartialPermission
 from kpi.models.asset_version import AssetVersion
@@ -428,6 +427,7 @@ class Asset(ObjectPermissionMixin,
         # be the comparison is accurate.
         self.__parent_id_copy = -1
         self.__deployment_data_copy = None
+        self.__paired_data_copy = None
         self.__copy_hidden_fields()
 
     def __str__(self):
@@ -738,11 +738,22 @@ class Asset(ObjectPermissionMixin,
     def has_active_hooks(self):
         """
         Returns if asset has active hooks.
-        Useful to update `kc.XForm.has_kpi_hooks` field.
         :return: {boolean}
         """
         return self.hooks.filter(active=True).exists()
 
+    @property
+    def has_submission_listeners(self):
+        """
+        Returns whether KPI needs to be notified when a submission comes in,
+        i.e. if asset has active hooks or shares its data with other projects.
+        Useful to update `kc.XForm.has_kpi_hooks` field.
+        :return: {boolean}
+        """
+        return bool(
+            self.data_sharing.get('enabled') or self.has_active_hooks
+        )
+
     @property
     def has_advanced_features(self):
         if self.advanced_features is None:
@@ -999,8 +1010,15 @@ class Asset(ObjectPermissionMixin,
                 # children.
                 self.parent.update_languages()
 
-        if self.has_deployment:
-            self.deployment.sync_media_files(AssetFile.PAIRED_DATA)
+        # Synchronize paired data with the deployment back end only when it has
+        # changed. `deploy()` schedules it on its own.
+        if (
+            'paired_data' not in self.get_deferred_fields()
+            and self.paired_data != self.__paired_data_copy
+        ):
+            if self.has_deployment:
+                self.sync_paired_data_files_async()
+            self.__copy_hidden_fields(fields=['paired_data'])
 
         if create_version:
             self.create_version()
@@ -1357,15 +1375,32 @@ class Asset(ObjectPermissionMixin,
         elif perm in self.CONTRADICTORY_PERMISSIONS.get(PERM_PARTIAL_SUBMISSIONS):
             clean_up_table()
 
+    def _bulk_update_partial_permissions(
+        self, user_ids: list[int], codenames: set[str]
+    ):
+        """
+        Remove partial permissions of `user_ids` on this asset if any of
+        `codenames` contradicts `PERM_PARTIAL_SUBMISSIONS`.
+        See `_update_partial_permissions()`
+        """
+        if codenames.intersection(
+            self.CONTRADICTORY_PERMISSIONS.get(PERM_PARTIAL_SUBMISSIONS)
+        ):
+            self.asset_partial_permissions.filter(
+                user_id__in=user_ids
+            ).delete()
+
     def __copy_hidden_fields(self, fields: Optional[list] = None):
         """
-        Save a copy of `parent_id` and `_deployment_data` for these purposes
-        `save()` respectively.
+        Save a copy of `parent_id`, `_deployment_data` and `paired_data` for
+        these purposes `save()` respectively.
 
         - `self.__parent_id_copy` is used to detect whether asset is linked a
            different parent
         - `self.__deployment_data_copy` is used to detect whether
           `_deployment_data` has been altered directly
+        - `self.__paired_data_copy` is used to detect whether paired data
+          must be synchronized with the deployment back end
         """
 
         # When fields are deferred, Django instantiates another copy
@@ -1387,6 +1422,11 @@ class Asset(ObjectPermissionMixin,
         ):
             self.__deployment_data_copy = copy.deepcopy(
                 self._deployment_data)
+        if (
+            fields is None and 'paired_data' not in self.get_deferred_fields()
+            or fields and 'paired_data' in fields
+        ):
+            self.__paired_data_copy = copy.deepcopy(self.paired_data)
 
 
 class UserAssetSubscription(models.Model):
@@ -2,9 +2,11 @@
 import base64
 import datetime
 import dateutil.parser
+import itertools
 import os
 import posixpath
 import re
+import shutil
 import tempfile
 from collections import defaultdict
 from io import BytesIO
@@ -17,6 +19,7 @@ except ImportError:
 
 import constance
 import requests
+from celery import chord
 from django.conf import settings
 from django.contrib.postgres.indexes import BTreeIndex, HashIndex
 from django.core.files.storage import FileSystemStorage
@@ -44,7 +47,6 @@ from openpyxl.utils.exceptions import InvalidFileException
 from pyxform.xls2json_backends import xls_to_dict, xlsx_to_dict
 
 from kobo.apps.reports.report_data import build_formpack
-from kobo.apps.subsequences.utils import stream_with_extras
 from kpi.constants import (
     ASSET_TYPE_COLLECTION,
     ASSET_TYPE_EMPTY,
@@ -54,9 +56,10 @@ from kpi.constants import (
     PERM_PARTIAL_SUBMISSIONS,
     PERM_VIEW_SUBMISSIONS,
 )
-from kpi.exceptions import XlsFormatException
+from kpi.exceptions import FormpackIncompatibilityError, XlsFormatException
 from kpi.fields import KpiUidField
 from kpi.models import Asset
+from kpi.utils.django_orm_helper import IncrementValue
 from kpi.utils.log import logging
 from kpi.utils.models import (
     _load_library_content,
@@ -135,8 +138,12 @@ class ImportExportTask(models.Model):
 
         msgs = defaultdict(list)
         try:
-            # This method must be implemented by a subclass
-            self._run_task(msgs)
+            # This method must be implemented by a subclass. It returns
+            # `PROCESSING` when the job has been handed over to background
+            # tasks which complete it on their own.
+            if self._run_task(msgs) == self.PROCESSING:
+                self.refresh_from_db()
+                return self
             self.status = self.COMPLETE
         except ExportTaskBase.InaccessibleData as e:
             msgs['error_type'] = t('Cannot access data')
@@ -570,6 +577,7 @@ class ExportTaskBase(ImportExportTask):
     }
 
     TIMESTAMP_KEY = '_submission_time'
+    MERGE_BUFFER_SIZE = 5 * 1024 * 1024
     # Above 244 seems to cause 'Download error' in Chrome 64/Linux
     MAXIMUM_FILENAME_LENGTH = 240
 
@@ -717,14 +725,53 @@ class ExportTaskBase(ImportExportTask):
             return hierarchy_in_labels.lower() == 'true'
         return hierarchy_in_labels
 
+    @staticmethod
+    def _get_csv_header_line_count(export: formpack.reporting.Export) -> int:
+        return len(list(export.to_csv([])))
+
+    @staticmethod
+    def _set_export_start_index(
+        export: formpack.reporting.Export, start_index: int
+    ):
+        """
+        formpack numbers the rows of each section (`_index`) from 1. Make the
+        numbering of the main section start at `start_index` instead, to
+        follow rows which have been rendered separately.
+
+        formpack does not expose this counter, thus its private `_indexes`
+        attribute is altered. It relies on the version of formpack pinned in
+        `dependencies/pip/requirements.txt` (see
+        `test_csv_export_start_index`). Fail loudly if it is missing, instead
+        of silently restarting `_index` at 1 in each fragment.
+        """
+        indexes = getattr(export, '_indexes', None)
+        if not isinstance(indexes, dict) or not indexes:
+            raise FormpackIncompatibilityError(
+                'Cannot set the start index of the export: formpack '
+                '`Export._indexes` is missing'
+            )
+        main_section = next(iter(indexes))
+        indexes[main_section] = start_index
+
     def _record_last_submission_time(self, submission_stream):
         """
         Internal generator that yields each submission in the given
         `submission_stream` while recording the most recent submission
-        timestamp in `self.last_submission_time`
+        timestamp in `self.last_submission_time`. The number of submissions
+        and the highest submission id are recorded in `self.data`
+        (`submission_count` and `last_submission_id`) as well.
         """
         # FIXME: Mongo has only per-second resolution. Brutal.
         for submission in submission_stream:
+            self.data['submission_count'] = (
+                self.data.get('submission_count', 0) + 1
+            )
+            submission_id = submission.get('_id')
+            if (
+                submission_id is not None
+                and submission_id > self.data.get('last_submission_id', 0)
+            ):
+                self.data['last_submission_id'] = submission_id
             try:
                 timestamp = submission[self.TIMESTAMP_KEY]
             except KeyError:
@@ -763,6 +810,8 @@ class ExportTaskBase(ImportExportTask):
         export, submission_stream = self.get_export_object()
         filename = self._build_export_filename(export, export_type)
         absolute_filepath = self.get_absolute_filepath(filename)
+        self.data['submission_count'] = 0
+        self.data['last_submission_id'] = 0
 
         with self.result.storage.open(absolute_filepath, 'wb') as output_file:
             if export_type == 'csv':
@@ -780,20 +829,12 @@ class ExportTaskBase(ImportExportTask):
                         prefix='export_xlsx', mode='rb'
                 ) as xlsx_output_file:
                     export.to_xlsx(xlsx_output_file.name, submission_stream)
-                    # TODO: chunk again once
-                    # https://github.com/jschneier/django-storages/issues/449
-                    # is fixed
-                    # TODO: Check if monkey-patch (line 57) can restore writing
-                    # by chunk
-                    """
-                    while True:
-                        chunk = xlsx_output_file.read(5 * 1024 * 1024)
-                        if chunk:
-                            output_file.write(chunk)
-                        else:
-                            break
-                    """
-                    output_file.write(xlsx_output_file.read())
+                    # Copy the workbook by chunks to keep memory usage low.
+                    # S3 uploads each chunk as a part of a multipart upload,
+                    # Azure spools them to disk before uploading the blob.
+                    shutil.copyfileobj(
+                        xlsx_output_file, output_file, self.MERGE_BUFFER_SIZE
+                    )
             elif export_type == 'spss_labels':
                 export.to_spss_labels(output_file)
 
@@ -804,7 +845,9 @@ class ExportTaskBase(ImportExportTask):
             # method, thus we cannot update only specific fields.
             self.save()
         else:
-            self.save(update_fields=['result', 'last_submission_time'])
+            self.save(
+                update_fields=['result', 'last_submission_time', 'data']
+            )
 
     def delete(self, *args, **kwargs):
         # removing exported file from storage
@@ -812,16 +855,31 @@ class ExportTaskBase(ImportExportTask):
         super().delete(*args, **kwargs)
 
     def get_export_object(
-        self, source: Optional[Asset] = None
+        self,
+        source: Optional[Asset] = None,
+        id_range: Optional[Tuple[int, Optional[int]]] = None,
     ) -> Tuple[formpack.reporting.Export, Generator]:
         """
         Get the formpack Export object and submission stream for processing.
+
+        If `id_range` is provided, the stream is narrowed down to submissions
+        whose `_id` is greater than `id_range[0]` and lower than or equal to
+        `id_range[1]` (unbounded if `None`).
         """
 
         fields = self.data.get('fields', [])
         query = self.data.get('query', {})
         submission_ids = self.data.get('submission_ids', [])
 
+        if id_range is not None:
+            after, until = id_range
+            id_query = {'$gt': after}
+            if until is not None:
+                id_query['$lte'] = until
+            # Use `$and` to avoid colliding with `_id` in `query` or with
+            # `submission_ids`
+            query = {'$and': [query, {'_id': id_query}]}
+
         if source is None:
             source_url = self.data.get('source', False)
             if not source_url:
@@ -851,9 +909,7 @@ class ExportTaskBase(ImportExportTask):
             query=query,
         )
 
-        if source.has_advanced_features:
-            submission_stream = stream_with_extras(submission_stream, source)
-
+        # Supplemental details are already merged by the deployment backend
         pack, submission_stream = build_formpack(
             source, submission_stream, self._fields_from_all_versions
         )
@@ -931,9 +987,36 @@ class ExportTaskBase(ImportExportTask):
 
 class ExportTask(ExportTaskBase):
     """
-    An asynchronous export task, to be run with Celery
+    An asynchronous export task, to be run with Celery.
+
+    CSV exports of big projects are split into ranges of submission `_id`s
+    (see `settings.EXPORT_CHUNK_SIZE`). Each range is rendered by its own
+    Celery subtask (see `export_chunk()`) and the fragments are merged once
+    they are all complete (see `merge_chunks()`). XLSX workbooks cannot be
+    concatenated and are always generated in one pass.
+
+    Incremental CSV exports (`data['incremental']`) append the submissions
+    received since the previous export with the same settings to a copy of
+    its result (see `_get_incremental_base_export()`).
     """
 
+    # Settings which alter the content of the result
+    OUTPUT_SETTINGS = (
+        'fields',
+        'fields_from_all_versions',
+        'flatten',
+        'group_sep',
+        'hierarchy_in_labels',
+        'include_media_url',
+        'lang',
+        'multiple_select',
+        'query',
+        'submission_ids',
+        'tag_cols_for_header',
+        'type',
+        'xls_types_as_text',
+    )
+
     def _run_task(self, messages):
         try:
             source_url = self.data['source']
@@ -943,12 +1026,382 @@ class ExportTask(ExportTaskBase):
         # Take this opportunity to do some housekeeping
         self.log_and_mark_stuck_as_errored(self.user, source_url)
 
-        super()._run_task(messages)
+        base_export = self._get_incremental_base_export()
+        if base_export is not None:
+            self._run_incremental_task(base_export)
+        else:
+            chunks = self._get_chunks()
+            if len(chunks) > 1:
+                self._run_chunked_task(chunks)
+                return self.PROCESSING
+
+            super()._run_task(messages)
 
         # Now that a new export has completed successfully, remove any old
         # exports in excess of the per-user, per-form limit
         self.remove_excess(self.user, source_url)
 
+    def export_chunk(
+        self,
+        chunk_index: int,
+        id_range: Tuple[int, Optional[int]],
+        start_index: int,
+    ) -> dict:
+        """
+        Render the CSV fragment of the submissions within `id_range` and save
+        it to storage. Only the first fragment contains the headers. Rows are
+        numbered (`_index`) from `start_index`.
+
+        Return the path of the fragment, the most recent submission time,
+        the number of submissions and the highest submission id it contains,
+        to be passed to `merge_chunks()`.
+        """
+        export, submission_stream = self.get_export_object(id_range=id_range)
+        header_line_count = self._get_csv_header_line_count(export)
+        self._set_export_start_index(export, start_index)
+        self.data['submission_count'] = 0
+        self.data['last_submission_id'] = 0
+
+        lines = export.to_csv(submission_stream)
+        if chunk_index > 0:
+            lines = itertools.islice(lines, header_line_count, None)
+
+        storage = self.result.storage
+        # Remove the fragment of a previous attempt, if any, for its path to
+        # stay predictable (see `_delete_chunks()`)
+        storage.delete(self._get_chunk_filepath(chunk_index))
+        fragment_filepath = self.get_absolute_filepath(
+            self._get_chunk_filename(chunk_index)
+        )
+        try:
+            with storage.open(fragment_filepath, 'wb') as output_file:
+                for line in lines:
+                    output_file.write((line + "\r\n").encode('utf-8'))
+        except Exception:
+            storage.delete(fragment_filepath)
+            raise
+
+        self._meta.model.objects.filter(pk=self.pk).update(
+            data=IncrementValue('data', keyname='processed_chunks', increment=1)
+        )
+
+        # Another chunk may have failed (and cleaned up the fragments) while
+        # this one was rendered. The fragments will never be merged.
+        if self._meta.model.objects.filter(
+            pk=self.pk, status=self.ERROR
+        ).exists():
+            storage.delete(fragment_filepath)
+
+        last_submission_time = None
+        if self.last_submission_time:
+            last_submission_time = self.last_submission_time.isoformat()
+
+        return {
+            'filepath': fragment_filepath,
+            'last_submission_time': last_submission_time,
+            'submission_count': self.data['submission_count'],
+            'last_submission_id': self.data['last_submission_id'],
+        }
+
+    def merge_chunks(self, chunks: List[dict]):
+        """
+        Concatenate the CSV fragments generated by `export_chunk()` into
+        the final result, then complete the export.
+        """
+        self.refresh_from_db()
+        storage = self.result.storage
+        export, _ = self.get_export_object(id_range=(0, 0))
+        filename = self._build_export_filename(export, 'csv')
+        absolute_filepath = self.get_absolute_filepath(filename)
+        self.data['submission_count'] = 0
+        self.data['last_submission_id'] = 0
+
+        with storage.open(absolute_filepath, 'wb') as output_file:
+            for chunk in chunks:
+                with storage.open(chunk['filepath'], 'rb') as fragment:
+                    shutil.copyfileobj(
+                        fragment, output_file, self.MERGE_BUFFER_SIZE
+                    )
+                storage.delete(chunk['filepath'])
+
+                self.data['submission_count'] += chunk['submission_count']
+                self.data['last_submission_id'] = max(
+                    self.data['last_submission_id'],
+                    chunk['last_submission_id'],
+                )
+
+                if chunk['last_submission_time']:
+                    timestamp = datetime.datetime.fromisoformat(
+                        chunk['last_submission_time']
+                    )
+                    if (
+                        self.last_submission_time is None
+                        or timestamp > self.last_submission_time
+                    ):
+                        self.last_submission_time = timestamp
+
+        self.result = absolute_filepath
+        self.status = self.COMPLETE
+        self.data['processing_time_seconds'] = (
+            datetime.datetime.now(self.date_created.tzinfo) - self.date_created
+        ).total_seconds()
+        self.save(
+            update_fields=['result', 'last_submission_time', 'status', 'data']
+        )
+
+        self.remove_excess(self.user, self.data['source'])
+
+    def mark_as_errored(self, error: Exception):
+        """
+        Flag the export as failed when one of its background subtasks fails,
+        and delete the fragments rendered so far
+        """
+        logging.error(
+            'Failed to run %s: %s' % (self._meta.model_name, repr(error)),
+            exc_info=True
+        )
+        self.status = self.ERROR
+        self.messages.update(
+            {'error_type': type(error).__name__, 'error': str(error)}
+        )
+        self.save(update_fields=['status', 'messages'])
+        self._delete_chunks()
+
+    def _delete_chunks(self):
+        storage = self.result.storage
+        for chunk_index in range(self.data.get('total_chunks', 0)):
+            storage.delete(self._get_chunk_filepath(chunk_index))
+
+    def _get_chunk_filename(self, chunk_index: int) -> str:
+        return f'{self.uid}-chunk-{chunk_index}.csv'
+
+    def _get_chunk_filepath(self, chunk_index: int) -> str:
+        return self.result.field.generate_filename(
+            self,
+            self.result.storage.get_valid_name(
+                self._get_chunk_filename(chunk_index)
+            ),
+        )
+
+    def _get_incremental_base_export(self) -> Optional['ExportTask']:
+        """
+        Return the most recent completed export with the same settings, if
+        its result can be extended with the submissions received since.
+
+        `None` is returned, and a full export must be generated, if the
+        export is not incremental, or if the project, or any submission
+        included in that previous export (or its supplemental details), has
+        been modified or deleted since then.
+        """
+        export_type = self.data.get('type', '').lower()
+        if not self._incremental or export_type != 'csv' or not self.pk:
+            return None
+
+        output_settings = self._get_output_settings(self.data)
+        previous_exports = (
+            ExportTask.objects.filter(
+                user=self.user,
+                data__source=self.data['source'],
+                data__has_key='last_submission_id',
+                status=self.COMPLETE,
+            )
+            .exclude(pk=self.pk)
+            .order_by('-date_created')
+        )
+        for previous_export in previous_exports:
+            if self._get_output_settings(previous_export.data) == (
+                output_settings
+            ):
+                base_export = previous_export
+                break
+        else:
+            return None
+
+        if not base_export.result or not base_export.result.storage.exists(
+            base_export.result.name
+        ):
+            return None
+
+        try:
+            source = resolve_url_to_asset(self.data['source'])
+        except Asset.DoesNotExist:
+            raise self.InaccessibleData
+
+        # Columns may have changed, e.g. a new version has been deployed
+        if (
+            not source.has_deployment
+            or source.date_modified > base_export.date_created
+        ):
+            return None
+
+        last_submission_id = base_export.data['last_submission_id']
+        if source.deployment.submissions_modified_since(
+            base_export.date_created, until_submission_id=last_submission_id
+        ):
+            return None
+
+        # Transcripts and translations (supplemental details) are stored
+        # apart from the submissions
+        if source.submission_extras.filter(
+            date_modified__gt=base_export.date_created
+        ).exists():
+            return None
+
+        # Deleted submissions cannot be detected otherwise
+        submission_count = source.deployment.calculated_submission_count(
+            user=self.user,
+            submission_ids=self.data.get('submission_ids', []),
+            query={
+                '$and': [
+                    self.data.get('query', {}),
+                    {'_id': {'$lte': last_submission_id}},
+                ]
+            },
+        )
+        if submission_count != base_export.data['submission_count']:
+            return None
+
+        return base_export
+
+    @classmethod
+    def _get_output_settings(cls, data: dict) -> dict:
+        return {key: data.get(key) for key in cls.OUTPUT_SETTINGS}
+
+    @property
+    def _incremental(self) -> bool:
+        incremental = self.data.get('incremental', False)
+        # v1 exports expects a string
+        if isinstance(incremental, str):
+            return incremental.lower() == 'true'
+        return incremental
+
+    def _run_incremental_task(self, base_export: 'ExportTask'):
+        """
+        Copy the result of `base_export` and append the submissions received
+        since then.
+        """
+        export, submission_stream = self.get_export_object(
+            id_range=(base_export.data['last_submission_id'], None)
+        )
+        header_line_count = self._get_csv_header_line_count(export)
+        self._set_export_start_index(
+            export, base_export.data['submission_count'] + 1
+        )
+        self.last_submission_time = base_export.last_submission_time
+        self.data['submission_count'] = base_export.data['submission_count']
+        self.data['last_submission_id'] = base_export.data[
+            'last_submission_id'
+        ]
+        self.data['base_export'] = base_export.uid
+
+        filename = self._build_export_filename(export, 'csv')
+        absolute_filepath = self.get_absolute_filepath(filename)
+        base_storage = base_export.result.storage
+
+        with self.result.storage.open(absolute_filepath, 'wb') as output_file:
+            with base_storage.open(base_export.result.name, 'rb') as base_file:
+                shutil.copyfileobj(
+                    base_file, output_file, self.MERGE_BUFFER_SIZE
+                )
+            for line in itertools.islice(
+                export.to_csv(submission_stream), header_line_count, None
+            ):
+                output_file.write((line + "\r\n").encode('utf-8'))
+
+        self.result = absolute_filepath
+        self.save(update_fields=['result', 'last_submission_time', 'data'])
+
+    def _get_chunks(self) -> List[Tuple[int, Optional[int], int]]:
+        """
+        Split the submissions to export into ranges of `_id`s of
+        `settings.EXPORT_CHUNK_SIZE` submissions. Only CSV exports are split.
+
+        Return a list of `(after, until, submission_count)`, i.e. the range
+        bounds (see `get_export_object()`) and the number of submissions it
+        contained when the ranges have been computed.
+
+        Submissions are counted first, and nothing else is read from Mongo
+        when they fit in one chunk. Otherwise, Mongo seeks each boundary
+        right after the previous one, thus only the `_id`s of the boundaries
+        are retrieved.
+        """
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        export_type = self.data.get('type', '').lower()
+        if not chunk_size or export_type != 'csv' or not self.pk:
+            return [(0, None, 0)]
+
+        try:
+            source = resolve_url_to_asset(self.data['source'])
+        except Asset.DoesNotExist:
+            raise self.InaccessibleData
+
+        if not source.has_deployment:
+            return [(0, None, 0)]
+
+        query = self.data.get('query', {})
+        submission_ids = self.data.get('submission_ids', [])
+        count = source.deployment.calculated_submission_count(
+            self.user, query=query, submission_ids=submission_ids
+        )
+        if count <= chunk_size:
+            return [(0, None, count)]
+
+        chunks = []
+        after = 0
+        for _ in range((count - 1) // chunk_size):
+            # Use `$and` to avoid colliding with `_id` in `query` or with
+            # `submission_ids`
+            boundaries = list(
+                source.deployment.get_submissions(
+                    user=self.user,
+                    fields=['_id'],
+                    submission_ids=submission_ids,
+                    query={'$and': [query, {'_id': {'$gt': after}}]},
+                    sort={'_id': 1},
+                    start=chunk_size - 1,
+                    limit=1,
+                    skip_count=True,
+                )
+            )
+            if not boundaries:
+                # Submissions have been deleted meanwhile
+                break
+            chunks.append((after, boundaries[0]['_id'], chunk_size))
+            after = boundaries[0]['_id']
+
+        # The last range is unbounded to include submissions received while
+        # the export is running, like a non-chunked export would.
+        chunks.append((after, None, max(count - len(chunks) * chunk_size, 0)))
+        return chunks
+
+    def _run_chunked_task(self, chunks: List[Tuple[int, Optional[int], int]]):
+        from kpi.tasks import (
+            export_chunk_in_background,
+            merge_export_chunks_in_background,
+        )
+
+        self.data['total_chunks'] = len(chunks)
+        self.data['processed_chunks'] = 0
+        self.save(update_fields=['data'])
+
+        # Each fragment numbers its rows after the rows of the previous ones,
+        # as counted when the ranges have been computed
+        start_indexes = itertools.accumulate(
+            (submission_count for _, _, submission_count in chunks[:-1]),
+            initial=1,
+        )
+        chord(
+            export_chunk_in_background.s(
+                export_task_uid=self.uid,
+                chunk_index=chunk_index,
+                id_range=(after, until),
+                start_index=start_index,
+            )
+            for chunk_index, ((after, until, _), start_index) in enumerate(
+                zip(chunks, start_indexes)
+            )
+        )(merge_export_chunks_in_background.s(export_task_uid=self.uid))
+
 
 class SynchronousExport(ExportTaskBase):
     """
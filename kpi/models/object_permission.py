@@ -4,6 +4,56 @@ from django.db import models
 
 from kpi.fields.kpi_uid import KpiUidField
 from kpi.utils.cache import void_cache_for_request
+from kpi.utils.object_permission import bump_object_permissions_version
+
+
+class ObjectPermissionQuerySet(models.QuerySet):
+    """
+    Keep the versions of object permissions of assets, and of assets users
+    can access, up-to-date when they are altered in bulk (see
+    `bump_object_permissions_version()`). Permissions cached for the current
+    request are voided as well, like `ObjectPermission.save()` and
+    `ObjectPermission.delete()` do.
+    """
+
+    @void_cache_for_request(keys=('__get_all_object_permissions',
+                                  '__get_all_user_permissions',))
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bump_object_permissions_version(
+            {obj.asset_id for obj in objs}, {obj.user_id for obj in objs}
+        )
+        return objs
+
+    @void_cache_for_request(keys=('__get_all_object_permissions',
+                                  '__get_all_user_permissions',))
+    def delete(self):
+        asset_ids, user_ids = self._get_asset_and_user_ids()
+        result = super().delete()
+        bump_object_permissions_version(asset_ids, user_ids)
+        return result
+
+    @void_cache_for_request(keys=('__get_all_object_permissions',
+                                  '__get_all_user_permissions',))
+    def update(self, **kwargs):
+        asset_ids, user_ids = self._get_asset_and_user_ids()
+        result = super().update(**kwargs)
+        if 'user_id' in kwargs:
+            user_ids.add(kwargs['user_id'])
+        elif 'user' in kwargs:
+            user_ids.add(kwargs['user'].pk)
+        bump_object_permissions_version(asset_ids, user_ids)
+        return result
+
+    def _get_asset_and_user_ids(self) -> tuple[set, set]:
+        asset_ids = set()
+        user_ids = set()
+        for asset_id, user_id in self.order_by().values_list(
+            'asset_id', 'user_id'
+        ).distinct():
+            asset_ids.add(asset_id)
+            user_ids.add(user_id)
+        return asset_ids, user_ids
 
 
 class ObjectPermission(models.Model):
@@ -24,6 +74,8 @@ class ObjectPermission(models.Model):
     )
     uid = KpiUidField(uid_prefix='p')
 
+    objects = ObjectPermissionQuerySet.as_manager()
+
     @property
     def kind(self):
         return 'objectpermission'
@@ -47,11 +99,13 @@ class ObjectPermission(models.Model):
                 'not match that of the object.'
             )
         super().save(*args, **kwargs)
+        bump_object_permissions_version([self.asset_id], [self.user_id])
 
     @void_cache_for_request(keys=('__get_all_object_permissions',
                                   '__get_all_user_permissions',))
     def delete(self, *args, **kwargs):
         super().delete(*args, **kwargs)
+        bump_object_permissions_version([self.asset_id], [self.user_id])
 
     def __str__(self):
         for required_field in ('user', 'permission'):
@@ -1,13 +1,17 @@
 # coding: utf-8
 import time
-from typing import Union
+import uuid
+from typing import Optional, Union
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
 from rest_framework.reverse import reverse
 
 from kpi.constants import (
     PERM_PARTIAL_SUBMISSIONS,
     PERM_VIEW_SUBMISSIONS,
+    SUBMISSION_FORMAT_TYPE_XML,
 )
 from kpi.exceptions import PairedDataException
 from kpi.fields import KpiUidField
@@ -16,7 +20,9 @@ from kpi.interfaces import (
     SyncBackendMediaInterface,
 )
 from kpi.models.asset_file import AssetFile
+from kpi.utils.cache import release_lock
 from kpi.utils.hash import calculate_hash
+from kpi.utils.log import logging
 
 
 # FIXME: simplify this by making PairedData a real Django Model ^_^
@@ -149,6 +155,103 @@ class PairedData(OpenRosaManifestInterface,
     def file_type(self):
         return 'paired_data'
 
+    def generate_external_xml(
+        self, source_asset: 'kpi.models.Asset', asset_file: AssetFile
+    ) -> str:
+        """
+        Return the XML which contains the data of `source_asset` and store it
+        in `asset_file`. The XML is stored even if there is no data, for the
+        file to expire like any other.
+
+        The number of submissions the file contains and the id of the most
+        recent one are stored in `asset_file.metadata`. Next time, if no
+        submissions have been edited or deleted since (and the allowed fields
+        have not changed), only submissions received since then are fetched,
+        stripped (see `kpi.utils.xml.strip_nodes()`) and appended to the
+        current content. Otherwise, all submissions are processed again.
+        """
+        # Avoid circular imports
+        from kpi.renderers import SubmissionXMLRenderer
+        from kpi.utils.xml import add_xml_declaration, strip_nodes
+
+        allowed_fields = self.allowed_fields
+        deployment = source_asset.deployment
+        user = self.asset.owner
+        root_tag_name = SubmissionXMLRenderer.root_tag_name
+        closing_tag = f'</{root_tag_name}>'
+
+        xml_ = self._get_reusable_external_xml(
+            source_asset, asset_file, allowed_fields, closing_tag
+        )
+        if xml_ is None:
+            xml_ = add_xml_declaration(f'<{root_tag_name}>{closing_tag}')
+            submission_count = 0
+            last_submission_id = 0
+        else:
+            submission_count = asset_file.metadata['submission_count']
+            last_submission_id = asset_file.metadata['last_submission_id']
+
+        new_ids = [
+            submission['_id']
+            for submission in deployment.get_submissions(
+                user,
+                fields=['_id'],
+                query={'_id': {'$gt': last_submission_id}},
+                sort={'_id': 1},
+                skip_count=True,
+            )
+        ]
+        xml_submissions = self._get_xml_submissions(deployment, user, new_ids)
+        if xml_submissions:
+            # Use `rename_root_node_to='data'` to rename the root node of each
+            # submission to `data` so that form authors do not have to rewrite
+            # their `xml-external` formulas any time the asset UID changes,
+            # e.g. when cloning a form or creating a project from a template.
+            # Set `use_xpath=True` because `paired_data.fields` uses full group
+            # hierarchies, not just question names.
+            fragments = ''.join(
+                strip_nodes(
+                    submission,
+                    allowed_fields,
+                    use_xpath=True,
+                    rename_root_node_to='data',
+                )
+                for _, submission in sorted(xml_submissions.items())
+            )
+            xml_ = f'{xml_[:-len(closing_tag)]}{fragments}{closing_tag}'
+            submission_count += len(xml_submissions)
+            last_submission_id = max(xml_submissions)
+
+        md5_hash = calculate_hash(xml_, prefix=True)
+        if (
+            asset_file.pk
+            and asset_file.content
+            and asset_file.content.name == self.filename
+            and asset_file.metadata.get('hash') == md5_hash
+        ):
+            # Nothing has changed, only refresh `date_modified` to postpone
+            # next expiration.
+            asset_file.save(update_fields=['date_modified'])
+            return xml_
+
+        # We need to delete the current file (if it exists) when filename
+        # has changed. Otherwise, it would leave an orphan file on storage
+        if asset_file.pk and asset_file.content.name != self.filename:
+            asset_file.content.delete()
+
+        asset_file.content = ContentFile(xml_.encode(), name=self.filename)
+        # `xml_` is already there in memory, let's use its hash and store it
+        # within `asset_file` metadata
+        asset_file.set_md5_hash(md5_hash)
+        asset_file.metadata.update({
+            'fields': allowed_fields,
+            'last_submission_id': last_submission_id,
+            'submission_count': submission_count,
+        })
+        asset_file.save()
+
+        return xml_
+
     def get_download_url(self, request):
         """
         Implements `OpenRosaManifestInterface.get_download_url()`
@@ -236,6 +339,109 @@ class PairedData(OpenRosaManifestInterface,
             )
         return objects_
 
+    @classmethod
+    def refresh_all_external_xml(cls, source_asset_uid: str):
+        """
+        Regenerate the XML files of all projects paired with the source asset
+        `source_asset_uid`.
+        """
+        # Let new submissions schedule another refresh from now on
+        cache.delete(cls._get_refresh_scheduled_cache_key(source_asset_uid))
+
+        # Avoid circular import
+        from kpi.models import Asset  # noqa
+
+        assets = Asset.objects.filter(
+            paired_data__has_key=source_asset_uid
+        ).select_related('owner')
+        for asset in assets.iterator():
+            if not asset.has_deployment:
+                continue
+            paired_data = cls(
+                source_asset_uid,
+                asset=asset,
+                **asset.paired_data[source_asset_uid],
+            )
+            source_asset = paired_data.get_source()
+            if not source_asset or not source_asset.has_deployment:
+                continue
+            paired_data.refresh_external_xml(source_asset)
+
+    def refresh_external_xml(
+        self, source_asset: 'kpi.models.Asset'
+    ) -> Optional[str]:
+        """
+        Regenerate the XML file with the data of `source_asset` and
+        synchronize it with the deployment back end if its content has changed.
+
+        Only one process can regenerate the file at a time. If another one
+        is already doing it, `None` is returned right away. Otherwise, the XML
+        is returned.
+        """
+        lock_key = f'paired_data_refresh_lock:{self.paired_data_uid}'
+        lock_token = uuid.uuid4().hex
+        if not cache.add(
+            lock_key,
+            lock_token,
+            timeout=settings.PAIRED_DATA_REFRESH_LOCK_TIMEOUT,
+        ):
+            return None
+
+        try:
+            asset_file = self.asset_file
+            old_hash = None
+            if not asset_file:
+                asset_file = AssetFile(
+                    uid=self.paired_data_uid,
+                    asset=self.asset,
+                    file_type=AssetFile.PAIRED_DATA,
+                    user=self.asset.owner,
+                )
+            elif asset_file.content:
+                old_hash = asset_file.md5_hash
+
+            xml_ = self.generate_external_xml(source_asset, asset_file)
+
+            if asset_file.pk:
+                self._asset_file = asset_file
+                if old_hash != asset_file.md5_hash:
+                    # resync paired data to the deployment backend
+                    self.asset.deployment.sync_media_files(
+                        AssetFile.PAIRED_DATA
+                    )
+        finally:
+            release_lock(lock_key, lock_token)
+
+        return xml_
+
+    @classmethod
+    def schedule_refresh(cls, source_asset_uid: str):
+        """
+        Regenerate in background the XML files of all projects paired with
+        the source asset `source_asset_uid`.
+
+        Calls are debounced: the regeneration starts after
+        `settings.PAIRED_DATA_REFRESH_DELAY` seconds, and is only scheduled
+        once during that time, no matter how many submissions come in.
+        """
+        # Avoid circular import
+        from kpi.tasks import refresh_paired_data_in_background
+
+        if not cache.add(
+            cls._get_refresh_scheduled_cache_key(source_asset_uid),
+            True,
+            timeout=(
+                settings.PAIRED_DATA_REFRESH_DELAY
+                + settings.PAIRED_DATA_REFRESH_LOCK_TIMEOUT
+            ),
+        ):
+            return
+
+        refresh_paired_data_in_background.apply_async(
+            args=(source_asset_uid,),
+            countdown=settings.PAIRED_DATA_REFRESH_DELAY,
+        )
+
     def save(self, **kwargs):
 
         # When PairedData objects are synchronize by back-end deployment class
@@ -274,6 +480,107 @@ class PairedData(OpenRosaManifestInterface,
             create_version=False,
         )
 
+    def _get_reusable_external_xml(
+        self,
+        source_asset: 'kpi.models.Asset',
+        asset_file: AssetFile,
+        allowed_fields: list,
+        closing_tag: str,
+    ) -> Optional[str]:
+        """
+        Return the XML stored by `generate_external_xml()` if new submissions
+        can be appended to it. Otherwise, return `None`.
+        """
+        metadata = asset_file.metadata
+        if (
+            not asset_file.pk
+            or not asset_file.content
+            or 'submission_count' not in metadata
+            or metadata.get('fields') != allowed_fields
+        ):
+            return None
+
+        deployment = source_asset.deployment
+        last_submission_id = metadata['last_submission_id']
+        if deployment.submissions_modified_since(
+            asset_file.date_modified,
+            until_submission_id=last_submission_id,
+        ):
+            return None
+
+        # Submissions deleted from MongoDB cannot be detected otherwise
+        if metadata['submission_count'] != (
+            deployment.calculated_submission_count(
+                self.asset.owner,
+                query={'_id': {'$lte': last_submission_id}},
+            )
+        ):
+            return None
+
+        try:
+            with asset_file.content.open('rb') as xml_file:
+                xml_ = xml_file.read().decode()
+        except FileNotFoundError:
+            return None
+
+        if not xml_.endswith(closing_tag):
+            return None
+
+        return xml_
+
+    @staticmethod
+    def _get_xml_submissions(
+        deployment: 'kpi.deployment_backends.base_backend.BaseDeploymentBackend',
+        user: 'auth.User',
+        submission_ids: list,
+    ) -> dict:
+        """
+        Return the XML of the submissions `submission_ids`, keyed by
+        submission id.
+
+        XML submissions are sorted by id but do not contain it, thus they can
+        only be matched if none has been deleted since `submission_ids` were
+        retrieved. Otherwise, ids are retrieved again. If submissions still
+        cannot be matched, none is returned; they are fetched again on next
+        refresh.
+        """
+        for attempt in range(2):
+            if not submission_ids:
+                return {}
+
+            xml_submissions = list(
+                deployment.get_submissions(
+                    user,
+                    format_type=SUBMISSION_FORMAT_TYPE_XML,
+                    submission_ids=submission_ids,
+                )
+            )
+            if len(xml_submissions) == len(submission_ids):
+                return dict(zip(submission_ids, xml_submissions))
+
+            logging.warning(
+                f'PairedData: got {len(xml_submissions)} XML submissions '
+                f'out of {len(submission_ids)} from asset '
+                f'{deployment.asset.uid} (attempt {attempt + 1})'
+            )
+            if attempt:
+                break
+            submission_ids = sorted(
+                submission['_id']
+                for submission in deployment.get_submissions(
+                    user,
+                    fields=['_id'],
+                    submission_ids=submission_ids,
+                    skip_count=True,
+                )
+            )
+
+        return {}
+
+    @staticmethod
+    def _get_refresh_scheduled_cache_key(source_asset_uid: str) -> str:
+        return f'paired_data_refresh_scheduled:{source_asset_uid}'
+
     def void_external_xml_cache(self):
         # We delete the content of `self.asset_file` to force its regeneration
         # when the 'xml_endpoint' is called
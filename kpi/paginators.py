@@ -1,6 +1,6 @@
 # coding: utf-8
 from collections import OrderedDict
-from typing import Union
+from typing import Generator, Iterable, Union
 
 from django.conf import settings
 from django.db.models.query import QuerySet
@@ -12,16 +12,124 @@ from rest_framework.pagination import (
 from rest_framework.response import Response
 from rest_framework.reverse import reverse_lazy
 from rest_framework.serializers import SerializerMethodField
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class DataPagination(LimitOffsetPagination):
     """
     Pagination class for submissions.
+
+    When the total count of submissions is unknown (i.e. `count_strategy=none`),
+    the view paginates `None` and passes its results through `track_page()`.
+    Whether a next page exists is known once they have all been consumed.
     """
     default_limit = settings.SUBMISSION_LIST_LIMIT
     offset_query_param = 'start'
     max_limit = settings.SUBMISSION_LIST_LIMIT
 
+    def __init__(self):
+        self.page_length = 0
+        self.last_id = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if queryset is not None:
+            return super().paginate_queryset(queryset, request, view)
+
+        # Only read pagination params from the request, the view already
+        # holds the results
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        self.count = None
+        return []
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+
+        # A page shorter than `limit` is the last one
+        if self.page_length < self.limit:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_streamed_response_data(self, results: Iterable) -> OrderedDict:
+        """
+        Return the same data as `get_paginated_response()`, except that
+        `results` are not consumed and `next` is a callable, to be called once
+        they have been (see `SubmissionStreamingJSONRenderer`).
+        """
+        return OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link),
+            ('previous', self.get_previous_link()),
+            ('results', results)
+        ])
+
+    def track_page(self, results: Iterable) -> Generator:
+        """
+        Yield `results`, recording how many they are and the `_id` of the
+        last one as they are consumed.
+        """
+        self.page_length = 0
+        for result in results:
+            self.page_length += 1
+            self.last_id = result.get('_id')
+            yield result
+
+
+class DataKeysetPagination(DataPagination):
+    """
+    Keyset (cursor) pagination class for submissions.
+
+    Opt-in alternative to `DataPagination`, used when `after` is passed in the
+    query string. Submissions are sorted by `_id` and each page starts right
+    after the `_id` given in `after`, so the cost of a page does not depend on
+    its depth. The `next` link carries the `_id` of the last submission of the
+    current page. `count` must be set by the view.
+
+    The page is returned as a generator, `next` is known once it has been
+    consumed.
+    """
+    after_query_param = 'after'
+    template = None
+
+    def __init__(self):
+        super().__init__()
+        self.count = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        return self.track_page(queryset)
+
+    def get_next_link(self):
+        # A page shorter than `limit` is the last one
+        if not self.page_length or self.page_length < self.limit:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(
+            url, self.after_query_param, self.last_id
+        )
+
+    def get_previous_link(self):
+        # Keyset pagination only walks forward
+        return None
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data)
+        ]))
+
 
 class Paginated(LimitOffsetPagination):
     """ Adds 'root' to the wrapping response object. """
@@ -14,6 +14,7 @@ from rest_framework_xml.renderers import XMLRenderer as DRFXMLRenderer
 import formpack
 from kobo.apps.reports.report_data import build_formpack
 from kpi.constants import GEO_QUESTION_TYPES
+from kpi.utils.log import logging
 from kpi.utils.xml import add_xml_declaration
 
 
@@ -139,6 +140,64 @@ class SubmissionGeoJsonRenderer(renderers.BaseRenderer):
         )
 
 
+class SubmissionStreamingJSONRenderer(renderers.JSONRenderer):
+    """
+    Render a page of submissions as JSON, one submission at a time, to be
+    passed to a `StreamingHttpResponse`.
+
+    `results` can be a generator (e.g. the one returned by
+    `KobocatDeploymentBackend.get_submissions()`); it is consumed lazily and
+    never held in memory as a whole. Callable values (e.g. `next`, which may
+    depend on the last submission) are called once `results` is consumed and
+    written after it.
+
+    Headers are already sent when submissions are read, thus an error cannot
+    change the status code anymore. Instead, it is logged, `results` is
+    closed and an `error` property is added to keep the JSON valid.
+    """
+
+    def render_stream(
+        self, data, accepted_media_type=None, renderer_context=None
+    ):
+        data = dict(data)
+        results = data.pop('results', [])
+        deferred = {
+            key: data.pop(key) for key, value in list(data.items())
+            if isinstance(value, Callable)
+        }
+        envelope = super().render(
+            data, accepted_media_type, renderer_context
+        )
+        # Reopen the envelope to append `results` to it
+        if data:
+            yield envelope[:-1] + b',"results":['
+        else:
+            yield b'{"results":['
+
+        try:
+            for index, submission in enumerate(results):
+                if index:
+                    yield b','
+                yield super().render(
+                    submission, accepted_media_type, renderer_context
+                )
+        except Exception as e:
+            logging.error(
+                f'SubmissionStreamingJSONRenderer: {str(e)}', exc_info=True
+            )
+            yield b'],"error":' + super().render(
+                'An error occurred while retrieving submissions'
+            ) + b'}'
+            return
+
+        yield b']'
+        for key, value in deferred.items():
+            yield b',' + super().render(
+                {key: value()}, accepted_media_type, renderer_context
+            )[1:-1]
+        yield b'}'
+
+
 class DoNothingRenderer(renderers.BaseRenderer):
     """
     This class exists only to specify that a view provides a particular format;
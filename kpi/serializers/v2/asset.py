@@ -444,7 +444,19 @@ class AssetSerializer(serializers.HyperlinkedModelSerializer):
                     'translations': str(err)
                 })
             validated_data['content'] = asset_content
-        return super().update(asset, validated_data)
+
+        data_sharing_was_enabled = asset.data_sharing.get('enabled', False)
+        asset = super().update(asset, validated_data)
+        if (
+            asset.has_deployment
+            and asset.data_sharing.get('enabled', False)
+            != data_sharing_was_enabled
+        ):
+            # Let KoBoCAT know whether it needs to notify KPI when data comes
+            # in, to refresh paired data in background.
+            asset.deployment.set_has_kpi_hooks()
+
+        return asset
 
     def get_fields(self, *args, **kwargs):
         fields = super().get_fields(*args, **kwargs)
@@ -604,6 +616,7 @@ class AssetSerializer(serializers.HyperlinkedModelSerializer):
             return None
 
         user = request.user
+        self._set_xforms_cache(obj)
         if obj.owner_id == user.id:
             return obj.deployment.submission_count
 
@@ -941,6 +954,19 @@ class AssetSerializer(serializers.HyperlinkedModelSerializer):
 
         setattr(asset, 'asset_ids_cache', asset_ids)
 
+    def _set_xforms_cache(self, asset):
+        """
+        Set an attribute on the deployment of `asset` for performance purposes
+        so that `KobocatDeploymentBackend.xform` does not hit the DB for each
+        asset of the list
+        """
+        try:
+            xforms = self.context['xforms_cache']
+        except KeyError:
+            return
+
+        setattr(asset.deployment, 'xforms_cache', xforms)
+
     def _table_url(self, obj):
         request = self.context.get('request', None)
         return reverse('asset-table-view',
@@ -351,20 +351,36 @@ class AssetBulkInsertPermissionSerializer(serializers.Serializer):
                 removal.permission_codename,
             )
 
-        # Perform the new assignments
+        # Perform the new assignments. Partial permissions carry per-user
+        # filters and are assigned one by one; others are assigned in bulk,
+        # once per distinct set of permissions.
+        codenames_per_user_pk = defaultdict(set)
         for addition in incoming_assignments.difference(existing_assignments):
             if asset.owner_id == addition.user_pk:
                 raise serializers.ValidationError(
                     {'user': t(ASSIGN_OWNER_ERROR_MESSAGE)}
                 )
             if addition.partial_permissions_json:
-                partial_perms = json.loads(addition.partial_permissions_json)
+                asset.assign_perm(
+                    user_obj=user_pk_to_obj_cache[addition.user_pk],
+                    perm=addition.permission_codename,
+                    partial_perms=json.loads(
+                        addition.partial_permissions_json
+                    ),
+                )
             else:
-                partial_perms = None
-            asset.assign_perm(
-                user_obj=user_pk_to_obj_cache[addition.user_pk],
-                perm=addition.permission_codename,
-                partial_perms=partial_perms,
+                codenames_per_user_pk[addition.user_pk].add(
+                    addition.permission_codename
+                )
+
+        user_pks_per_codenames = defaultdict(list)
+        for user_pk, codenames in codenames_per_user_pk.items():
+            user_pks_per_codenames[frozenset(codenames)].append(user_pk)
+        for codenames, user_pks in user_pks_per_codenames.items():
+            asset.bulk_assign_perms(
+                [asset],
+                [user_pk_to_obj_cache[user_pk] for user_pk in user_pks],
+                sorted(codenames),
             )
 
         # Return nothing, in a nice way, because the view is responsible for
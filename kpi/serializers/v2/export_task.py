@@ -27,6 +27,7 @@ from formpack.constants import (
     VALID_MULTIPLE_SELECTS,
 )
 
+from kpi.constants import EXPORT_SETTING_INCREMENTAL
 from kpi.fields import ReadOnlyJSONField
 from kpi.models import ExportTask, Asset
 from kpi.tasks import export_in_background
@@ -110,10 +111,18 @@ class ExportTaskSerializer(serializers.ModelSerializer):
                 EXPORT_SETTING_INCLUDE_MEDIA_URL
             ]
 
+        if EXPORT_SETTING_INCREMENTAL in data_:
+            attrs[EXPORT_SETTING_INCREMENTAL] = self.validate_incremental(
+                data_
+            )
+
         return attrs
 
     def validate_data(self, data: dict) -> dict:
-        valid_export_settings = VALID_EXPORT_SETTINGS + [EXPORT_SETTING_SOURCE]
+        valid_export_settings = VALID_EXPORT_SETTINGS + [
+            EXPORT_SETTING_SOURCE,
+            EXPORT_SETTING_INCREMENTAL,
+        ]
 
         for required in REQUIRED_EXPORT_SETTINGS:
             if required not in data:
@@ -170,6 +179,17 @@ class ExportTaskSerializer(serializers.ModelSerializer):
             )
         return group_sep
 
+    def validate_incremental(self, data: dict) -> bool:
+        incremental = data[EXPORT_SETTING_INCREMENTAL]
+        # Form-encoded payloads send strings
+        if isinstance(incremental, str):
+            incremental = incremental.lower() == 'true'
+        if not isinstance(incremental, bool):
+            raise serializers.ValidationError(
+                {EXPORT_SETTING_INCREMENTAL: t('Must be a boolean')}
+            )
+        return incremental
+
     def validate_lang(self, data: dict) -> str:
         asset_languages = self._get_asset.summary.get('languages', [])
         all_valid_languages = [*asset_languages, *VALID_DEFAULT_LANGUAGES]
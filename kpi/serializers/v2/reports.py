@@ -16,12 +16,11 @@ class ReportsDetailSerializer(serializers.BaseSerializer):
             vnames = None
 
         split_by = request.query_params.get('split_by', None)
-        submission_stream = obj.deployment.get_submissions(request.user)
         _list = report_data.data_by_identifiers(
             obj,
             vnames,
             split_by=split_by,
-            submission_stream=submission_stream,
+            user=request.user,
         )
 
         return {
@@ -2,7 +2,7 @@ from typing import Union
 
 from django.conf import settings
 from django.contrib.auth.models import User, AnonymousUser
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
@@ -19,8 +19,13 @@ from kpi.deployment_backends.kc_access.utils import (
     kc_transaction_atomic,
 )
 from kpi.exceptions import DeploymentNotFound
-from kpi.models import Asset, TagUid
-from kpi.utils.object_permission import post_assign_perm, post_remove_perm
+from kpi.models import Asset, AssetVersion, TagUid, UserAssetSubscription
+from kpi.utils.cache import bump_assets_version
+from kpi.utils.object_permission import (
+    bump_object_permissions_version,
+    post_assign_perm,
+    post_remove_perm,
+)
 from kpi.utils.permissions import (
     grant_default_model_level_perms,
     is_user_anonymous,
@@ -98,6 +103,20 @@ def update_kc_xform_has_kpi_hooks(sender, instance, **kwargs):
         asset.deployment.set_has_kpi_hooks()
 
 
+@receiver(post_save, sender=Asset)
+@receiver(pre_delete, sender=Asset)
+def update_assets_version(sender, instance, **kwargs):
+    # Permissions are deleted along with the asset, thus users who can see
+    # it must be found before it is deleted
+    bump_assets_version([instance.pk], [instance.owner_id])
+
+
+@receiver(post_save, sender=AssetVersion)
+@receiver(post_delete, sender=AssetVersion)
+def update_assets_version_on_version_change(sender, instance, **kwargs):
+    bump_assets_version([instance.asset_id])
+
+
 @receiver(post_delete, sender=Asset)
 def post_delete_asset(sender, instance, **kwargs):
     # Update parent's languages if this object is a child of another asset.
@@ -110,6 +129,14 @@ def post_delete_asset(sender, instance, **kwargs):
             parent.update_languages()
 
 
+@receiver(post_save, sender=UserAssetSubscription)
+@receiver(post_delete, sender=UserAssetSubscription)
+def update_user_accessible_assets(sender, instance, **kwargs):
+    # Subscribed collections (and their children) are part of the assets
+    # the user can list
+    bump_object_permissions_version(asset_ids=[], user_ids=[instance.user_id])
+
+
 @receiver(post_assign_perm, sender=Asset)
 def post_assign_asset_perm(
     sender,
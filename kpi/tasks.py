@@ -3,6 +3,7 @@ import constance
 import requests
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.core.management import call_command
 
@@ -11,11 +12,13 @@ from kobo.celery import celery_app
 from kpi.constants import LIMIT_HOURS_23
 from kpi.maintenance_tasks import remove_old_asset_snapshots
 from kpi.models.asset import Asset
+from kpi.models.asset_file import AssetFile
 from kpi.models.import_export_task import (
     ExportTask,
     ImportTask,
     ProjectViewExportTask,
 )
+from kpi.models.paired_data import PairedData
 
 
 @celery_app.task
@@ -30,6 +33,59 @@ def export_in_background(export_task_uid):
     export_task.run()
 
 
+@celery_app.task
+def export_chunk_in_background(
+    export_task_uid: str, chunk_index: int, id_range: list, start_index: int
+) -> dict:
+    export_task = ExportTask.objects.get(uid=export_task_uid)
+    try:
+        return export_task.export_chunk(
+            chunk_index, tuple(id_range), start_index
+        )
+    except Exception as e:
+        export_task.mark_as_errored(e)
+        raise
+
+
+@celery_app.task
+def merge_export_chunks_in_background(
+    chunks: list, export_task_uid: str
+) -> None:
+    export_task = ExportTask.objects.get(uid=export_task_uid)
+    try:
+        export_task.merge_chunks(chunks)
+    except Exception as e:
+        export_task.mark_as_errored(e)
+        raise
+
+
+@celery_app.task
+def bulk_update_submissions_in_background(
+    asset_uid: str,
+    user_id: int,
+    job_uid: str,
+    submission_ids: list,
+    update_data: dict,
+) -> None:
+    asset = Asset.objects.get(uid=asset_uid)
+    user = User.objects.get(pk=user_id)
+    deployment = asset.deployment
+    try:
+        deployment.update_submissions(
+            user, submission_ids, update_data, job_uid=job_uid
+        )
+    except Exception as e:
+        deployment._set_bulk_update_job(
+            job_uid, status=deployment.BULK_UPDATE_JOB_ERROR, error=str(e)
+        )
+        raise
+
+
+@celery_app.task
+def refresh_paired_data_in_background(source_asset_uid: str) -> None:
+    PairedData.refresh_all_external_xml(source_asset_uid)
+
+
 @celery_app.task
 def project_view_export_in_background(
     export_task_uid: str, username: str
@@ -77,6 +133,15 @@ def sync_media_files(asset_uid):
     asset.deployment.sync_media_files()
 
 
+@celery_app.task
+def sync_paired_data_files(asset_uid):
+    # Let next saves schedule another synchronization from now on
+    cache.delete(f'paired_data_sync_scheduled:{asset_uid}')
+    asset = Asset.objects.get(uid=asset_uid)
+    if asset.has_deployment:
+        asset.deployment.sync_media_files(AssetFile.PAIRED_DATA)
+
+
 @celery_app.task
 def enketo_flush_cached_preview(server_url, form_id):
     """
@@ -1,5 +1,6 @@
 # coding: utf-8
 from copy import deepcopy
+from unittest.mock import patch
 
 from django.contrib.auth.models import Permission, User
 from django.urls import reverse
@@ -17,6 +18,7 @@ from kpi.constants import (
     PERM_VIEW_ASSET,
     PERM_VIEW_SUBMISSIONS,
 )
+from kpi.models import Asset
 from kpi.tests.kpi_test_case import KpiTestCase
 from kpi.urls.router_api_v2 import URL_NAMESPACE as ROUTER_URL_NAMESPACE
 from kpi.utils.object_permission import get_anonymous_user
@@ -402,6 +404,26 @@ class ApiBulkAssetPermissionTestCase(BaseApiAssetPermissionTestCase):
             ),
         )
 
+    def test_assignments_are_written_in_bulk(self):
+        with patch.object(
+            Asset, 'bulk_assign_perms', wraps=Asset.bulk_assign_perms
+        ) as bulk_assign_perms_mock, patch.object(
+            Asset, 'assign_perm', wraps=self.asset.assign_perm
+        ) as assign_perm_mock:
+            response = self._assign_perms_as_logged_in_user(
+                [
+                    ('someuser', PERM_CHANGE_ASSET),
+                    ('anotheruser', PERM_CHANGE_ASSET),
+                ]
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Both users get the same permissions with one call
+        bulk_assign_perms_mock.assert_called_once()
+        assign_perm_mock.assert_not_called()
+        for user in (self.someuser, self.anotheruser):
+            self.assertTrue(self.asset.has_perm(user, PERM_CHANGE_ASSET))
+            self.assertTrue(self.asset.has_perm(user, PERM_VIEW_ASSET))
+
     def test_assignment_removes_old_permissions(self):
         self.asset.assign_perm(self.someuser, PERM_CHANGE_ASSET)
         self.assertTrue(self.asset.has_perm(self.someuser, PERM_CHANGE_ASSET))
@@ -5,6 +5,7 @@ import dateutil.parser
 import json
 import os
 from io import StringIO
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
 from django.urls import reverse
@@ -34,6 +35,7 @@ from kpi.utils.object_permission import get_anonymous_user
 from kpi.utils.project_views import (
     get_region_for_view,
 )
+from kpi.views.v2.asset import AssetViewSet
 
 
 class AssetListApiTests(BaseAssetTestCase):
@@ -110,6 +112,125 @@ class AssetListApiTests(BaseAssetTestCase):
         hash_response = self.client.get(hash_url)
         self.assertEqual(hash_response.data.get("hash"), expected_hash)
 
+    def test_assets_hash_not_modified(self):
+        user_asset = Asset.objects.get(pk=1)
+        user_asset.save()
+        hash_url = reverse("asset-hash")
+        with self.settings(ASSET_HASH_CACHE_TIMEOUT=60):
+            hash_response = self.client.get(hash_url)
+            hash_ = hash_response.data['hash']
+            self.assertEqual(hash_response['ETag'], f'"{hash_}"')
+
+            hash_response = self.client.get(
+                hash_url, HTTP_IF_NONE_MATCH=f'"{hash_}"'
+            )
+            self.assertEqual(
+                hash_response.status_code, status.HTTP_304_NOT_MODIFIED
+            )
+
+            # A new version of any accessible asset changes the hash
+            user_asset.save()
+            hash_response = self.client.get(
+                hash_url, HTTP_IF_NONE_MATCH=f'"{hash_}"'
+            )
+            self.assertEqual(hash_response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(hash_response.data['hash'], hash_)
+
+    def test_assets_hash_ignores_inaccessible_assets(self):
+        another_user_asset = Asset.objects.create(
+            owner=User.objects.get(username='anotheruser'),
+            asset_type='survey',
+        )
+        hash_url = reverse('asset-hash')
+        with self.settings(ASSET_HASH_CACHE_TIMEOUT=60):
+            hash_ = self.client.get(hash_url).data['hash']
+
+            # Assets of other users do not make the cached hash obsolete
+            another_user_asset.save()
+            with patch.object(
+                AssetViewSet, '_get_hash_from_db'
+            ) as get_hash_from_db_mock:
+                hash_response = self.client.get(hash_url)
+                get_hash_from_db_mock.assert_not_called()
+            self.assertEqual(hash_response.data['hash'], hash_)
+
+    def test_assets_metadata(self):
+        someuser = User.objects.get(username='someuser')
+        Asset.objects.create(
+            owner=someuser,
+            asset_type='survey',
+            content={
+                'survey': [
+                    {
+                        'type': 'text',
+                        'name': 'q1',
+                        'label': ['Question 1', 'Question 1 (fr)'],
+                    },
+                ],
+                'translations': ['English (en)', 'French (fr)'],
+            },
+            settings={
+                'country': [{'value': 'CAN', 'label': 'Canada'}],
+                'sector': {'value': 'Health', 'label': 'Health'},
+                'organization': 'KoboToolbox',
+            },
+        )
+        asset = Asset.objects.create(
+            owner=someuser,
+            asset_type='survey',
+            settings={
+                'country': [
+                    {'value': 'CAN', 'label': 'Canada'},
+                    {'value': 'ALB', 'label': 'Albania'},
+                ],
+            },
+        )
+        expected_metadata = {
+            'languages': ['English (en)', 'French (fr)'],
+            'countries': [['ALB', 'Albania'], ['CAN', 'Canada']],
+            'sectors': [['Health', 'Health']],
+            'organizations': ['KoboToolbox'],
+        }
+        metadata_url = reverse(self._get_endpoint('asset-metadata'))
+
+        with self.settings(ASSET_METADATA_CACHE_TIMEOUT=60):
+            response = self.client.get(self.list_url, {'metadata': 'on'})
+            self.assertEqual(
+                json.loads(json.dumps(response.data['metadata'])),
+                expected_metadata,
+            )
+            response = self.client.get(metadata_url)
+            self.assertEqual(
+                json.loads(json.dumps(response.data)), expected_metadata
+            )
+
+            # Saving an asset makes cached metadata obsolete
+            asset.settings['organization'] = 'Another organization'
+            asset.save()
+            expected_metadata['organizations'].insert(0, 'Another organization')
+            response = self.client.get(metadata_url)
+            self.assertEqual(
+                json.loads(json.dumps(response.data)), expected_metadata
+            )
+
+    def test_assets_metadata_ignores_inaccessible_assets(self):
+        another_user_asset = Asset.objects.create(
+            owner=User.objects.get(username='anotheruser'),
+            asset_type='survey',
+        )
+        metadata_url = reverse(self._get_endpoint('asset-metadata'))
+        with self.settings(ASSET_METADATA_CACHE_TIMEOUT=60):
+            metadata = self.client.get(metadata_url).data
+
+            # Assets of other users do not make cached metadata obsolete
+            another_user_asset.save()
+            with patch.object(
+                AssetViewSet, '_get_metadata_from_db'
+            ) as get_metadata_from_db_mock:
+                response = self.client.get(metadata_url)
+                get_metadata_from_db_mock.assert_not_called()
+            self.assertEqual(response.data, metadata)
+
     def test_assets_search_query(self):
         someuser = User.objects.get(username='someuser')
         question = Asset.objects.create(
@@ -1,10 +1,19 @@
 # coding: utf-8
 import re
+import timeit
+from types import SimpleNamespace
+from unittest.mock import patch
 
+import pytest
+
+from django.conf import settings
 from django.contrib.auth.models import User, AnonymousUser
+from django.core.cache import caches
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
 from django.utils.translation import gettext as t
 from rest_framework import status
+from rest_framework.request import Request
 from rest_framework.response import Response
 
 from kpi.constants import (
@@ -16,9 +25,14 @@ from kpi.constants import (
     PERM_DISCOVER_ASSET,
     PERM_VIEW_ASSET,
 )
-from kpi.models import Asset, UserAssetSubscription
+from kpi.filters import KpiObjectPermissionsFilter
+from kpi.models import Asset, ObjectPermission, UserAssetSubscription
 from kpi.tests.base_test_case import BaseTestCase
 from kpi.urls.router_api_v2 import URL_NAMESPACE as ROUTER_URL_NAMESPACE
+from kpi.utils.object_permission import (
+    get_anonymous_user,
+    get_perm_ids_from_code_names,
+)
 
 
 class CollectionsTests(BaseTestCase):
@@ -535,3 +549,165 @@ class CollectionsTests(BaseTestCase):
         data = {'parent': some_collection_url}
         # Try to move `some_asset` from `self.coll` to `some_collection`.
         return self.client.patch(some_asset_url, data)
+
+
+@override_settings(
+    ACCESSIBLE_ASSETS_CACHE_ENABLED=True,
+    OBJECT_PERMISSION_CACHE_ALIAS='object_permissions',
+    CACHES={
+        **settings.CACHES,
+        'object_permissions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    },
+)
+class CachedAccessibleAssetsCollectionsTests(CollectionsTests):
+    """
+    Run all collections tests with the assets users can list kept in cache
+    """
+
+    def setUp(self):
+        super().setUp()
+        caches['object_permissions'].clear()
+
+    def test_accessible_assets_are_cached(self):
+        anotheruser = User.objects.get(username='anotheruser')
+        asset_list_url = reverse(self._get_endpoint('asset-list'))
+        self.login_as_other_user(username='anotheruser', password='anotheruser')
+
+        response = self.client.get(asset_list_url)
+        self.assertEqual(response.data['count'], 0)
+
+        # Sharing makes the cached list obsolete
+        self.coll.assign_perm(anotheruser, PERM_VIEW_ASSET)
+        response = self.client.get(asset_list_url)
+        self.assertEqual(response.data['count'], 1)
+
+        # Nothing has changed, the list comes from the cache
+        with patch.object(
+            KpiObjectPermissionsFilter, '_get_user_asset_ids'
+        ) as get_user_asset_ids_mock, patch.object(
+            KpiObjectPermissionsFilter, '_get_public_asset_ids'
+        ) as get_public_asset_ids_mock:
+            response = self.client.get(asset_list_url)
+            get_user_asset_ids_mock.assert_not_called()
+            get_public_asset_ids_mock.assert_not_called()
+        self.assertEqual(response.data['count'], 1)
+
+        # Public assets are cached apart: making an asset public does not
+        # make the assets of each user obsolete
+        public_collection = Asset.objects.create(
+            asset_type=ASSET_TYPE_COLLECTION,
+            name='public collection',
+            owner=self.someuser,
+        )
+        with patch.object(
+            KpiObjectPermissionsFilter,
+            '_get_user_asset_ids',
+            wraps=KpiObjectPermissionsFilter._get_user_asset_ids,
+        ) as get_user_asset_ids_mock:
+            public_collection.assign_perm(
+                AnonymousUser(), PERM_DISCOVER_ASSET
+            )
+            response = self.client.get(asset_list_url)
+            get_user_asset_ids_mock.assert_not_called()
+        self.assertEqual(response.data['count'], 1)
+
+        # Subscribing to a public collection makes them obsolete
+        UserAssetSubscription.objects.create(
+            user=anotheruser, asset=public_collection
+        )
+        response = self.client.get(asset_list_url)
+        self.assertEqual(response.data['count'], 2)
+
+    @pytest.mark.performance
+    def test_accessible_assets_cache_speed(self):
+        """
+        List the assets of a user who can view 2000 shared assets and has
+        subscribed to 20 public collections of 50 children each
+        """
+        anotheruser = User.objects.get(username='anotheruser')
+        anonymous_user = get_anonymous_user()
+        view_asset_perm_id = get_perm_ids_from_code_names(PERM_VIEW_ASSET)
+        discover_asset_perm_id = get_perm_ids_from_code_names(
+            PERM_DISCOVER_ASSET
+        )
+        shared_assets = Asset.objects.bulk_create(
+            [
+                Asset(
+                    asset_type=ASSET_TYPE_SURVEY,
+                    name=f'shared asset {index}',
+                    owner=self.someuser,
+                )
+                for index in range(2000)
+            ]
+        )
+        collections = Asset.objects.bulk_create(
+            [
+                Asset(
+                    asset_type=ASSET_TYPE_COLLECTION,
+                    name=f'public collection {index}',
+                    owner=self.someuser,
+                )
+                for index in range(20)
+            ]
+        )
+        children = Asset.objects.bulk_create(
+            [
+                Asset(
+                    asset_type=ASSET_TYPE_SURVEY,
+                    name=f'child {index}',
+                    owner=self.someuser,
+                    parent=collection,
+                )
+                for collection in collections
+                for index in range(50)
+            ]
+        )
+        permissions = [
+            ObjectPermission(
+                asset=asset, user=anotheruser, permission_id=view_asset_perm_id
+            )
+            for asset in shared_assets
+        ]
+        permissions += [
+            ObjectPermission(
+                asset=collection, user=anonymous_user, permission_id=perm_id
+            )
+            for collection in collections
+            for perm_id in (view_asset_perm_id, discover_asset_perm_id)
+        ]
+        permissions += [
+            ObjectPermission(
+                asset=child,
+                user=anonymous_user,
+                permission_id=view_asset_perm_id,
+                inherited=True,
+            )
+            for child in children
+        ]
+        ObjectPermission.objects.bulk_create(permissions)
+        UserAssetSubscription.objects.bulk_create(
+            [
+                UserAssetSubscription(asset=collection, user=anotheruser)
+                for collection in collections
+            ]
+        )
+
+        request = Request(RequestFactory().get('/api/v2/assets/'))
+        request.user = anotheruser
+        view = SimpleNamespace(action='list')
+
+        def list_assets():
+            return KpiObjectPermissionsFilter().filter_queryset(
+                request, Asset.objects.all(), view
+            ).count()
+
+        with override_settings(ACCESSIBLE_ASSETS_CACHE_ENABLED=False):
+            assert list_assets() == 3020
+            uncached_time = timeit.timeit(list_assets, number=10)
+
+        # Populate the cache
+        assert list_assets() == 3020
+        cached_time = timeit.timeit(list_assets, number=10)
+        assert cached_time < uncached_time
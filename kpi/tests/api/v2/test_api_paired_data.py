@@ -2,7 +2,10 @@
 import unittest
 from mock import patch, MagicMock
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.exceptions import ErrorDetail
@@ -14,9 +17,10 @@ from kpi.constants import (
     PERM_PARTIAL_SUBMISSIONS,
     PERM_VIEW_SUBMISSIONS,
 )
-from kpi.models import Asset
+from kpi.models import Asset, PairedData
 from kpi.tests.base_test_case import BaseAssetTestCase
 from kpi.urls.router_api_v2 import URL_NAMESPACE as ROUTER_URL_NAMESPACE
+from kpi.utils.xml import strip_nodes
 
 
 class BasePairedDataTestCase(BaseAssetTestCase):
@@ -398,6 +402,182 @@ class PairedDataExternalApiTests(BasePairedDataTestCase):
             response = self.client.get(self.external_xml_url)
             self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_external_is_regenerated_incrementally(self):
+        self.deploy_source()
+        self.source_asset.deployment.mock_submissions([
+            {
+                'group_restaurant/favourite_restaurant': 'Dunkin Donuts',
+                'city_name': 'Montréal',
+            },
+        ])
+        response = self.client.get(self.external_xml_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('Montréal', response.content.decode())
+
+        # Content has not changed, nothing is sent back
+        response = self.client.get(
+            self.external_xml_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        self.source_asset.deployment.mock_submissions(
+            [
+                {
+                    'group_restaurant/favourite_restaurant': 'McDonalds',
+                    'city_name': 'Miami',
+                },
+            ],
+            flush_db=False,
+        )
+        with override_settings(PAIRED_DATA_EXPIRATION=0), patch(
+            'kpi.utils.xml.strip_nodes', wraps=strip_nodes
+        ) as strip_nodes_mock:
+            # Expired file is still served while it is regenerated in
+            # background
+            response = self.client.get(
+                self.external_xml_url, HTTP_IF_NONE_MATCH=etag
+            )
+            self.assertEqual(
+                response.status_code, status.HTTP_304_NOT_MODIFIED
+            )
+            response = self.client.get(
+                self.external_xml_url, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        content = response.content.decode()
+        self.assertLess(content.index('Montréal'), content.index('Miami'))
+        # Only the new submission has been processed
+        strip_nodes_mock.assert_called_once()
+
+    def test_get_external_is_regenerated_after_deletion(self):
+        self.deploy_source()
+        self.source_asset.deployment.mock_submissions([
+            {
+                'group_restaurant/favourite_restaurant': 'Dunkin Donuts',
+                'city_name': 'Montréal',
+            },
+            {
+                'group_restaurant/favourite_restaurant': 'McDonalds',
+                'city_name': 'Miami',
+            },
+        ])
+        response = self.client.get(self.external_xml_url)
+        self.assertIn('Montréal', response.content.decode())
+
+        # Deleted from MongoDB, like KoBoCAT does
+        settings.MONGO_DB.instances.delete_one({'city_name': 'Montréal'})
+        with override_settings(PAIRED_DATA_EXPIRATION=0), patch(
+            'kpi.utils.xml.strip_nodes', wraps=strip_nodes
+        ) as strip_nodes_mock:
+            self.client.get(self.external_xml_url)
+            response = self.client.get(self.external_xml_url)
+        content = response.content.decode()
+        self.assertNotIn('Montréal', content)
+        self.assertIn('Miami', content)
+        # All the remaining submissions have been processed again
+        strip_nodes_mock.assert_called_once()
+
+    def test_get_external_while_generated_elsewhere(self):
+        self.deploy_source()
+        self.source_asset.deployment.mock_submissions([
+            {
+                'group_restaurant/favourite_restaurant': 'Dunkin Donuts',
+                'city_name': 'Montréal',
+            },
+        ])
+        paired_data_uid = self.destination_asset.paired_data[
+            self.source_asset.uid
+        ]['paired_data_uid']
+        lock_key = f'paired_data_refresh_lock:{paired_data_uid}'
+        cache.set(lock_key, True)
+        try:
+            response = self.client.get(self.external_xml_url)
+        finally:
+            cache.delete(lock_key)
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+        response = self.client.get(self.external_xml_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_external_without_submissions_is_stored(self):
+        self.deploy_source()
+        response = self.client.get(self.external_xml_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        # The empty file is served like any other, until it expires
+        with patch.object(PairedData, 'schedule_refresh') as refresh_mock:
+            response = self.client.get(
+                self.external_xml_url, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        refresh_mock.assert_not_called()
+
+    def test_refresh_keeps_lock_acquired_elsewhere(self):
+        self.deploy_source()
+        self.destination_asset.refresh_from_db()
+        paired_data = list(
+            PairedData.objects(self.destination_asset).values()
+        )[0]
+        lock_key = f'paired_data_refresh_lock:{paired_data.paired_data_uid}'
+
+        def expire_lock(*args, **kwargs):
+            # The lock expires and another process acquires it
+            cache.set(lock_key, 'another-token')
+            return ''
+
+        with patch.object(
+            PairedData, 'generate_external_xml', side_effect=expire_lock
+        ):
+            paired_data.refresh_external_xml(self.source_asset)
+        try:
+            self.assertEqual(cache.get(lock_key), 'another-token')
+        finally:
+            cache.delete(lock_key)
+
+    def test_paired_data_files_are_synced_only_on_change(self):
+        self.destination_asset.refresh_from_db()
+        cache_key = f'paired_data_sync_scheduled:{self.destination_asset.uid}'
+        with patch(
+            'kpi.tasks.sync_paired_data_files.apply_async'
+        ) as apply_async_mock:
+            self.destination_asset.name = 'Renamed destination project'
+            self.destination_asset.save()
+            apply_async_mock.assert_not_called()
+
+            paired_data = list(
+                PairedData.objects(self.destination_asset).values()
+            )[0]
+            paired_data.fields = ['city_name']
+            paired_data.save()
+            paired_data.filename = 'renamed.xml'
+            paired_data.save()
+            # Synchronization is debounced
+            apply_async_mock.assert_called_once()
+
+        cache.delete(cache_key)
+
+    def test_refresh_is_debounced(self):
+        with patch(
+            'kpi.tasks.refresh_paired_data_in_background.apply_async'
+        ) as apply_async_mock:
+            PairedData.schedule_refresh(self.source_asset.uid)
+            PairedData.schedule_refresh(self.source_asset.uid)
+            apply_async_mock.assert_called_once()
+
+            # Once the task has started, next submissions schedule another
+            # refresh
+            PairedData.refresh_all_external_xml(self.source_asset.uid)
+            PairedData.schedule_refresh(self.source_asset.uid)
+            self.assertEqual(apply_async_mock.call_count, 2)
+
+        PairedData.refresh_all_external_xml(self.source_asset.uid)
+
     @unittest.skip(reason='Skip until mock back end supports XML submissions')
     def test_get_external_with_changed_source_fields(self):
         self.deploy_source()
@@ -18,6 +18,7 @@ import responses
 from dict2xml import dict2xml
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.test import override_settings
 from django.urls import reverse
 from django_digest.test import Client as DigestClient
 from rest_framework import status
@@ -39,6 +40,7 @@ from kpi.models import Asset
 from kpi.tests.base_test_case import BaseTestCase
 from kpi.tests.utils.xml import get_form_and_submission_tag_names
 from kpi.urls.router_api_v2 import URL_NAMESPACE as ROUTER_URL_NAMESPACE
+from kpi.utils.mongo_helper import MongoHelper
 from kpi.utils.object_permission import get_anonymous_user
 from kpi.tests.utils.mock import (
     enketo_edit_instance_response,
@@ -525,6 +527,167 @@ class SubmissionApiTests(BaseSubmissionTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), limit)
 
+    def test_list_submissions_with_keyset_pagination(self):
+        """
+        someuser is the owner of the project.
+        They can walk through their data with `after` instead of `start`
+        """
+        submission_ids = sorted(s['_id'] for s in self.submissions)
+        response = self.client.get(
+            self.submission_list_url,
+            {'format': 'json', 'after': submission_ids[4], 'limit': 5},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], len(self.submissions))
+        self.assertEqual(
+            [s['_id'] for s in response.data['results']],
+            submission_ids[5:10],
+        )
+        self.assertIn(f'after={submission_ids[9]}', response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+        # Last page is shorter than `limit`, there is no next page
+        response = self.client.get(
+            self.submission_list_url,
+            {'format': 'json', 'after': submission_ids[-3], 'limit': 5},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+
+    def test_list_submissions_with_keyset_pagination_and_start(self):
+        """
+        `after` cannot be combined with `start` or `sort`
+        """
+        for param in [{'start': 1}, {'sort': '{"q1": -1}'}]:
+            response = self.client.get(
+                self.submission_list_url,
+                {'format': 'json', 'after': 0, **param},
+            )
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_list_submissions_with_count_strategy(self):
+        """
+        someuser is the owner of the project.
+        They can choose how submissions are counted
+        """
+        for count_strategy in ['exact', 'estimated', 'cached']:
+            response = self.client.get(
+                self.submission_list_url,
+                {'format': 'json', 'count_strategy': count_strategy},
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['count'], len(self.submissions))
+
+        response = self.client.get(
+            self.submission_list_url,
+            {'format': 'json', 'count_strategy': 'none', 'limit': 5},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['count'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIn('start=5', response.data['next'])
+
+        response = self.client.get(
+            self.submission_list_url,
+            {'format': 'json', 'count_strategy': 'none', 'start': 15},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(
+            self.submission_list_url,
+            {'format': 'json', 'count_strategy': 'approximately'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_submissions_with_cached_count(self):
+        """
+        Cached counts are refreshed when new submissions are received or
+        when submissions are altered through KPI
+        """
+        params = {
+            'format': 'json',
+            'count_strategy': 'cached',
+            'query': '{"_submitted_by": "someuser"}',
+        }
+        expected_count = len(self.submissions_submitted_by_someuser)
+        response = self.client.get(self.submission_list_url, params)
+        self.assertEqual(response.data['count'], expected_count)
+
+        # Bypass KPI to alter a submission, the count is not refreshed
+        submission = self.submissions_submitted_by_unknown[0]
+        settings.MONGO_DB.instances.update_one(
+            {'_id': submission['_id']},
+            {'$set': {'_submitted_by': 'someuser'}},
+        )
+        response = self.client.get(self.submission_list_url, params)
+        self.assertEqual(response.data['count'], expected_count)
+        settings.MONGO_DB.instances.update_one(
+            {'_id': submission['_id']},
+            {'$set': {'_submitted_by': submission['_submitted_by']}},
+        )
+
+        # Bypass KPI to add a submission, like KoBoCAT does
+        settings.MONGO_DB.instances.insert_one(
+            {
+                '_id': 1000,
+                '_submitted_by': 'someuser',
+                MongoHelper.USERFORM_ID: self.asset.deployment.mongo_userform_id,
+            }
+        )
+        response = self.client.get(self.submission_list_url, params)
+        self.assertEqual(response.data['count'], expected_count + 1)
+
+        # Delete a submission which does not match the query through KPI
+        submission = self.submissions_submitted_by_unknown[0]
+        url = self.asset.deployment.get_submission_detail_url(
+            submission['_id']
+        )
+        response = self.client.delete(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(self.submission_list_url, params)
+        self.assertEqual(response.data['count'], expected_count + 1)
+
+    def test_list_submissions_streamed(self):
+        """
+        someuser is the owner of the project.
+        They can receive their data as a stream
+        """
+        response = self.client.get(
+            self.submission_list_url,
+            {'format': 'json', 'stream': 'true', 'limit': 5},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data['count'], len(self.submissions))
+        self.assertEqual(data['results'], self.submissions[:5])
+        self.assertIn('stream=true', data['next'])
+
+    def test_list_submissions_streamed_without_count(self):
+        """
+        Pages read with keyset pagination or without counting submissions
+        are streamed too. `next` is written once the page is read.
+        """
+        for params in (
+            {'after': 0, 'count_strategy': 'none'},
+            {'count_strategy': 'none'},
+            {'after': 0},
+        ):
+            response = self.client.get(
+                self.submission_list_url,
+                {'format': 'json', 'stream': 'true', 'limit': 5, **params},
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.streaming)
+            data = json.loads(b''.join(response.streaming_content))
+            self.assertEqual(data['results'], self.submissions[:5])
+            self.assertIn('stream=true', data['next'])
+
     def test_list_submissions_not_shared_as_anotheruser(self):
         """
         someuser is the owner of the project.
@@ -2073,6 +2236,42 @@ class BulkUpdateSubmissionsApiTests(BaseSubmissionTestCase):
         assert response.status_code == status.HTTP_200_OK
         self._check_bulk_update(response)
 
+    @override_settings(SUBMISSION_BULK_UPDATE_ASYNC_THRESHOLD=2)
+    def test_bulk_update_submissions_in_background(self):
+        """
+        someuser is the owner of the project.
+        someuser bulk updates more submissions than the threshold, and the
+        submissions are processed by a background job.
+        """
+        response = self.client.patch(
+            self.submission_url, data=self.submitted_payload, format='json'
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert 'user_id' not in response.data
+        assert response.data['total'] == 3
+
+        job_url = reverse(
+            self._get_endpoint('submission-bulk-job'),
+            kwargs={
+                'parent_lookup_asset': self.asset.uid,
+                'job_uid': response.data['uid'],
+            },
+        )
+        # Celery runs tasks synchronously in tests, the job is already done
+        response = self.client.get(job_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'complete'
+        assert response.data['status_code'] == status.HTTP_200_OK
+        assert response.data['processed'] == 3
+        assert response.data['failures'] == 0
+        assert len(response.data['results']) == 3
+
+        # Jobs are only visible to the user who started them
+        self.asset.assign_perm(self.anotheruser, PERM_CHANGE_SUBMISSIONS)
+        self._log_in_as_another_user()
+        response = self.client.get(job_url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
 
 class SubmissionValidationStatusApiTests(BaseSubmissionTestCase):
 
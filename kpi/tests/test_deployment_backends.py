@@ -1,7 +1,13 @@
 # coding: utf-8
 import pytest
+import responses
 from django.test import TestCase
+from prometheus_client import REGISTRY
 
+from kpi.deployment_backends.kc_access.session import (
+    get_endpoint_label,
+    get_kobocat_session,
+)
 from kpi.exceptions import DeploymentDataException
 from kpi.models.asset import Asset
 from kpi.models.asset_version import AssetVersion
@@ -148,3 +154,53 @@ class MockDeployment(TestCase):
         # altered directly
         with self.assertRaises(DeploymentDataException) as e:
             asset.save()
+
+
+class KobocatSessionTestCase(TestCase):
+
+    def test_endpoint_labels(self):
+        self.assertEqual(
+            get_endpoint_label(
+                'http://kobocat/api/v1/data/1/23/validation_status?a=1'
+            ),
+            '/api/v1/data/{id}/{id}/validation_status',
+        )
+        self.assertEqual(
+            get_endpoint_label('http://kobocat/api/v1/forms/12/'),
+            '/api/v1/forms/{id}',
+        )
+
+    def test_session_is_shared(self):
+        self.assertIs(get_kobocat_session(), get_kobocat_session())
+
+    @responses.activate
+    def test_server_errors_are_counted(self):
+        url = 'http://kobocat/api/v1/forms'
+        responses.add(responses.POST, url, status=500)
+        labels = {
+            'method': 'POST',
+            'endpoint': '/api/v1/forms',
+            'error': '500',
+        }
+        errors_before = REGISTRY.get_sample_value(
+            'kpi_kobocat_request_errors_total', labels
+        ) or 0
+
+        response = get_kobocat_session().post(url)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                'kpi_kobocat_request_errors_total', labels
+            ),
+            errors_before + 1,
+        )
+
+    @responses.activate
+    def test_cookies_are_not_stored(self):
+        url = 'http://kobocat/api/v1/forms'
+        responses.add(
+            responses.GET, url, headers={'Set-Cookie': 'sessionid=secret'}
+        )
+        session = get_kobocat_session()
+        session.get(url)
+        self.assertEqual(len(session.cookies), 0)
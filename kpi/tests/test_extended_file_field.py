@@ -1,6 +1,7 @@
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.test import override_settings, TestCase
+from mock import patch
 
 from kpi.models.asset import Asset
 from kpi.models.asset_file import AssetFile
@@ -24,7 +25,17 @@ class ExtendedFileFieldTestCase(TestCase):
         try:
             assert default_storage.exists(path)
             assert not default_storage.exists(new_path)
-            asset_file.content.move('__pytest_moved')
+            content_field = AssetFile._meta.get_field('content')
+            # The target folder is not altered by `upload_to`
+            with patch.object(
+                content_field, 'generate_filename'
+            ) as generate_filename_mock:
+                assert asset_file.content.move('__pytest_moved')
+                generate_filename_mock.assert_not_called()
+            assert asset_file.content.name == new_path
+            asset_file.save()
+            asset_file.refresh_from_db()
+            assert asset_file.content.name == new_path
             assert not default_storage.exists(path)
             assert default_storage.exists(new_path)
 
@@ -2,12 +2,13 @@
 from copy import deepcopy
 from collections import OrderedDict
 
+import mock
 from django.contrib.auth.models import User
 from django.test import TestCase
 
 from formpack import FormPack
 from kobo.apps.reports import report_data
-from kpi.models import Asset
+from kpi.models import Asset, AssetVersion
 
 F1 = {'survey': [{'$kuid': 'Uf89NP4VX', 'type': 'start', 'name': 'start'},
                   {'$kuid': 'ZtZBY7XHX', 'type': 'end', 'name': 'end'},
@@ -159,6 +160,59 @@ class MockDataReports(TestCase):
         self.assertEqual([v['name'] for v in values], expected_names)
         self.assertEqual(len(values), 17)
 
+    def test_kobo_apps_reports_report_data_aggregated_by_mongo(self):
+        """
+        Counting values with MongoDB must give the same results as streaming
+        the submissions through formpack
+        """
+        for lang in (None, 'Arabic'):
+            for split_by in (None, 'Select_one'):
+                expected = report_data.data_by_identifiers(
+                    self.asset,
+                    lang=lang,
+                    split_by=split_by,
+                    submission_stream=self.asset.deployment.get_submissions(
+                        self.user
+                    ),
+                )
+                with mock.patch.object(
+                    self.asset.deployment,
+                    'get_submission_value_counts',
+                    wraps=self.asset.deployment.get_submission_value_counts,
+                ) as patched_get_submission_value_counts:
+                    values = report_data.data_by_identifiers(
+                        self.asset, lang=lang, split_by=split_by, user=self.user
+                    )
+                self.assertEqual(values, expected)
+                self.assertEqual(
+                    patched_get_submission_value_counts.called, not split_by
+                )
+
+    def test_kobo_apps_reports_report_data_retrieves_all_version_keys(self):
+        # Legacy form versions may have numbered version fields, see
+        # https://github.com/kobotoolbox/kpi/issues/1465
+        version = self.asset.latest_deployed_version
+        content = deepcopy(version._deployed_content())
+        content['survey'].append({
+            'type': 'calculate',
+            'name': '_version__001',
+            'calculation': "'{}'".format(version.uid),
+        })
+        AssetVersion.objects.filter(pk=version.pk).update(
+            deployed_content=content
+        )
+        with mock.patch.object(
+            self.asset.deployment,
+            'get_submissions',
+            wraps=self.asset.deployment.get_submissions,
+        ) as patched_get_submissions:
+            report_data.data_by_identifiers(
+                self.asset, split_by='Select_one', user=self.user
+            )
+        fields = patched_get_submissions.call_args.kwargs['fields']
+        for version_key in ['__version__', '_version_', '_version__001']:
+            self.assertIn(version_key, fields)
+
     def test_kobo_apps_reports_report_data_split_by(self):
         values = report_data.data_by_identifiers(self.asset,
                                                  split_by="Select_one",
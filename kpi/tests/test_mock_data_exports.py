@@ -1,4 +1,5 @@
 # coding: utf-8
+import copy
 import os
 import zipfile
 from collections import defaultdict
@@ -13,7 +14,7 @@ import openpyxl
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from kobo.apps.reports import report_data
 from kpi.constants import (
@@ -586,6 +587,206 @@ class MockDataExports(MockDataExportsBase):
         ]
         self.run_csv_export_test(expected_lines, export_options)
 
+    def test_csv_export_in_chunks(self):
+        task_data = {
+            'source': reverse('asset-detail', args=[self.asset.uid]),
+            'type': 'csv',
+            'fields': [
+                'start',
+                'end',
+                'Do_you_descend_from_unicellular_organism',
+                '_index',
+            ],
+        }
+        expected_lines = [
+            '"start";"end";"Do you descend from an ancestral unicellular organism?";"_index"',
+            '"2017-10-23T05:40:39.000-04:00";"2017-10-23T05:41:13.000-04:00";"No";"1"',
+            '"2017-10-23T05:41:14.000-04:00";"2017-10-23T05:41:32.000-04:00";"No";"2"',
+            '"2017-10-23T05:41:32.000-04:00";"2017-10-23T05:42:05.000-04:00";"Yes";"3"',
+        ]
+        expected_lines = [
+            (line + '\r\n').encode('utf-8') for line in expected_lines
+        ]
+
+        export_task = ExportTask()
+        export_task.user = self.user
+        export_task.data = task_data
+        export_task.save()
+        with override_settings(EXPORT_CHUNK_SIZE=2):
+            export_task.run()
+
+        self.assertEqual(export_task.status, ExportTask.COMPLETE)
+        self.assertEqual(export_task.data['total_chunks'], 2)
+        self.assertEqual(export_task.data['processed_chunks'], 2)
+        self.assertEqual(list(export_task.result), expected_lines)
+        self.assertIsNotNone(export_task.last_submission_time)
+
+    def test_csv_export_in_chunks_deletes_fragments_on_failure(self):
+        export_task = ExportTask()
+        export_task.user = self.user
+        export_task.data = {
+            'source': reverse('asset-detail', args=[self.asset.uid]),
+            'type': 'csv',
+        }
+        export_task.save()
+        with override_settings(EXPORT_CHUNK_SIZE=2), mock.patch.object(
+            ExportTask, 'merge_chunks', side_effect=Exception('merge failed')
+        ):
+            export_task.run()
+
+        export_task.refresh_from_db()
+        self.assertEqual(export_task.status, ExportTask.ERROR)
+        self.assertEqual(export_task.messages['error'], 'merge failed')
+        storage = export_task.result.storage
+        for chunk_index in range(export_task.data['total_chunks']):
+            self.assertFalse(
+                storage.exists(export_task._get_chunk_filepath(chunk_index))
+            )
+
+    def test_csv_export_chunks(self):
+        submission_ids = [
+            submission['_id']
+            for submission in self.asset.deployment.get_submissions(
+                self.user, fields=['_id'], sort={'_id': 1}
+            )
+        ]
+        export_task = ExportTask()
+        export_task.user = self.user
+        export_task.data = {
+            'source': reverse('asset-detail', args=[self.asset.uid]),
+            'type': 'csv',
+        }
+        export_task.save()
+
+        # Submissions fit in one chunk, they are only counted
+        with override_settings(EXPORT_CHUNK_SIZE=len(submission_ids)):
+            with mock.patch.object(
+                self.asset.deployment.__class__, 'get_submissions'
+            ) as patched_get_submissions:
+                self.assertEqual(
+                    export_task._get_chunks(),
+                    [(0, None, len(submission_ids))],
+                )
+                patched_get_submissions.assert_not_called()
+
+        with override_settings(EXPORT_CHUNK_SIZE=2):
+            self.assertEqual(
+                export_task._get_chunks(),
+                [
+                    (0, submission_ids[1], 2),
+                    (submission_ids[1], None, len(submission_ids) - 2),
+                ],
+            )
+
+    def test_csv_export_start_index(self):
+        """
+        `_index` continuity of chunked exports relies on a private attribute
+        of formpack. This test fails if the pinned version of formpack does
+        not provide it anymore.
+        """
+        export_task = ExportTask()
+        export_task.user = self.user
+        export_task.data = {
+            'source': reverse('asset-detail', args=[self.asset.uid]),
+            'type': 'csv',
+            'fields': ['Do_you_descend_from_unicellular_organism', '_index'],
+        }
+        export, submission_stream = export_task.get_export_object()
+        export_task._set_export_start_index(export, 5)
+        self.assertEqual(
+            list(export.to_csv(submission_stream)),
+            [
+                '"Do you descend from an ancestral unicellular organism?";"_index"',
+                '"No";"5"',
+                '"No";"6"',
+                '"Yes";"7"',
+            ],
+        )
+
+    def _run_incremental_csv_export(self):
+        export_task = ExportTask()
+        export_task.user = self.user
+        export_task.data = {
+            'source': reverse('asset-detail', args=[self.asset.uid]),
+            'type': 'csv',
+            'fields': [
+                'start',
+                'end',
+                'Do_you_descend_from_unicellular_organism',
+                '_index',
+            ],
+            'incremental': True,
+        }
+        export_task.save()
+        export_task.run()
+        self.assertEqual(export_task.status, ExportTask.COMPLETE)
+        return export_task
+
+    def test_csv_export_incremental(self):
+        first_export = self._run_incremental_csv_export()
+        self.assertNotIn('base_export', first_export.data)
+        self.assertEqual(first_export.data['submission_count'], 3)
+        self.assertEqual(first_export.data['last_submission_id'], 63)
+
+        submission = copy.deepcopy(
+            self.forms[self.form_names[0]]['submissions'][0]
+        )
+        submission.update({
+            '_id': 64,
+            '_uuid': 'a9ee1a7b-1b4c-4d39-a0f5-2d1d2d6a0c39',
+            '_submission_time': '2017-10-24T09:41:19',
+        })
+        self.asset.deployment.mock_submissions([submission], flush_db=False)
+
+        second_export = self._run_incremental_csv_export()
+        self.assertEqual(second_export.data['base_export'], first_export.uid)
+        self.assertEqual(second_export.data['submission_count'], 4)
+        self.assertEqual(second_export.data['last_submission_id'], 64)
+        self.assertEqual(
+            second_export.last_submission_time.isoformat(),
+            '2017-10-24T09:41:19+00:00',
+        )
+        expected_lines = [
+            '"start";"end";"Do you descend from an ancestral unicellular organism?";"_index"',
+            '"2017-10-23T05:40:39.000-04:00";"2017-10-23T05:41:13.000-04:00";"No";"1"',
+            '"2017-10-23T05:41:14.000-04:00";"2017-10-23T05:41:32.000-04:00";"No";"2"',
+            '"2017-10-23T05:41:32.000-04:00";"2017-10-23T05:42:05.000-04:00";"Yes";"3"',
+            '"2017-10-23T05:40:39.000-04:00";"2017-10-23T05:41:13.000-04:00";"No";"4"',
+        ]
+        self.assertEqual(
+            list(second_export.result),
+            [(line + '\r\n').encode('utf-8') for line in expected_lines],
+        )
+
+    def test_csv_export_incremental_after_deletion(self):
+        self._run_incremental_csv_export()
+        self.asset.deployment.delete_submission(61, self.user)
+
+        # Falls back to a full export
+        second_export = self._run_incremental_csv_export()
+        self.assertNotIn('base_export', second_export.data)
+        self.assertEqual(second_export.data['submission_count'], 2)
+        expected_lines = [
+            '"start";"end";"Do you descend from an ancestral unicellular organism?";"_index"',
+            '"2017-10-23T05:41:14.000-04:00";"2017-10-23T05:41:32.000-04:00";"No";"1"',
+            '"2017-10-23T05:41:32.000-04:00";"2017-10-23T05:42:05.000-04:00";"Yes";"2"',
+        ]
+        self.assertEqual(
+            list(second_export.result),
+            [(line + '\r\n').encode('utf-8') for line in expected_lines],
+        )
+
+    def test_csv_export_incremental_after_supplemental_details_edit(self):
+        self._run_incremental_csv_export()
+        self.asset.submission_extras.create(
+            submission_uuid='48583952-1892-4931-8d9c-869e7b49bafb'
+        )
+
+        # Falls back to a full export
+        second_export = self._run_incremental_csv_export()
+        self.assertNotIn('base_export', second_export.data)
+        self.assertEqual(second_export.data['submission_count'], 3)
+
     def test_xls_export_english_labels(self):
         version_uid = self.asset.latest_deployed_version_uid
         export_options = {'lang': 'English'}
@@ -4,6 +4,7 @@ import copy
 
 from django.conf import settings
 from django.test import TestCase
+from mock import MagicMock, patch
 from model_bakery import baker
 
 from kpi.tests.utils import baker_generators  # noqa
@@ -147,3 +148,103 @@ class MongoHelperTestCase(TestCase):
             1,
         )
 
+
+    def test_get_instances_after(self):
+        user = baker.make('auth.User')
+        asset = baker.make('kpi.Asset', owner=user)
+        asset.deploy(backend='mock', active=True)
+        userform_id = asset.deployment.mongo_userform_id
+        submissions = [{'q1': f'a{i}'} for i in range(5)]
+        self.add_submissions(asset, submissions)
+
+        cursor, count = MongoHelper.get_instances(
+            userform_id, after=2, limit=2, start=3
+        )
+        # `start` is ignored and `count` is not narrowed down by `after`
+        assert count == 5
+        assert [instance['_id'] for instance in cursor] == [3, 4]
+
+        cursor, count = MongoHelper.get_instances(
+            userform_id, after=2, query={'q1': 'a0'}
+        )
+        assert count == 1
+        assert list(cursor) == []
+
+    def test_get_value_counts_incrementally(self):
+        user = baker.make('auth.User')
+        asset = baker.make('kpi.Asset', owner=user)
+        asset.deploy(backend='mock', active=True)
+        userform_id = asset.deployment.mongo_userform_id
+        version_id = asset.deployment.version_id
+        self.add_submissions(asset, [{'q1': 'a'}, {'q1': 'b'}, {}])
+
+        def get_value_counts():
+            return MongoHelper.get_value_counts(
+                userform_id, ['q1'], version_id=version_id
+            )
+
+        assert get_value_counts() == {'q1': [('a', 1), ('b', 1), (None, 1)]}
+
+        # Submissions received from KoBoCAT directly are folded in, without
+        # counting the others again
+        settings.MONGO_DB.instances.insert_many(
+            [
+                {'_id': 4, 'q1': 'b', MongoHelper.USERFORM_ID: userform_id},
+                {'_id': 5, 'q1': 'c', MongoHelper.USERFORM_ID: userform_id},
+            ]
+        )
+        with patch.object(
+            MongoHelper,
+            '_aggregate_value_counts',
+            wraps=MongoHelper._aggregate_value_counts,
+        ) as patched_aggregate:
+            assert get_value_counts() == {
+                'q1': [('a', 1), ('b', 2), (None, 1), ('c', 1)]
+            }
+            assert patched_aggregate.call_args.kwargs == {'after': 3}
+
+        # Deleting a submission outside of KPI triggers a full recount
+        settings.MONGO_DB.instances.delete_one({'_id': 1})
+        assert get_value_counts() == {'q1': [('b', 2), (None, 1), ('c', 1)]}
+
+        # Editing a submission through KPI discards the cached counts
+        settings.MONGO_DB.instances.update_one(
+            {'_id': 2}, {'$set': {'q1': 'c'}}
+        )
+        MongoHelper.invalidate_cached_counts(userform_id)
+        assert get_value_counts() == {'q1': [('c', 2), (None, 1), ('b', 1)]}
+
+    def test_get_value_counts_after_edit_outside_of_kpi(self):
+        user = baker.make('auth.User')
+        asset = baker.make('kpi.Asset', owner=user)
+        asset.deploy(backend='mock', active=True)
+        userform_id = asset.deployment.mongo_userform_id
+        self.add_submissions(asset, [{'q1': 'a'}, {'q1': 'b'}])
+        modified_since = MagicMock(return_value=False)
+
+        def get_value_counts():
+            return MongoHelper.get_value_counts(
+                userform_id,
+                ['q1'],
+                version_id=asset.deployment.version_id,
+                submissions_modified_since=modified_since,
+            )
+
+        assert get_value_counts() == {'q1': [('a', 1), ('b', 1)]}
+
+        # Edited with Enketo through KoBoCAT, KPI is not notified
+        settings.MONGO_DB.instances.update_one(
+            {'_id': 1}, {'$set': {'q1': 'b'}}
+        )
+        assert get_value_counts() == {'q1': [('a', 1), ('b', 1)]}
+        date_computed = modified_since.call_args.args[0]
+        assert modified_since.call_args.kwargs == {'until_submission_id': 2}
+
+        modified_since.return_value = True
+        assert get_value_counts() == {'q1': [('b', 2)]}
+        assert modified_since.call_args.args == (date_computed,)
+
+        # The date of the new counts is checked from now on
+        modified_since.return_value = False
+        assert get_value_counts() == {'q1': [('b', 2)]}
+        assert modified_since.call_args.args[0] > date_computed
@@ -1,5 +1,6 @@
 # coding: utf-8
 from django.contrib.auth.models import User
+from mock import MagicMock
 from django.test import TestCase
 
 from kpi.constants import PERM_VIEW_SUBMISSIONS
@@ -136,3 +137,18 @@ class PairedDataTestCase(TestCase):
         )
         source = self.paired_data.get_source(force=True)
         self.assertEqual(source, None)
+
+    def test_xml_submissions_are_matched_after_deletion(self):
+        deployment = MagicMock()
+        deployment.get_submissions.side_effect = [
+            # Submission 2 has been deleted since its id was retrieved
+            ['<data>1</data>', '<data>3</data>'],
+            [{'_id': 3}, {'_id': 1}],
+            ['<data>1</data>', '<data>3</data>'],
+        ]
+        xml_submissions = PairedData._get_xml_submissions(
+            deployment, self.paired_data.asset.owner, [1, 2, 3]
+        )
+        self.assertEqual(
+            xml_submissions, {1: '<data>1</data>', 3: '<data>3</data>'}
+        )
@@ -1,7 +1,11 @@
 # coding: utf-8
 import unittest
+from unittest.mock import patch
+
+from django.conf import settings
 from django.contrib.auth.models import User, AnonymousUser
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 
 from kpi.constants import (
     ASSET_TYPE_COLLECTION,
@@ -19,6 +23,7 @@ from kpi.constants import (
     PERM_VIEW_SUBMISSIONS,
 )
 from kpi.exceptions import BadPermissionsException
+from kpi.mixins.object_permission import ObjectPermissionMixin
 from kpi.utils.object_permission import get_all_objects_for_user
 from ..models.asset import Asset
 
@@ -862,3 +867,144 @@ class PermissionsTestCase(BasePermissionsTestCase):
         self.assertTrue(grantee.has_perm(PERM_VIEW_SUBMISSIONS, asset))
         self.assertTrue(asset.get_perms(grantee),
                         asset.get_perms(anonymous_user))
+
+    def test_bulk_assign_permissions(self):
+        collection = self.admin_collection
+        child_asset = self.admin_asset
+        collection.children.add(child_asset)
+        child_asset.refresh_from_db()
+        another_asset = Asset.objects.create(
+            asset_type=ASSET_TYPE_SURVEY, owner=self.admin
+        )
+        assets = [collection, another_asset]
+        grantees = [self.someuser, self.anotheruser]
+
+        new_permissions = Asset.bulk_assign_perms(
+            assets, grantees, [PERM_CHANGE_ASSET]
+        )
+        # `view_asset` is implied by `change_asset`
+        self.assertEqual(len(new_permissions), 8)
+        # Children inherit permissions of their parent
+        for asset in assets + [child_asset]:
+            for grantee in grantees:
+                self.assertListEqual(
+                    sorted(asset.get_perms(grantee)),
+                    [PERM_CHANGE_ASSET, PERM_VIEW_ASSET],
+                )
+
+        # Duplicated objects are assigned permissions once
+        yet_another_asset = Asset.objects.create(
+            asset_type=ASSET_TYPE_SURVEY, owner=self.admin
+        )
+        new_permissions = Asset.bulk_assign_perms(
+            [
+                yet_another_asset,
+                Asset.objects.get(pk=yet_another_asset.pk),
+            ],
+            [self.someuser, self.someuser],
+            [PERM_VIEW_ASSET],
+        )
+        self.assertEqual(len(new_permissions), 1)
+        self.assertEqual(
+            yet_another_asset.permissions.filter(
+                user=self.someuser, permission__codename=PERM_VIEW_ASSET
+            ).count(),
+            1,
+        )
+
+        # Assigning the same permissions again is a no-op
+        self.assertListEqual(
+            Asset.bulk_assign_perms(assets, grantees, [PERM_CHANGE_ASSET]), []
+        )
+
+        # Denying `view_asset` denies `change_asset` as well and is propagated
+        # to children
+        Asset.bulk_assign_perms(
+            [collection], [self.someuser], [PERM_VIEW_ASSET], deny=True
+        )
+        self.assertListEqual(collection.get_perms(self.someuser), [])
+        self.assertListEqual(child_asset.get_perms(self.someuser), [])
+        self.assertListEqual(
+            sorted(collection.get_perms(self.anotheruser)),
+            [PERM_CHANGE_ASSET, PERM_VIEW_ASSET],
+        )
+
+
+@override_settings(
+    OBJECT_PERMISSION_CACHE_ENABLED=True,
+    OBJECT_PERMISSION_CACHE_ALIAS='object_permissions',
+    CACHES={
+        **settings.CACHES,
+        'object_permissions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    },
+)
+class SharedCachePermissionsTestCase(PermissionsTestCase):
+    """
+    Run all permissions tests with object permissions shared between requests
+    """
+
+    def setUp(self):
+        super().setUp()
+        caches['object_permissions'].clear()
+
+    def test_object_permissions_are_shared(self):
+        self.admin_asset.assign_perm(self.someuser, PERM_VIEW_ASSET)
+        self.assertTrue(
+            self.admin_asset.has_perm(self.someuser, PERM_VIEW_ASSET)
+        )
+
+        # Another instance (e.g. in another request) does not hit the DB
+        asset = Asset.objects.get(pk=self.admin_asset.pk)
+        with patch.object(
+            ObjectPermissionMixin,
+            '_ObjectPermissionMixin__load_object_permissions',
+        ) as load_mock:
+            self.assertTrue(asset.has_perm(self.someuser, PERM_VIEW_ASSET))
+            load_mock.assert_not_called()
+
+        # Any change makes cached permissions obsolete
+        self.admin_asset.remove_perm(self.someuser, PERM_VIEW_ASSET)
+        asset = Asset.objects.get(pk=self.admin_asset.pk)
+        self.assertFalse(asset.has_perm(self.someuser, PERM_VIEW_ASSET))
+
+    def test_only_user_permissions_are_shared_for_asset_lists(self):
+        self.admin_asset.assign_perm(self.someuser, PERM_VIEW_ASSET)
+        self.admin_asset.assign_perm(self.anotheruser, PERM_VIEW_ASSET)
+
+        # Asset lists (see `AssetSerializer`) only need the permissions of
+        # the requesting user (and the anonymous user) for each asset
+        asset = Asset.objects.get(pk=self.admin_asset.pk)
+        asset.asset_ids_cache = [asset.pk]
+        with patch.object(
+            ObjectPermissionMixin,
+            '_ObjectPermissionMixin__load_object_permissions',
+        ) as load_mock:
+            self.assertTrue(asset.has_perm(self.someuser, PERM_VIEW_ASSET))
+            self.assertFalse(
+                asset.has_perm(self.anotheruser, PERM_CHANGE_ASSET)
+            )
+            load_mock.assert_not_called()
+
+        asset = Asset.objects.get(pk=self.admin_asset.pk)
+        asset.asset_ids_cache = [asset.pk]
+        with patch.object(
+            ObjectPermissionMixin,
+            '_ObjectPermissionMixin__load_user_permissions',
+        ) as load_mock:
+            self.assertTrue(asset.has_perm(self.someuser, PERM_VIEW_ASSET))
+            load_mock.assert_not_called()
+
+    def test_versions_are_not_bumped_when_cache_is_disabled(self):
+        cache = caches['object_permissions']
+        with override_settings(OBJECT_PERMISSION_CACHE_ENABLED=False):
+            self.admin_asset.assign_perm(self.someuser, PERM_VIEW_ASSET)
+        self.assertIsNone(
+            cache.get(f'object_permissions_version:{self.admin_asset.pk}')
+        )
+
+        self.admin_asset.remove_perm(self.someuser, PERM_VIEW_ASSET)
+        self.assertIsNotNone(
+            cache.get(f'object_permissions_version:{self.admin_asset.pk}')
+        )
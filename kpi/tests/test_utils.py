@@ -1,13 +1,14 @@
 # coding: utf-8
 import os
 import re
+import timeit
 from copy import deepcopy
 
 import pytest
 from django.conf import settings
 from django.db.models import Q
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from kpi.exceptions import (
     SearchQueryTooShortException,
@@ -19,6 +20,7 @@ from kpi.utils.autoname import autovalue_choices_in_place
 from kpi.utils.pyxform_compatibility import allow_choice_duplicates
 from kpi.utils.query_parser import parse
 from kpi.utils.sluggify import sluggify, sluggify_label
+from kpi.utils.storage import _bulk_delete
 from kpi.utils.submission import get_attachment_filenames_and_xpaths
 from kpi.utils.xml import (
     edit_submission_xml,
@@ -482,6 +484,70 @@ class XmlUtilsTestCase(TestCase):
 
         )
 
+    def test_strip_xml_nodes_by_xpaths_in_repeat_groups(self):
+        source = (
+            '<root>'
+            '    <repeat>'
+            '        <question_1>Answer 1.1</question_1>'
+            '        <question_2>Answer 1.2</question_2>'
+            '    </repeat>'
+            '    <repeat>'
+            '        <question_1>Answer 2.1</question_1>'
+            '    </repeat>'
+            '    <group>'
+            '        <question_3>Answer 3</question_3>'
+            '    </group>'
+            '</root>'
+        )
+        expected = (
+            '<root>'
+            '    <repeat>'
+            '        <question_1>Answer 1.1</question_1>'
+            '    </repeat>'
+            '    <repeat>'
+            '        <question_1>Answer 2.1</question_1>'
+            '    </repeat>'
+            '</root>'
+        )
+        self.__compare_xml(
+            strip_nodes(source, ['repeat/question_1'], use_xpath=True),
+            expected,
+        )
+
+    @pytest.mark.performance
+    def test_strip_nodes_speed(self):
+        # 20 groups, nested 3 levels deep, with 10 questions per level.
+        # Every other question is kept, like a typical `PairedData.fields`.
+        groups = []
+        xpaths = []
+        for group_index in range(20):
+            names = [f'group_{group_index}_{level}' for level in range(3)]
+            xml = ''
+            for level in reversed(range(3)):
+                questions = ''
+                for question_index in range(10):
+                    questions += (
+                        f'<question_{question_index}>answer'
+                        f'</question_{question_index}>'
+                    )
+                    xpaths.append(
+                        '/'.join(
+                            names[:level + 1] + [f'question_{question_index}']
+                        )
+                    )
+                xml = f'<{names[level]}>{questions}{xml}</{names[level]}>'
+            groups.append(xml)
+        source = f'<root>{"".join(groups)}</root>'
+        nodes_to_keep = xpaths[::2]
+
+        # The former implementation, which computed the XPath of every node,
+        # took ~3 ms per submission
+        duration = timeit.timeit(
+            lambda: strip_nodes(source, nodes_to_keep, use_xpath=True),
+            number=100,
+        )
+        assert duration / 100 < 0.003
+
     def test_get_or_create_element(self):
         initial_xml_with_ns = '''
             <hello xmlns="http://opendatakit.org/submissions">
@@ -600,3 +666,38 @@ class XmlUtilsTestCase(TestCase):
         re_source = re.sub(pattern, r'\1', source)
         re_target = re.sub(pattern, r'\1', target)
         self.assertEqual(re_source, re_target)
+
+
+class StorageUtilsTestCase(TestCase):
+
+    @override_settings(STORAGE_BULK_DELETE_MAX_WORKERS=1)
+    def test_bulk_delete_resumes_after_failure(self):
+        keys = [f'folder/{index:03}' for index in range(23)]
+        remaining_keys = set(keys)
+        listed_after = []
+        failing_key = 'folder/012'
+
+        def list_keys(prefix, start_after):
+            listed_after.append(start_after)
+            for key in sorted(remaining_keys):
+                if start_after is None or key > start_after:
+                    yield key
+
+        def delete_keys(batch):
+            if failing_key in batch:
+                raise Exception('Storage unavailable')
+            remaining_keys.difference_update(batch)
+
+        with pytest.raises(Exception, match='Storage unavailable'):
+            _bulk_delete('folder/', list_keys, delete_keys, batch_size=5)
+        assert remaining_keys == set(keys[10:])
+
+        # Next call starts listing after the last batch deleted
+        failing_key = None
+        _bulk_delete('folder/', list_keys, delete_keys, batch_size=5)
+        assert listed_after == [None, 'folder/009']
+        assert remaining_keys == set()
+
+        # Progress is cleared once the folder is deleted
+        _bulk_delete('folder/', list_keys, delete_keys, batch_size=5)
+        assert listed_after[-1] is None
@@ -1,8 +1,147 @@
 # -*- coding: utf-8 -*-
+import uuid
 from functools import wraps
+from typing import Iterable
 
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import transaction
+from django_redis.cache import RedisCache
 from django_request_cache import get_request_cache
 
+ASSETS_VERSION_KEY_PREFIX = 'assets_version'
+
+# Delete the lock only if it still holds the token of the process releasing it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def bump_assets_version(
+    asset_ids: Iterable[int], user_ids: Iterable[int] = ()
+):
+    """
+    Make cached data computed from `asset_ids` (e.g. asset list metadata or
+    hash) obsolete for all users who have permissions on them, and for
+    `user_ids`. Should be called each time an asset, or one of its versions,
+    is saved or deleted.
+
+    Public assets are visible to everybody through the anonymous user, whose
+    version is part of the version of every user (see
+    `get_assets_version()`).
+
+    Nothing is written when no cache relies on the version.
+    """
+    if not (
+        settings.ASSET_METADATA_CACHE_TIMEOUT
+        or settings.ASSET_HASH_CACHE_TIMEOUT
+    ):
+        return
+
+    # Avoid circular import
+    ObjectPermission = apps.get_model('kpi', 'ObjectPermission')  # noqa
+
+    user_ids = set(user_ids)
+    user_ids.update(
+        ObjectPermission.objects.filter(asset_id__in=asset_ids)
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    bump_versions(_get_assets_version_key(user_id) for user_id in user_ids)
+
+
+def bump_versions(keys: Iterable[str]):
+    """
+    Give new versions to `keys`, making cache entries built with their
+    previous versions obsolete.
+
+    Versions are bumped right away, to let the current transaction see its
+    own changes, and once again on commit, to discard what other processes
+    may have cached in the meantime.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+
+    def _bump():
+        get_versions_cache().set_many(
+            {key: uuid.uuid4().hex for key in keys}, timeout=None
+        )
+
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def get_assets_version(user_id: int) -> str:
+    """
+    Return the current version of cached data computed from the assets
+    `user_id` can access, public ones included. It changes when the user
+    gains or loses access to assets, and when one of these assets changes.
+    """
+    # Avoid circular import
+    from kpi.utils.object_permission import get_accessible_assets_version_key
+
+    versions_keys = []
+    for user_id_ in sorted({user_id, settings.ANONYMOUS_USER_ID}):
+        versions_keys.append(get_accessible_assets_version_key(user_id_))
+        versions_keys.append(_get_assets_version_key(user_id_))
+    versions = get_versions(versions_keys)
+    return ':'.join(versions[key] for key in versions_keys)
+
+
+def get_versions(keys: Iterable[str]) -> dict:
+    """
+    Return the current versions of `keys`, keyed by key. Missing versions are
+    created, unless a concurrent process has just done it.
+    """
+    versions_cache = get_versions_cache()
+    keys = list(keys)
+    versions = versions_cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = uuid.uuid4().hex
+            if not versions_cache.add(key, version, timeout=None):
+                version = versions_cache.get(key, version)
+            versions[key] = version
+    return versions
+
+
+def get_versions_cache():
+    """
+    Return the cache holding all versions, whichever cache holds the entries
+    they are part of the keys of.
+    """
+    return caches[settings.OBJECT_PERMISSION_CACHE_ALIAS]
+
+
+def release_lock(lock_key: str, lock_token: str):
+    """
+    Release the lock `lock_key` acquired with
+    `cache.add(lock_key, lock_token, timeout=...)`.
+
+    The lock may have expired and been acquired by another process meanwhile.
+    It is not released on its behalf: on Redis, the token is compared and the
+    key deleted atomically. Other cache back ends (e.g. local memory) fall
+    back on a get followed by a delete.
+    """
+    # `cache` is a proxy, get the back end it points to
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], RedisCache):
+        client = cache.client
+        client.get_client(write=True).eval(
+            RELEASE_LOCK_SCRIPT,
+            1,
+            client.make_key(lock_key),
+            client.encode(lock_token),
+        )
+        return
+
+    if cache.get(lock_key) == lock_token:
+        cache.delete(lock_key)
+
 
 def void_cache_for_request(keys):
     """
@@ -29,3 +168,7 @@ def void_cache_for_request(keys):
             return func(*args, **kwargs)
         return wrapper
     return _void_cache_for_request
+
+
+def _get_assets_version_key(user_id: int) -> str:
+    return f'{ASSETS_VERSION_KEY_PREFIX}:{user_id}'
@@ -1,13 +1,24 @@
 # coding: utf-8
 from __future__ import annotations
 
+import hashlib
 import re
-from typing import Any, Dict, Optional, Union
+import uuid
+from typing import Any, Callable, Dict, Optional, Union
 
+from bson import json_util
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
 from kobo.celery import celery_app
-from kpi.constants import NESTED_MONGO_RESERVED_ATTRIBUTES
+from kpi.constants import (
+    NESTED_MONGO_RESERVED_ATTRIBUTES,
+    SUBMISSION_COUNT_CACHED,
+    SUBMISSION_COUNT_EXACT,
+    SUBMISSION_COUNT_ESTIMATED,
+    SUBMISSION_COUNT_NONE,
+)
 from kpi.utils.strings import base64_encodestring
 
 PermissionFilter = Dict[str, Any]
@@ -41,6 +52,7 @@ class MongoHelper:
     OR_OPERATOR = '$or'
     AND_OPERATOR = '$and'
     IN_OPERATOR = '$in'
+    GT_OPERATOR = '$gt'
     NIN_OPERATOR = '$nin'
     NOT_OPERATOR = '$not'
 
@@ -75,6 +87,9 @@ class MongoHelper:
     USERFORM_ID = '_userform_id'
     DEFAULT_BATCHSIZE = 1000
 
+    COUNT_CACHE_KEY_PREFIX = 'mongo_count'
+    VALUE_COUNTS_CACHE_KEY_PREFIX = 'mongo_value_counts'
+
     @classmethod
     def decode(cls, key):
         """
@@ -95,6 +110,7 @@ class MongoHelper:
             cls.USERFORM_ID: mongo_userform_id,
         }
         delete_counts = settings.MONGO_DB.instances.delete_many(query)
+        cls.invalidate_cached_counts(mongo_userform_id)
 
         return delete_counts == len(submission_ids)
 
@@ -115,6 +131,7 @@ class MongoHelper:
         query=None,
         submission_ids=None,
         permission_filters=None,
+        count_strategy: str = SUBMISSION_COUNT_EXACT,
     ):
         _, total_count = cls._get_cursor_and_count(
             mongo_userform_id,
@@ -122,6 +139,7 @@ class MongoHelper:
             query=query,
             submission_ids=submission_ids,
             permission_filters=permission_filters,
+            count_strategy=count_strategy,
         )
 
         return total_count
@@ -138,7 +156,22 @@ class MongoHelper:
         submission_ids: Optional[list] = None,
         permission_filters: Optional[list] = None,
         skip_count=False,
+        after: Optional[int] = None,
+        count_strategy: str = SUBMISSION_COUNT_EXACT,
+        submission_count: Optional[int] = None,
     ):
+        """
+        Return a cursor on matching instances and their total count.
+
+        See `_get_cursor_and_count()` about `count_strategy` and
+        `submission_count`.
+
+        If `after` is provided, the cursor works in keyset mode: only
+        instances whose `_id` is greater than `after` are returned, sorted by
+        `_id`, and `start` is ignored. It lets Mongo use the `_id` index to
+        seek directly to the page instead of walking all the skipped documents.
+        The total count is not narrowed down by `after`.
+        """
         cursor, total_count = cls._get_cursor_and_count(
             mongo_userform_id,
             fields=fields,
@@ -146,9 +179,17 @@ class MongoHelper:
             submission_ids=submission_ids,
             permission_filters=permission_filters,
             skip_count=skip_count,
+            after=after,
+            count_strategy=count_strategy,
+            submission_count=submission_count,
         )
 
-        cursor.skip(start)
+        if after is not None:
+            # Keyset pagination relies on a stable sort on `_id`
+            sort = {'_id': 1}
+        else:
+            cursor.skip(start)
+
         if limit is not None:
             cursor.limit(limit)
 
@@ -159,10 +200,134 @@ class MongoHelper:
             cursor.sort(sort_key, sort_dir)
 
         # set batch size
-        cursor.batch_size = cls.DEFAULT_BATCHSIZE
+        cursor.batch_size(cls.DEFAULT_BATCHSIZE)
 
         return cursor, total_count
 
+    @classmethod
+    def get_value_counts(
+        cls,
+        mongo_userform_id: str,
+        fields: list,
+        permission_filters: Optional[list] = None,
+        version_id: Optional[str] = None,
+        submissions_modified_since: Optional[Callable[..., bool]] = None,
+    ) -> dict[str, list[tuple]]:
+        """
+        Count how many matching instances have each value of `fields`.
+        Instances without a value are counted under `None`.
+
+        Return a list of (value, count) pairs for each field, e.g.:
+            {
+                'q1': [('yes', 12), ('no', 3), (None, 1)],
+                'group/q2': [('42', 15), (None, 1)],
+            }
+
+        If `version_id` (i.e. the deployed version of the form) is provided,
+        counts are cached per version, permission filters and fields, along
+        with the greatest `_id` they cover. Next calls only count the
+        instances added since and fold them in. Cached counts are discarded
+        by `invalidate_cached_counts()`, i.e. when instances are edited or
+        deleted through KPI, or when the number of instances they cover has
+        changed meanwhile (e.g. deleted outside of KPI).
+
+        Instances can also be edited outside of KPI (e.g. with Enketo through
+        KoBoCAT). `submissions_modified_since` (usually the method of the
+        deployment back end of the same name) is called with the date the
+        cached counts have been computed and the greatest `_id` they cover
+        (`until_submission_id`). If it returns `True`, counts are discarded as
+        well.
+        """
+        if not fields:
+            return {}
+
+        query = {cls.USERFORM_ID: mongo_userform_id}
+        if permission_filters is not None:
+            query = cls.get_permission_filters_query(query, permission_filters)
+        query = cls.to_safe_dict(query, reading=True)
+
+        if version_id is None:
+            value_counts, _, _ = cls._aggregate_value_counts(query, fields)
+            return value_counts
+
+        cache_key = cls._get_value_counts_cache_key(
+            mongo_userform_id, query, fields, version_id
+        )
+        cached = cache.get(cache_key)
+        # Take the date before counting: instances edited while counting are
+        # counted again on next call
+        date_computed = timezone.now()
+        if cached is not None and (
+            cached['count'] != cls._count_documents(
+                {
+                    cls.AND_OPERATOR: [
+                        query,
+                        {'_id': {'$lte': cached['last_id']}},
+                    ]
+                }
+            )
+            or (
+                submissions_modified_since is not None
+                and submissions_modified_since(
+                    cached['date_computed'],
+                    until_submission_id=cached['last_id'],
+                )
+            )
+        ):
+            cached = None
+
+        if cached is None:
+            value_counts, count, last_id = cls._aggregate_value_counts(
+                query, fields
+            )
+            if last_id is not None:
+                cache.set(
+                    cache_key,
+                    {
+                        'value_counts': value_counts,
+                        'count': count,
+                        'last_id': last_id,
+                        'date_computed': date_computed,
+                    },
+                    settings.REPORTS_STATS_CACHE_TIMEOUT,
+                )
+            return value_counts
+
+        new_value_counts, count, last_id = cls._aggregate_value_counts(
+            query, fields, after=cached['last_id']
+        )
+        if last_id is None:
+            return cached['value_counts']
+
+        # Values met for the first time are appended, thus values remain
+        # sorted by the first instance they appear in. Values are serialized
+        # to be used as keys because some of them are not hashable (e.g.
+        # repeat groups).
+        value_counts = {}
+        for field in fields:
+            counts = {}
+            for value, value_count in (
+                cached['value_counts'][field] + new_value_counts[field]
+            ):
+                key = json_util.dumps(value)
+                if key in counts:
+                    counts[key] = (value, counts[key][1] + value_count)
+                else:
+                    counts[key] = (value, value_count)
+            value_counts[field] = list(counts.values())
+
+        cache.set(
+            cache_key,
+            {
+                'value_counts': value_counts,
+                'count': cached['count'] + count,
+                'last_id': last_id,
+                'date_computed': date_computed,
+            },
+            settings.REPORTS_STATS_CACHE_TIMEOUT,
+        )
+        return value_counts
+
     @staticmethod
     def get_max_time_ms():
         """
@@ -174,6 +339,18 @@ class MongoHelper:
             max_time_secs = settings.MONGO_QUERY_TIMEOUT
         return max_time_secs * 1000
 
+    @classmethod
+    def invalidate_cached_counts(cls, mongo_userform_id: str):
+        """
+        Discard all counts cached for `mongo_userform_id` by moving to a new
+        version. Old entries simply expire.
+        """
+        cache.set(
+            cls._get_count_cache_version_key(mongo_userform_id),
+            uuid.uuid4().hex,
+            None,
+        )
+
     @classmethod
     def is_attribute_invalid(cls, key: str) -> str:
         """
@@ -345,7 +522,25 @@ class MongoHelper:
         submission_ids: Optional[list] = None,
         permission_filters=None,
         skip_count=False,
+        after: Optional[int] = None,
+        count_strategy: str = SUBMISSION_COUNT_EXACT,
+        submission_count: Optional[int] = None,
     ):
+        """
+        Return a cursor on matching instances and their total count.
+
+        `count_strategy` can be:
+        - 'exact': count matching instances
+        - 'cached': same as 'exact' but the result is kept in cache per query
+          until submissions are altered through KPI, `submission_count` (i.e.
+          the total number of instances of the form, as known by the
+          deployment back end) changes or
+          `settings.SUBMISSION_COUNT_CACHE_TIMEOUT` is reached
+        - 'estimated' or 'none': do not count instances, `None` is returned.
+          The caller is responsible for providing the estimation.
+
+        `skip_count=True` is an alias of `count_strategy='none'`.
+        """
         if query is None:
             query = {}
 
@@ -372,16 +567,152 @@ class MongoHelper:
             # Retrieve all fields except `cls.USERFORM_ID`
             fields_to_select = {cls.USERFORM_ID: 0}
 
+        find_query = query
+        if after is not None:
+            find_query = {
+                cls.AND_OPERATOR: [query, {'_id': {cls.GT_OPERATOR: after}}]
+            }
+
         cursor = settings.MONGO_DB.instances.find(
-            query, fields_to_select, max_time_ms=cls.get_max_time_ms()
+            find_query, fields_to_select, max_time_ms=cls.get_max_time_ms()
         )
         count = None
-        if not skip_count:
-            count = settings.MONGO_DB.instances.count_documents(
-                query, maxTimeMS=cls.get_max_time_ms()
+        if skip_count or count_strategy in (
+            SUBMISSION_COUNT_ESTIMATED,
+            SUBMISSION_COUNT_NONE,
+        ):
+            return cursor, count
+
+        if count_strategy == SUBMISSION_COUNT_CACHED:
+            count = cls._get_cached_count(
+                mongo_userform_id, query, submission_count
             )
+        else:
+            count = cls._count_documents(query)
+
         return cursor, count
 
+    @classmethod
+    def _count_documents(cls, query: dict) -> int:
+        return settings.MONGO_DB.instances.count_documents(
+            query, maxTimeMS=cls.get_max_time_ms()
+        )
+
+    @classmethod
+    def _get_cached_count(
+        cls,
+        mongo_userform_id: str,
+        query: dict,
+        submission_count: Optional[int] = None,
+    ) -> int:
+        version = cache.get(
+            cls._get_count_cache_version_key(mongo_userform_id)
+        )
+        if version is None:
+            # Nothing has been cached for this form yet
+            version = ''
+        query_hash = hashlib.md5(
+            json_util.dumps(query, sort_keys=True).encode()
+        ).hexdigest()
+        # New submissions are mostly received by KoBoCAT, which does not
+        # invalidate cached counts. Keying counts on the total number of
+        # submissions of the form discards them as soon as a new submission
+        # comes in (or one is deleted).
+        cache_key = (
+            f'{cls.COUNT_CACHE_KEY_PREFIX}:{mongo_userform_id}:{version}:'
+            f'{submission_count}:{query_hash}'
+        )
+        count = cache.get(cache_key)
+        if count is None:
+            count = cls._count_documents(query)
+            cache.set(
+                cache_key, count, settings.SUBMISSION_COUNT_CACHE_TIMEOUT
+            )
+        return count
+
+    @classmethod
+    def _aggregate_value_counts(
+        cls, query: dict, fields: list, after: Optional[int] = None
+    ) -> tuple[dict[str, list[tuple]], int, Optional[int]]:
+        """
+        Count, with one aggregation, the values of `fields` among instances
+        matching `query` (and whose `_id` is greater than `after`, if
+        provided).
+
+        Return the counts, the number of instances and their greatest `_id`.
+        """
+        if after is not None:
+            query = {
+                cls.AND_OPERATOR: [query, {'_id': {cls.GT_OPERATOR: after}}]
+            }
+
+        # Each instance is unwound into one (field alias, value) pair per
+        # field. Aliases are used instead of field names because the latter
+        # could contain characters Mongo does not allow in keys.
+        # Values are sorted by the first instance they appear in, i.e. in the
+        # order they would be met while iterating over the instances.
+        aliases = {f'f{index}': field for index, field in enumerate(fields)}
+        pipeline = [
+            {'$match': query},
+            {
+                '$project': {
+                    'values': {
+                        alias: {'$ifNull': [f'${cls.encode(field)}', None]}
+                        for alias, field in aliases.items()
+                    },
+                }
+            },
+            {'$project': {'pairs': {'$objectToArray': '$values'}}},
+            {'$unwind': '$pairs'},
+            {
+                '$group': {
+                    '_id': {'k': '$pairs.k', 'v': '$pairs.v'},
+                    'count': {'$sum': 1},
+                    'first_id': {'$min': '$_id'},
+                    'last_id': {'$max': '$_id'},
+                }
+            },
+            {'$sort': {'first_id': 1}},
+        ]
+        value_counts = {field: [] for field in fields}
+        last_id = None
+        for result in settings.MONGO_DB.instances.aggregate(
+            pipeline, allowDiskUse=True, maxTimeMS=cls.get_max_time_ms()
+        ):
+            field = aliases[result['_id']['k']]
+            value_counts[field].append(
+                (result['_id'].get('v'), result['count'])
+            )
+            if last_id is None or result['last_id'] > last_id:
+                last_id = result['last_id']
+
+        # Every instance has exactly one value (or `None`) per field
+        count = sum(
+            value_count for _, value_count in value_counts[fields[0]]
+        )
+        return value_counts, count, last_id
+
+    @classmethod
+    def _get_count_cache_version_key(cls, mongo_userform_id: str) -> str:
+        return f'{cls.COUNT_CACHE_KEY_PREFIX}:{mongo_userform_id}:version'
+
+    @classmethod
+    def _get_value_counts_cache_key(
+        cls, mongo_userform_id: str, query: dict, fields: list, version_id: str
+    ) -> str:
+        version = cache.get(
+            cls._get_count_cache_version_key(mongo_userform_id)
+        )
+        if version is None:
+            version = ''
+        query_hash = hashlib.md5(
+            json_util.dumps([query, fields], sort_keys=True).encode()
+        ).hexdigest()
+        return (
+            f'{cls.VALUE_COUNTS_CACHE_KEY_PREFIX}:{mongo_userform_id}:'
+            f'{version}:{version_id}:{query_hash}'
+        )
+
     @classmethod
     def _is_attribute_encoded(cls, key):
         """
@@ -1,21 +1,48 @@
 # coding: utf-8
 from collections import defaultdict
-from typing import Union
+from typing import Iterable, Optional, Tuple, Union
 
 import django.dispatch
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import User, Permission, AnonymousUser
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
 from django.db import models
 from django.shortcuts import _get_queryset
 from django_request_cache import cache_for_request
 from rest_framework import serializers
 
 from kpi.constants import PERM_MANAGE_ASSET, PERM_FROM_KC_ONLY
+from kpi.utils.cache import bump_versions, get_versions
 from kpi.utils.permissions import is_user_anonymous
 
 
+def bump_object_permissions_version(
+    asset_ids: Iterable[int], user_ids: Iterable[int] = ()
+):
+    """
+    Give a new version to the object permissions of `asset_ids`, making their
+    entries in the shared cache obsolete (see
+    `get_cached_object_permissions()`). Likewise, give a new version to the
+    accessible assets of `user_ids` (see `get_cached_accessible_asset_ids()`).
+
+    Nothing is written when the caches relying on these versions are
+    disabled (see `bump_versions()`).
+    """
+    versions_keys = []
+    if settings.OBJECT_PERMISSION_CACHE_ENABLED:
+        versions_keys.extend(
+            _get_object_permissions_version_key(asset_id)
+            for asset_id in asset_ids
+        )
+    if _is_accessible_assets_version_used():
+        versions_keys.extend(
+            get_accessible_assets_version_key(user_id) for user_id in user_ids
+        )
+    bump_versions(versions_keys)
+
+
 def get_all_objects_for_user(user, klass):
     """
     Return all objects of type klass to which user has been assigned any
@@ -62,6 +89,88 @@ def get_cached_code_names(model_: models.Model = None) -> dict:
     return perm_ids_from_code_names
 
 
+def get_accessible_assets_version_key(user_id: int) -> str:
+    """
+    Return the key of the version of the assets `user_id` can list (see
+    `get_cached_accessible_asset_ids()`), which is also part of the version
+    of data computed from these assets (see `get_assets_version()`).
+    """
+    return f'accessible_assets_version:{user_id}'
+
+
+def get_cached_accessible_asset_ids(user_id: int) -> Tuple[dict, str]:
+    """
+    Retrieve the ids of the assets `user_id` owns, has been granted access
+    to, or has subscribed to, from the shared cache. Public assets are
+    cached apart (see `get_cached_public_asset_ids()`).
+
+    Returns a tuple of:
+        - the asset ids, or `None` if they are not cached
+        - the current version of the assets of `user_id`, which must be
+          passed to `set_cached_accessible_asset_ids()` once they have been
+          fetched from the DB.
+    """
+    version = _get_accessible_assets_versions([user_id])[user_id]
+    asset_ids = _get_object_permissions_cache().get(
+        _get_accessible_assets_key(user_id, version)
+    )
+    return asset_ids, version
+
+
+def get_cached_public_asset_ids() -> Tuple[dict, str]:
+    """
+    Retrieve the ids of the public assets from the shared cache. They are
+    versioned with the version of the anonymous user.
+
+    Returns a tuple like `get_cached_accessible_asset_ids()`. The version
+    must be passed to `set_cached_public_asset_ids()`.
+    """
+    anonymous_user_id = settings.ANONYMOUS_USER_ID
+    version = _get_accessible_assets_versions([anonymous_user_id])[
+        anonymous_user_id
+    ]
+    asset_ids = _get_object_permissions_cache().get(
+        _get_public_assets_key(version)
+    )
+    return asset_ids, version
+
+
+def get_cached_object_permissions(
+    asset_ids: list, user_id: Optional[int] = None
+) -> Tuple[dict, dict]:
+    """
+    Retrieve object permissions of `asset_ids` from the shared cache. Only
+    the permissions of `user_id` are retrieved, if provided.
+
+    Returns a tuple of two dictionaries keyed by asset ids:
+        - the object permissions found in cache
+        - the current versions of object permissions of all `asset_ids`,
+          which must be passed to `set_cached_object_permissions()` for the
+          ones which have been fetched from the DB.
+    """
+    versions_keys = {
+        asset_id: _get_object_permissions_version_key(asset_id)
+        for asset_id in asset_ids
+    }
+    cached_versions = get_versions(versions_keys.values())
+    versions = {
+        asset_id: cached_versions[version_key]
+        for asset_id, version_key in versions_keys.items()
+    }
+
+    entries_keys = {
+        _get_object_permissions_key(asset_id, version, user_id): asset_id
+        for asset_id, version in versions.items()
+    }
+    cached_entries = _get_object_permissions_cache().get_many(
+        entries_keys.keys()
+    )
+    object_permissions = {
+        entries_keys[key]: value for key, value in cached_entries.items()
+    }
+    return object_permissions, versions
+
+
 @cache_for_request
 def get_anonymous_user():
     """ Return a real User in the database to represent AnonymousUser. """
@@ -285,5 +394,100 @@ def perm_parse(perm, obj=None):
     return app_label, codename
 
 
+def set_cached_accessible_asset_ids(
+    user_id: int, version: str, asset_ids: dict
+):
+    """
+    Store the ids of the assets of `user_id` in the shared cache, with the
+    version returned by `get_cached_accessible_asset_ids()` before they have
+    been fetched from the DB.
+    """
+    _get_object_permissions_cache().set(
+        _get_accessible_assets_key(user_id, version),
+        asset_ids,
+        timeout=settings.OBJECT_PERMISSION_CACHE_TIMEOUT,
+    )
+
+
+def set_cached_public_asset_ids(version: str, asset_ids: dict):
+    """
+    Store the ids of the public assets in the shared cache, with the version
+    returned by `get_cached_public_asset_ids()` before they have been fetched
+    from the DB.
+    """
+    _get_object_permissions_cache().set(
+        _get_public_assets_key(version),
+        asset_ids,
+        timeout=settings.OBJECT_PERMISSION_CACHE_TIMEOUT,
+    )
+
+
+def set_cached_object_permissions(
+    object_permissions: dict, versions: dict, user_id: Optional[int] = None
+):
+    """
+    Store object permissions (keyed by asset ids) in the shared cache, with
+    the versions returned by `get_cached_object_permissions()` before they
+    have been fetched from the DB. `user_id` must be the same as well.
+    """
+    _get_object_permissions_cache().set_many(
+        {
+            _get_object_permissions_key(
+                asset_id, versions[asset_id], user_id
+            ): value
+            for asset_id, value in object_permissions.items()
+        },
+        timeout=settings.OBJECT_PERMISSION_CACHE_TIMEOUT,
+    )
+
+
+def _get_accessible_assets_key(user_id: int, version: str) -> str:
+    return f'user_assets:{user_id}:{version}'
+
+
+def _get_accessible_assets_versions(user_ids: Iterable[int]) -> dict:
+    versions_keys = {
+        user_id: get_accessible_assets_version_key(user_id)
+        for user_id in user_ids
+    }
+    versions = get_versions(versions_keys.values())
+    return {
+        user_id: versions[version_key]
+        for user_id, version_key in versions_keys.items()
+    }
+
+
+def _is_accessible_assets_version_used() -> bool:
+    """
+    Return whether any cache relies on the versions of accessible assets (see
+    `get_cached_accessible_asset_ids()` and `get_assets_version()`).
+    """
+    return bool(
+        settings.ACCESSIBLE_ASSETS_CACHE_ENABLED
+        or settings.ASSET_METADATA_CACHE_TIMEOUT
+        or settings.ASSET_HASH_CACHE_TIMEOUT
+    )
+
+
+def _get_object_permissions_cache():
+    return caches[settings.OBJECT_PERMISSION_CACHE_ALIAS]
+
+
+def _get_object_permissions_key(
+    asset_id: int, version: str, user_id: Optional[int] = None
+) -> str:
+    if user_id is None:
+        return f'object_permissions:{asset_id}:{version}'
+    return f'object_permissions:{asset_id}:{version}:{user_id}'
+
+
+def _get_public_assets_key(version: str) -> str:
+    return f'public_assets:{version}'
+
+
+def _get_object_permissions_version_key(asset_id: int) -> str:
+    return f'object_permissions_version:{asset_id}'
+
+
 post_assign_perm = django.dispatch.Signal()
 post_remove_perm = django.dispatch.Signal()
@@ -1,13 +1,38 @@
 import os
 import shutil
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, Iterator, Optional
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage, FileSystemStorage
+from storages.backends.azure_storage import AzureStorage
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+# Maximum number of keys S3 `DeleteObjects` accepts per request
+S3_DELETE_BATCH_SIZE = 1000
+# Maximum number of sub-requests of an Azure batch request
+AZURE_DELETE_BATCH_SIZE = 256
+
+RMDIR_PROGRESS_CACHE_KEY_PREFIX = 'storage_rmdir_progress'
+RMDIR_PROGRESS_CACHE_TIMEOUT = 7 * 24 * 60 * 60
 
 
 def rmdir(directory: str):
     """
     Delete `directory` (and recursively all files and folders inside it).
     `directory` location must be relative to default storage.
+
+    On S3 and Azure, objects are listed by prefix and deleted by batches, with
+    up to `settings.STORAGE_BULK_DELETE_MAX_WORKERS` batches at the same time.
+    The last key of the batches deleted so far is kept in cache, thus a new
+    call after a failure resumes where the previous one stopped.
     """
     def _recursive_delete(path):
         directories, files = default_storage.listdir(path)
@@ -19,5 +44,133 @@ def rmdir(directory: str):
     if isinstance(default_storage, FileSystemStorage):
         if default_storage.exists(directory):
             shutil.rmtree(default_storage.path(directory))
+    elif isinstance(default_storage, S3Boto3Storage):
+        prefix = default_storage._normalize_name(clean_name(directory))
+        _bulk_delete(
+            prefix.rstrip('/') + '/',
+            _list_s3_keys,
+            _delete_s3_keys,
+            S3_DELETE_BATCH_SIZE,
+        )
+    elif isinstance(default_storage, AzureStorage):
+        prefix = default_storage._get_valid_path(directory)
+        _bulk_delete(
+            prefix + '/',
+            _list_azure_blobs,
+            _delete_azure_blobs,
+            AZURE_DELETE_BATCH_SIZE,
+        )
     else:
         _recursive_delete(directory)
+
+
+def _bulk_delete(
+    prefix: str,
+    list_keys: Callable[[str, Optional[str]], Iterator[str]],
+    delete_keys: Callable[[list], None],
+    batch_size: int,
+):
+    """
+    Delete all keys starting with `prefix`, `batch_size` keys at a time.
+
+    Keys are listed in lexicographical order, thus the last key of the
+    batches which have all been deleted so far is saved as a checkpoint.
+    Listing restarts after this key on next call.
+    """
+    cache_key = f'{RMDIR_PROGRESS_CACHE_KEY_PREFIX}:{prefix}'
+    start_after = cache.get(cache_key)
+    max_workers = settings.STORAGE_BULK_DELETE_MAX_WORKERS
+
+    def _batches():
+        batch = []
+        for key in list_keys(prefix, start_after):
+            batch.append(key)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Batches may complete in any order. The checkpoint only moves forward
+        # when all the preceding batches are deleted as well.
+        pending = {}
+        last_keys = []
+        completed = set()
+        checkpoint_index = -1
+
+        def _wait(return_when):
+            nonlocal checkpoint_index
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                # Raise the error, if any. Pending batches are still deleted
+                # before the executor shuts down.
+                future.result()
+                completed.add(pending.pop(future))
+
+            previous_checkpoint_index = checkpoint_index
+            while checkpoint_index + 1 in completed:
+                checkpoint_index += 1
+                completed.remove(checkpoint_index)
+            if checkpoint_index != previous_checkpoint_index:
+                cache.set(
+                    cache_key,
+                    last_keys[checkpoint_index],
+                    RMDIR_PROGRESS_CACHE_TIMEOUT,
+                )
+
+        for index, batch in enumerate(_batches()):
+            last_keys.append(batch[-1])
+            pending[executor.submit(delete_keys, batch)] = index
+            if len(pending) >= max_workers:
+                _wait(FIRST_COMPLETED)
+
+        if pending:
+            _wait(ALL_COMPLETED)
+
+    cache.delete(cache_key)
+
+
+def _delete_azure_blobs(names: list):
+    default_storage.client.delete_blobs(
+        *names, raise_on_any_failure=True, timeout=default_storage.timeout
+    )
+
+
+def _delete_s3_keys(keys: list):
+    # `connection` is local to each thread
+    response = default_storage.connection.meta.client.delete_objects(
+        Bucket=default_storage.bucket_name,
+        Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+    )
+    if errors := response.get('Errors'):
+        raise Exception(
+            f'Could not delete {len(errors)} objects, e.g. '
+            f'`{errors[0]["Key"]}`: {errors[0]["Message"]}'
+        )
+
+
+def _list_azure_blobs(
+    prefix: str, start_after: Optional[str] = None
+) -> Iterator[str]:
+    # Azure cannot start listing after a given name, but deleted blobs are not
+    # listed anymore anyway
+    for blob in default_storage.client.list_blobs(
+        name_starts_with=prefix, timeout=default_storage.timeout
+    ):
+        if start_after is None or blob.name > start_after:
+            yield blob.name
+
+
+def _list_s3_keys(
+    prefix: str, start_after: Optional[str] = None
+) -> Iterator[str]:
+    paginator = default_storage.connection.meta.client.get_paginator(
+        'list_objects_v2'
+    )
+    params = {'Bucket': default_storage.bucket_name, 'Prefix': prefix}
+    if start_after:
+        params['StartAfter'] = start_after
+    for page in paginator.paginate(**params):
+        for obj in page.get('Contents', []):
+            yield obj['Key']
@@ -2,15 +2,15 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+from io import BytesIO
 from typing import Optional, Union
 from xml.dom import Node
 
 from defusedxml import minidom
 from django.db.models import F, Q
 from django.db.models.query import QuerySet
-from django_request_cache import cache_for_request
 from lxml import etree
-from shortuuid import ShortUUID
 
 from kobo.apps.form_disclaimer.models import FormDisclaimer
 
@@ -129,145 +129,154 @@ def get_or_create_element(
     return el
 
 
+class NodeSelector:
+    """
+    Compiled version of the `nodes_to_keep` argument of `strip_nodes()`.
+
+    With `use_xpath=True`, `nodes_to_keep` is turned into a trie of tag
+    names, e.g. `['group/q1', 'group/q2', 'q3']` becomes
+    `{'group': {'q1': KEEP, 'q2': KEEP}, 'q3': KEEP}`. Otherwise, nodes are
+    matched by their tag name wherever they are in the document.
+
+    Selecting the children of a node only requires the state of its parent
+    (see `select()`), thus full XPaths never have to be computed.
+    """
+
+    # The node and all its descendants are kept
+    KEEP = 'keep'
+
+    def __init__(self, nodes_to_keep: list, use_xpath: bool = False):
+        self._use_xpath = use_xpath
+        if not use_xpath:
+            self._names = frozenset(nodes_to_keep)
+            self.root = self._names
+            return
+
+        self.root = {}
+        for xpath in nodes_to_keep:
+            trie = self.root
+            *ancestors, name = xpath.strip('/').split('/')
+            for ancestor in ancestors:
+                trie = trie.setdefault(ancestor, {})
+                if trie == self.KEEP:
+                    break
+            else:
+                trie[name] = self.KEEP
+
+    def select(
+        self, parent_state: Union[dict, frozenset, str, None], tag: str
+    ) -> Union[dict, frozenset, str, None]:
+        """
+        Return the state of a node named `tag` whose parent is in
+        `parent_state`:
+        - `KEEP` if the node must be kept with all its descendants
+        - `None` if the node must be removed with all its descendants
+        - anything else if the node must be kept only if one of its
+          descendants is kept
+        """
+        if parent_state is None or parent_state == self.KEEP:
+            return parent_state
+
+        if self._use_xpath:
+            return parent_state.get(tag)
+
+        return self.KEEP if tag in self._names else parent_state
+
+    def select_root(self, tag: str) -> Union[dict, frozenset, str]:
+        if self._use_xpath:
+            # XPaths are relative to the root node
+            return self.root
+        return self.select(self.root, tag)
+
+
+@lru_cache(maxsize=128)
+def get_node_selector(
+    nodes_to_keep: tuple, use_xpath: bool = False
+) -> NodeSelector:
+    return NodeSelector(list(nodes_to_keep), use_xpath=use_xpath)
+
+
 def strip_nodes(
     source: Union[str, bytes],
     nodes_to_keep: list,
     use_xpath: bool = False,
     xml_declaration: bool = False,
     rename_root_node_to: Optional[str] = None,
-    bulk_action_cache_key: str = None,
 ) -> str:
     """
     Returns a stripped version of `source`. It keeps only nodes provided in
-    `nodes_to_keep`.
+    `nodes_to_keep` (and their ancestors). Nodes are matched by their name,
+    or by their XPath relative to the root node if `use_xpath` is True.
     If `rename_root_node_to` is provided, the root node will be renamed to the
     value of that parameter in the returned XML string.
 
-    A random string can be passed to `bulk_action_cache_key` to get the
-    XPaths only once if calling `strip_nodes()` several times in a loop.
+    `nodes_to_keep` is compiled only once (see `NodeSelector`), so it is cheap
+    to call `strip_nodes()` several times in a loop with the same list.
+
+    For example:
+    With `nodes_to_keep = ['question_2', 'question_3']` and this XML:
+    <root>
+      <group>
+          <question_1>Value1</question_1>
+          <question_2>Value2</question_2>
+      </group>
+      <question_3>Value3</question_3>
+    </root>
+
+    Results:
+    <root>
+      <group>
+          <question_2>Value2</question_2>
+      </group>
+      <question_3>Value3</question_3>
+    </root>
     """
     # Force `source` to be bytes in case it contains an XML declaration
     # `etree` does not support strings with xml declarations.
     if isinstance(source, str):
         source = source.encode()
 
-    # Build xml to be parsed
-    xml_doc = etree.fromstring(source)
-    tree = etree.ElementTree(xml_doc)
-    root_element = tree.getroot()
-    root_path = tree.getpath(root_element)
-
-    # `@cache_for_request` uses the parameters of the function it decorates
-    # to generate the key under which the returned value of the function is
-    # stored for cache purpose.
-    # `cache_key` is only there to serve that purpose and ensure
-    # `@cache_for_request` uniqueness.
-    @cache_for_request
-    def get_xpath_matches(cache_key: str):
-        if use_xpath:
-            xpaths_ = []
-            for xpath_ in nodes_to_keep:
-                xpaths_.append(f"/{xpath_.strip('/')}/")
-            return xpaths_
-
-        xpath_matches = []
-        # Retrieve XPaths of all nodes we need to keep
-        for node_to_keep in nodes_to_keep:
-            for node in tree.iter(node_to_keep):
-                xpath_match = remove_root_path(tree.getpath(node))
-                # To make a difference between XPaths with same beginning
-                # string, we need to add a trailing slash for later comparison
-                # in `process_node()`.
-                # For example, `subgroup1` would match both `subgroup1/` and
-                # `subgroup11/`, but `subgroup1/` correctly excludes
-                # `subgroup11/`
-                xpath_matches.append(f'{xpath_match}/')
-
-        return xpath_matches
-
-    def process_node(node_: etree._Element, xpath_matches_: list):
-        """
-        `process_node()` is a recursive function.
-
-        First, it loops through all children of the root element.
-        Then for each child, it loops through its children if any, etc...
-        When all children are processed, it checks whether the node should be
-        removed or not.
-
-        The most nested children are processed first in order to know which
-        parents must be kept.
-
-        For example:
-        With `nodes_to_keep = ['question_2', 'question_3']` and this XML:
-        <root>
-          <group>
-              <question_1>Value1</question_1>
-              <question_2>Value2</question_2>
-          </group>
-          <question_3>Value3</question_3>
-        </root>
-
-         Nodes are processed in this order:
-         - `<question_1>`: Removed because not in `nodes_to_keep`
-
-         - `<question_2>`: Kept. Parent node `<group>` is tagged `do_not_delete`
-
-         - `<group>`: Kept even if it is not in `nodes_to_keep` because
-                      it is tagged `do_not_delete` by its child `<question_2>`
-
-         - `<question_3>`: Kept.
-
-        Results:
-        <root>
-          <group>
-              <question_2>Value2</question1>
-          </group>
-          <question3>Value3</question3>
-        </root>
-        """
-        for child in node_.getchildren():
-            process_node(child, xpath_matches_)
-
-        # Get XPath of current node
-        node_xpath = remove_root_path(tree.getpath(node_))
-
-        # If `node_path` does not start with one of the occurrences previously
-        # found, it must be removed.
-        if (
-            not f'{node_xpath}/'.startswith(tuple(xpath_matches_))
-            and node_.get('do_not_delete') != 'true'
+    if not len(nodes_to_keep):
+        root_element = etree.fromstring(source)
+    else:
+        selector = get_node_selector(tuple(nodes_to_keep), use_xpath)
+        root_element = None
+        # States of the ancestors of the node being parsed, and of the node
+        # itself
+        states = []
+        # Nodes are processed on `end` events, i.e. once all their children
+        # are processed, in order to know which parents must be kept.
+        for event, node in etree.iterparse(
+            BytesIO(source), events=('start', 'end')
         ):
-            if node_ != root_element:
-                node_.getparent().remove(node_)
-        elif node_xpath != '':
-            # node matches, keep its parent too.
-            node_.getparent().set('do_not_delete', 'true')
-
-        # All children have been processed and `node_` seems to be a parent we
-        # need to keep. Remove `do_not_delete` flag to avoid rendering it in
-        # final xml
-        if node_.attrib.get('do_not_delete'):
-            del node_.attrib['do_not_delete']
-
-    def remove_root_path(path_: str) -> str:
-        return path_.replace(root_path, '')
-
-    if len(nodes_to_keep):
-        # Always sends an unique string to `get_xpath_matches()`
-        # See comments above the function
-        if bulk_action_cache_key is None:
-            cache_key = ShortUUID().random(24)
-        else:
-            cache_key = bulk_action_cache_key
-
-        xpath_matches = get_xpath_matches(cache_key=cache_key)
-        process_node(root_element, xpath_matches)
+            if event == 'start':
+                tag = etree.QName(node).localname
+                if root_element is None:
+                    root_element = node
+                    states.append(selector.select_root(tag))
+                else:
+                    states.append(selector.select(states[-1], tag))
+                continue
+
+            state = states.pop()
+            if node is root_element or state == selector.KEEP:
+                continue
+
+            parent_state = states[-1]
+            if state is None:
+                # Only the topmost node of a removed branch needs to be
+                # detached
+                if parent_state is not None:
+                    node.getparent().remove(node)
+            elif not len(node):
+                # None of its descendants has been kept
+                node.getparent().remove(node)
 
     if rename_root_node_to:
-        tree.getroot().tag = rename_root_node_to
+        root_element.tag = rename_root_node_to
 
     return etree.tostring(
-        tree,
+        etree.ElementTree(root_element),
         pretty_print=True,
         encoding='utf-8',
         xml_declaration=xml_declaration,
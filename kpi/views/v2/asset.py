@@ -1,12 +1,24 @@
 # coding: utf-8
 import copy
 import json
-from collections import defaultdict, OrderedDict
+from collections import defaultdict
 from operator import itemgetter
 
-from django.db.models import Count
-from django.http import Http404
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    CharField,
+    Count,
+    Func,
+    JSONField,
+    OuterRef,
+    QuerySet,
+    Subquery,
+)
+from django.db.models.fields.json import KeyTransform
+from django.http import Http404, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from rest_framework import exceptions, renderers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -22,6 +34,7 @@ from kpi.constants import (
     CLONE_FROM_VERSION_ID_ARG_NAME,
 )
 from kpi.deployment_backends.backends import DEPLOYMENT_BACKENDS
+from kpi.deployment_backends.kobocat_backend import KobocatDeploymentBackend
 from kpi.exceptions import (
     BadAssetTypeException,
 )
@@ -33,6 +46,7 @@ from kpi.filters import (
 from kpi.highlighters import highlight_xform
 from kpi.models import (
     Asset,
+    AssetVersion,
     UserAssetSubscription,
 )
 from kpi.mixins.object_permission import ObjectPermissionViewSetMixin
@@ -55,6 +69,7 @@ from kpi.serializers.v2.asset import (
     AssetListSerializer,
     AssetSerializer,
 )
+from kpi.utils.cache import get_assets_version
 from kpi.utils.hash import calculate_hash
 from kpi.serializers.v2.reports import ReportsDetailSerializer
 from kpi.utils.kobo_to_xlsform import to_xlsform_structure
@@ -553,74 +568,115 @@ class AssetViewSet(
         Prepare metadata to inject in list endpoint.
         Useful to retrieve values needed for search
 
+        Metadata are cached for `ASSET_METADATA_CACHE_TIMEOUT` seconds per
+        user and query string. Any change on assets or on the permissions of
+        the user makes them obsolete.
+
         :return: dict
         """
-        metadata = {
-            'languages': set(),
-            'countries': OrderedDict(),
-            'sectors': OrderedDict(),
-            'organizations': set(),
-        }
+        if not settings.ASSET_METADATA_CACHE_TIMEOUT:
+            return self._get_metadata_from_db(queryset)
+
+        cache_key = self._get_metadata_cache_key()
+        if (metadata := cache.get(cache_key)) is None:
+            metadata = self._get_metadata_from_db(queryset)
+            cache.set(
+                cache_key,
+                metadata,
+                timeout=settings.ASSET_METADATA_CACHE_TIMEOUT,
+            )
+        return metadata
 
-        records = queryset.values('summary', 'settings').exclude(
-            summary__languages=[],
-            settings__country_codes=[],
-            settings__sector={},
-            settings__organization='',
+    def _get_metadata_cache_key(self) -> str:
+        user_id = get_database_user(self.request.user).pk
+        # Neither pagination nor ordering alter metadata
+        ignored_params = ['format', 'limit', 'metadata', 'offset', 'ordering']
+        query_params = sorted(
+            (key, value)
+            for key, values in self.request.query_params.lists()
+            if key not in ignored_params
+            for value in values
+        )
+        query_hash = calculate_hash(
+            json.dumps([self.kwargs, query_params], sort_keys=True)
+        )
+        return (
+            f'asset_metadata:{user_id}:{query_hash}:'
+            f'{get_assets_version(user_id)}'
         )
 
-        # Languages
-        records = records.order_by()
-
-        for record in records.all():
-            try:
-                languages = record['summary']['languages']
-            except (ValueError, KeyError):
-                pass
-            else:
-                for language in languages:
-                    if language:
-                        metadata['languages'].add(language)
-
-            try:
-                country = record['settings']['country']
-                value = country['value']
-                label = country['label']
-            except (KeyError, TypeError):
-                pass
-            else:
-                if value and value not in metadata['countries']:
-                    metadata['countries'][value] = label
-
-            try:
-                sector = record['settings']['sector']
-                value = sector['value']
-                label = sector['label']
-            except (KeyError, TypeError):
-                pass
-            else:
-                if value and value not in metadata['sectors']:
-                    metadata['sectors'][value] = label
-
-            try:
-                organization = record['settings']['organization']
-            except KeyError:
-                pass
+    @staticmethod
+    def _get_metadata_from_db(queryset) -> dict:
+        """
+        Aggregate distinct values of languages, countries, sectors and
+        organizations of `queryset` with SQL instead of loading `summary`
+        and `settings` of each asset.
+        """
+        queryset = queryset.order_by()
+
+        def get_distinct_values(
+            field_name: str,
+            property_name: str,
+            json_type: str,
+            unnest: bool = False,
+        ) -> QuerySet:
+            json_property = KeyTransform(property_name, field_name)
+            if unnest:
+                # One row per item of the array
+                facet = Func(
+                    json_property,
+                    function='jsonb_array_elements',
+                    output_field=JSONField(),
+                )
             else:
-                if organization:
-                    metadata['organizations'].add(organization)
-
-        metadata['languages'] = sorted(list(metadata['languages']))
-
-        metadata['countries'] = sorted(metadata['countries'].items(),
-                                       key=itemgetter(1))
-
-        metadata['sectors'] = sorted(metadata['sectors'].items(),
-                                     key=itemgetter(1))
-
-        metadata['organizations'] = sorted(list(metadata['organizations']))
+                facet = json_property
+            return (
+                queryset.annotate(
+                    facet_type=Func(
+                        json_property,
+                        function='jsonb_typeof',
+                        output_field=CharField(),
+                    ),
+                    facet=facet,
+                )
+                .filter(facet_type=json_type)
+                .values_list('facet', flat=True)
+                .distinct()
+            )
 
-        return metadata
+        def get_values_and_labels(
+            property_name: str, json_type: str, unnest: bool = False
+        ) -> list:
+            values_and_labels = {}
+            for item in get_distinct_values(
+                'settings', property_name, json_type, unnest
+            ):
+                try:
+                    value = item['value']
+                    label = item['label']
+                except (KeyError, TypeError):
+                    continue
+                if value and value not in values_and_labels:
+                    values_and_labels[value] = label
+            return sorted(values_and_labels.items(), key=itemgetter(1))
+
+        languages = get_distinct_values(
+            'summary', 'languages', 'array', unnest=True
+        )
+        organizations = get_distinct_values(
+            'settings', 'organization', 'string'
+        )
+        return {
+            'languages': sorted(
+                language for language in languages if language
+            ),
+            # `settings['country']` is standardized as a list on save
+            'countries': get_values_and_labels('country', 'array', unnest=True),
+            'sectors': get_values_and_labels('sector', 'object'),
+            'organizations': sorted(
+                organization for organization in organizations if organization
+            ),
+        }
 
     def get_paginated_response(self, data, metadata=None):
         """
@@ -694,6 +750,18 @@ class AssetViewSet(
 
             context_['children_count_per_asset'] = children_count_per_asset
 
+            # 5) Get KoBoCAT XForms (e.g. submission counts) of deployed
+            # assets in current page
+            page = self.__page if self.__page is not None else []
+            context_['xforms_cache'] = KobocatDeploymentBackend.get_xforms(
+                [
+                    asset.deployment
+                    for asset in page
+                    if asset.has_deployment
+                    and isinstance(asset.deployment, KobocatDeploymentBackend)
+                ]
+            )
+
         return context_
 
     def list(self, request, *args, **kwargs):
@@ -702,6 +770,7 @@ class AssetViewSet(
         self.__filtered_queryset = self.filter_queryset(self.get_queryset())
 
         page = self.paginate_queryset(self.__filtered_queryset)
+        self.__page = page
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             metadata = None
@@ -719,35 +788,63 @@ class AssetViewSet(
         Creates an hash of `version_id` of all accessible assets by the user.
         Useful to detect changes between each request.
 
+        The hash is also sent as an `ETag` and a `304 Not Modified` response
+        is returned when it matches `If-None-Match`.
+
+        When `settings.ASSET_HASH_CACHE_TIMEOUT` is set, the hash is cached
+        per user, until the assets they can access, or one of these assets,
+        change.
+
         :param request:
         :return: JSON
         """
         user = self.request.user
         if user.is_anonymous:
             raise exceptions.NotAuthenticated()
+
+        if not settings.ASSET_HASH_CACHE_TIMEOUT:
+            hash_ = self._get_hash_from_db(user)
         else:
-            accessible_assets = (
-                get_objects_for_user(user, 'view_asset', Asset)
-                .filter(asset_type=ASSET_TYPE_SURVEY)
-                .order_by("uid")
+            cache_key = (
+                f'assets_hash:{user.pk}:{get_assets_version(user.pk)}'
             )
+            if (hash_ := cache.get(cache_key)) is None:
+                hash_ = self._get_hash_from_db(user)
+                cache.set(
+                    cache_key, hash_, timeout=settings.ASSET_HASH_CACHE_TIMEOUT
+                )
 
-            assets_version_ids = [
-                asset.version_id
-                for asset in accessible_assets
-                if asset.version_id is not None
-            ]
-            # Sort alphabetically
-            assets_version_ids.sort()
-
-            if len(assets_version_ids) > 0:
-                hash_ = calculate_hash(''.join(assets_version_ids), algorithm='md5')
-            else:
-                hash_ = ''
+        headers = {'ETag': f'"{hash_}"'} if hash_ else {}
+        if hash_ and f'"{hash_}"' in parse_etags(
+            request.headers.get('If-None-Match', '')
+        ):
+            return HttpResponseNotModified(headers=headers)
+
+        return Response({'hash': hash_}, headers=headers)
+
+    @staticmethod
+    def _get_hash_from_db(user: 'auth.User') -> str:
+        # Retrieve the latest version of each asset within the same query
+        # instead of reading `Asset.version_id` for each of them
+        latest_version_uid = (
+            AssetVersion.objects.filter(asset_id=OuterRef('pk'))
+            .order_by('-date_modified')
+            .values('uid')[:1]
+        )
+        assets_version_ids = list(
+            get_objects_for_user(user, 'view_asset', Asset)
+            .filter(asset_type=ASSET_TYPE_SURVEY)
+            .annotate(latest_version_uid=Subquery(latest_version_uid))
+            .exclude(latest_version_uid=None)
+            .order_by()
+            .values_list('latest_version_uid', flat=True)
+        )
+        # Sort alphabetically
+        assets_version_ids.sort()
 
-            return Response({
-                'hash': hash_
-            })
+        if len(assets_version_ids) > 0:
+            return calculate_hash(''.join(assets_version_ids), algorithm='md5')
+        return ''
 
     @action(detail=False, methods=['GET'],
             renderer_classes=[renderers.JSONRenderer])
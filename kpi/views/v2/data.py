@@ -2,10 +2,11 @@
 import copy
 import json
 import re
+from typing import Iterable, Union
 
 import requests
 from django.conf import settings
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.utils.translation import gettext_lazy as t
 from pymongo.errors import OperationFailure
 from rest_framework import (
@@ -33,7 +34,7 @@ from kpi.constants import (
 )
 from kpi.exceptions import ObjectDeploymentDoesNotExist
 from kpi.models import Asset
-from kpi.paginators import DataPagination
+from kpi.paginators import DataKeysetPagination, DataPagination
 from kpi.permissions import (
     DuplicateSubmissionPermission,
     EditLinkSubmissionPermission,
@@ -43,6 +44,7 @@ from kpi.permissions import (
 )
 from kpi.renderers import (
     SubmissionGeoJsonRenderer,
+    SubmissionStreamingJSONRenderer,
     SubmissionXMLRenderer,
 )
 from kpi.utils.log import logging
@@ -95,6 +97,43 @@ class DataViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
     >
     >       curl -X GET https://[kpi]/api/v2/assets/aSAvYreNzVEkrWg5Gdcvg/data/?start=0&limit=10
 
+    On projects with many submissions, deep pages are faster with keyset
+    pagination. Pass `after` instead of `start` to get submissions sorted by
+    `_id` which come right after the `_id` given in `after`. Use `after=0` to
+    get the first page, then follow the `next` link.
+    `after` cannot be combined with `start` or `sort` and is not available
+    in XML format.
+
+    > Example: The ten submissions following submission 234
+    >
+    >       curl -X GET https://[kpi]/api/v2/assets/aSAvYreNzVEkrWg5Gdcvg/data/?after=234&limit=10
+
+    Use `count_strategy` to control how the `count` property of the response
+    is computed. Counting can be slow on projects with many submissions.
+
+    * `exact` (default): count the matching submissions
+    * `estimated`: use the submission counter of the project when results are
+      not filtered, otherwise count the matching submissions
+    * `cached`: count the matching submissions and keep the result in cache for
+      a few minutes or until submissions are altered
+    * `none`: do not count submissions, `count` is `null`
+
+    > Example: Walk through all the submissions without counting them
+    >
+    >       curl -X GET https://[kpi]/api/v2/assets/aSAvYreNzVEkrWg5Gdcvg/data/?after=0&count_strategy=none
+
+    ## Streaming
+
+    Large pages of submissions can be streamed in JSON format with
+    `stream=true`. Submissions are then written one at a time instead of
+    being rendered all at once, and `next` comes after `results`.
+    If an error occurs while streaming, `results` is closed early and an
+    `error` property is added.
+
+    > Example
+    >
+    >       curl -X GET https://[kpi]/api/v2/assets/aSAvYreNzVEkrWg5Gdcvg/data.json?stream=true
+
     ## Query submitted data
     Provides a list of submitted data for a specific form. Use `query`
     parameter to apply form data specific, see
@@ -299,6 +338,29 @@ class DataViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
     "group_1/sub_group_1/.../sub_group_n/question_1": "new value"
     </pre>
 
+    When more submissions than `SUBMISSION_BULK_UPDATE_ASYNC_THRESHOLD` are
+    matched, they are updated in the background. The response status is `202`
+    and its body contains the `uid` of the job. Its progress, and the result
+    of each submission, can be retrieved with:
+
+    <pre class="prettyprint">
+    <b>GET</b> /api/v2/assets/<code>{uid}</code>/data/bulk/<code>{job_uid}</code>/
+    </pre>
+
+    > Response
+    >
+    >       HTTP 200 Ok
+    >        {
+    >           "uid": {job_uid},
+    >           "status": "processing",
+    >           "total": 5000,
+    >           "processed": 1200,
+    >           "failures": 0,
+    >           "results": [...]
+    >        }
+
+    `status` is `complete` once all submissions have been processed.
+
 
     ### CURRENT ENDPOINT
     """
@@ -382,6 +444,22 @@ class DataViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
 
         return Response(**json_response)
 
+    @action(
+        detail=False,
+        methods=['GET'],
+        url_path=r'bulk/(?P<job_uid>[^/.]+)',
+        renderer_classes=[renderers.JSONRenderer],
+    )
+    def bulk_job(self, request, job_uid, *args, **kwargs):
+        deployment = self._get_deployment()
+        job = deployment.get_bulk_update_job(job_uid)
+        if not job or job['user_id'] != request.user.pk:
+            raise Http404
+
+        job = copy.copy(job)
+        del job['user_id']
+        return Response(job)
+
     def destroy(self, request, pk, *args, **kwargs):
         deployment = self._get_deployment()
         # Coerce to int because back end only finds matches with same type
@@ -482,16 +560,46 @@ class DataViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
                 raise serializers.ValidationError(message)
             logging.warning(message, exc_info=True)
             raise serializers.ValidationError('Unsupported query')
+
+        if isinstance(self.paginator, DataKeysetPagination):
+            self.paginator.count = deployment.current_submission_count
+            page = self.paginate_queryset(submissions)
+            return self._get_list_response(page)
+
+        if deployment.current_submission_count is None:
+            # Submissions have not been counted (`count_strategy=none`).
+            # Whether there is a next page is known once the current one has
+            # been read.
+            self.paginate_queryset(None)
+            return self._get_list_response(
+                self.paginator.track_page(submissions)
+            )
+
         # Create a dummy list to let the Paginator do all the calculation
         # for pagination because it does not need the list of real objects.
         # It avoids retrieving all the objects from MongoDB
         dummy_submissions_list = [None] * deployment.current_submission_count
         page = self.paginate_queryset(dummy_submissions_list)
         if page is not None:
-            return self.get_paginated_response(submissions)
+            return self._get_list_response(submissions)
 
         return Response(list(submissions))
 
+    @property
+    def paginator(self):
+        """
+        Use keyset pagination when `after` is passed in the query string
+        """
+        if not hasattr(self, '_paginator'):
+            if (
+                DataKeysetPagination.after_query_param
+                in self.request.query_params
+            ):
+                self._paginator = DataKeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
     def retrieve(self, request, pk, *args, **kwargs):
         """
         Retrieve a submission by its primary key or its UUID.
@@ -612,8 +720,9 @@ class DataViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
         if request.method == "GET":
             filters = request.GET.dict()
 
-        # Remove `format` from filters. No need to use it
+        # Remove `format` and `stream` from filters. No need to use them
         filters.pop('format', None)
+        filters.pop('stream', None)
         # Do not allow requests to retrieve more than `SUBMISSION_LIST_LIMIT`
         # submissions at one time
         limit = filters.get('limit', settings.SUBMISSION_LIST_LIMIT)
@@ -628,6 +737,31 @@ class DataViewSet(AssetNestedObjectViewsetMixin, NestedViewSetMixin,
 
         return filters
 
+    def _get_list_response(
+        self, submissions: Iterable
+    ) -> Union[Response, StreamingHttpResponse]:
+        """
+        Return the paginated response of `submissions`, streamed when the
+        client asks for it with `?stream=true` in JSON format.
+
+        When streamed, `submissions` are only read from MongoDB while the
+        response is being written.
+        """
+        if (
+            self.request.query_params.get('stream', '').lower() != 'true'
+            or self.request.accepted_renderer.format != 'json'
+        ):
+            # Links may depend on the submissions of the page, read them first
+            return self.get_paginated_response(list(submissions))
+
+        renderer = SubmissionStreamingJSONRenderer()
+        return StreamingHttpResponse(
+            renderer.render_stream(
+                self.paginator.get_streamed_response_data(submissions)
+            ),
+            content_type=renderer.media_type,
+        )
+
     def _get_enketo_link(
         self, request: Request, submission_id: int, action_: str
     ) -> Response:
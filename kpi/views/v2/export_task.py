@@ -115,6 +115,7 @@ class ExportTaskViewSet(
     * "query" (optional) is a JSON object containing a Mongo filter query for filtering exported submissions. Valid inputs include:
         * A JSON object containing a valid Mongo query
         * An empty JSON object (no filtering)
+    * "incremental" (optional) is a boolean value that defaults to "false" and only affects "csv" export types. When "true", only submissions received since the most recent completed export with the same settings are fetched and appended to a copy of its result. A full export is generated instead if there is no such export, or if the project or its submissions have been modified or deleted since then.
 
 
     ### Retrieves current export task
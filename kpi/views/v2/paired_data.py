@@ -1,15 +1,14 @@
 # coding: utf-8
 from django.conf import settings
-from django.core.files.base import ContentFile
-from django.http import Http404
+from django.http import Http404, HttpResponseNotModified
 from django.utils import timezone
+from django.utils.http import parse_etags
 from rest_framework import renderers, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework_extensions.mixins import NestedViewSetMixin
-from shortuuid import ShortUUID
 
-from kpi.constants import SUBMISSION_FORMAT_TYPE_XML
+from kpi.exceptions import PairedDataRefreshInProgress
 from kpi.models import Asset, AssetFile, PairedData
 from kpi.permissions import (
     AssetEditorPermission,
@@ -17,9 +16,7 @@ from kpi.permissions import (
 )
 from kpi.serializers.v2.paired_data import PairedDataSerializer
 from kpi.renderers import SubmissionXMLRenderer
-from kpi.utils.hash import calculate_hash
 from kpi.utils.viewset_mixins import AssetNestedObjectViewsetMixin
-from kpi.utils.xml import strip_nodes, add_xml_declaration
 
 
 class PairedDataViewset(AssetNestedObjectViewsetMixin,
@@ -213,95 +210,43 @@ class PairedDataViewset(AssetNestedObjectViewsetMixin,
         if not source_asset.has_deployment or not self.asset.has_deployment:
             raise Http404
 
-        old_hash = None
         # Retrieve data from related asset file.
-        # If data has already been fetched once, an `AssetFile` should exist.
-        # Otherwise, we create one to store the generated XML.
-        try:
-            asset_file = self.asset.asset_files.get(uid=paired_data_uid)
-        except AssetFile.DoesNotExist:
-            asset_file = AssetFile(
-                uid=paired_data_uid,
-                asset=self.asset,
-                file_type=AssetFile.PAIRED_DATA,
-                user=self.asset.owner,
-            )
-            # When asset file is new, we consider its content as expired to
-            # force its creation below
-            has_expired = True
-        else:
-            if not asset_file.content:
-                # if `asset_file` exists but does not have any content, it means
-                # `paired_data` has changed since last time this endpoint has been
-                # called. E.g.: Project owner has changed the questions they want
-                # to include in the `xml-external` file
-                has_expired = True
-            else:
-                old_hash = asset_file.md5_hash
-                timedelta = timezone.now() - asset_file.date_modified
-                has_expired = (
-                    timedelta.total_seconds() > settings.PAIRED_DATA_EXPIRATION
-                )
-
-        # ToDo evaluate adding headers for caching and a HTTP 304 status code
-        if not has_expired:
-            return Response(asset_file.content.file.read().decode())
-
-        # If the content of `asset_file' has expired, let's regenerate the XML
-        submissions = source_asset.deployment.get_submissions(
-            self.asset.owner,
-            format_type=SUBMISSION_FORMAT_TYPE_XML
-        )
-        parsed_submissions = []
-        allowed_fields = paired_data.allowed_fields
-        random_uuid = ShortUUID().random(24)
-
-        for submission in submissions:
-            # Use `rename_root_node_to='data'` to rename the root node of each
-            # submission to `data` so that form authors do not have to rewrite
-            # their `xml-external` formulas any time the asset UID changes,
-            # e.g. when cloning a form or creating a project from a template.
-            # Set `use_xpath=True` because `paired_data.fields` uses full group
-            # hierarchies, not just question names.
-            parsed_submissions.append(
-                strip_nodes(
-                    submission,
-                    allowed_fields,
-                    use_xpath=True,
-                    rename_root_node_to='data',
-                    bulk_action_cache_key=random_uuid,
+        # If data has already been fetched once, an `AssetFile` should exist
+        # with some content, unless `paired_data` has changed since last time
+        # this endpoint has been called. E.g.: Project owner has changed the
+        # questions they want to include in the `xml-external` file
+        asset_file = paired_data.asset_file
+        if asset_file and asset_file.content:
+            timedelta = timezone.now() - asset_file.date_modified
+            if timedelta.total_seconds() > settings.PAIRED_DATA_EXPIRATION:
+                # Keep serving the current file until a new one has been
+                # generated in background
+                PairedData.schedule_refresh(source_asset.uid)
+
+            md5_hash = asset_file.md5_hash
+            if self._is_not_modified(request, md5_hash):
+                return HttpResponseNotModified(
+                    headers={'ETag': f'"{md5_hash}"'}
                 )
+            return Response(
+                asset_file.content.file.read().decode(),
+                headers={'ETag': f'"{md5_hash}"'},
             )
 
-        filename = paired_data.filename
-        parsed_submissions_to_str = ''.join(parsed_submissions)
-        root_tag_name = SubmissionXMLRenderer.root_tag_name
-        xml_ = add_xml_declaration(
-            f'<{root_tag_name}>'
-            f'{parsed_submissions_to_str}'
-            f'</{root_tag_name}>'
-        )
-
-        if not parsed_submissions:
-            # We do not want to cache an empty file
-            return Response(xml_)
-
-        # We need to delete the current file (if it exists) when filename
-        # has changed. Otherwise, it would leave an orphan file on storage
-        if asset_file.pk and asset_file.content.name != filename:
-            asset_file.content.delete()
-
-        asset_file.content = ContentFile(xml_.encode(), name=filename)
+        # There is nothing to serve yet, let's generate the XML right away
+        xml_ = paired_data.refresh_external_xml(source_asset)
+        if xml_ is None:
+            raise PairedDataRefreshInProgress
 
-        # `xml_` is already there in memory, let's use its content to get its
-        # hash and store it within `asset_file` metadata
-        asset_file.set_md5_hash(calculate_hash(xml_, prefix=True))
-        asset_file.save()
-        if old_hash != asset_file.md5_hash:
-            # resync paired data to the deployment backend
-            self.asset.deployment.sync_media_files(AssetFile.PAIRED_DATA)
+        md5_hash = paired_data.asset_file.md5_hash
+        return Response(xml_, headers={'ETag': f'"{md5_hash}"'})
 
-        return Response(xml_)
+    @staticmethod
+    def _is_not_modified(request, md5_hash: str) -> bool:
+        if not md5_hash:
+            return False
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        return f'"{md5_hash}"' in etags or '*' in etags
 
     def get_object(self):
         obj = self.get_queryset(as_list=False).get(